@@ -11,6 +11,7 @@ from AnimatedWordCloud.Utils import (
     AllocationTimelapse,
     TimelapseWordVector,
     Config,
+    measure_stage,
 )
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator import (
     allocate_all as allocate_static,
@@ -36,13 +37,15 @@ def allocate(
     """
 
     # Calculate static allocation
-    static_allocation_timelapse = allocate_static(
-        word_vector_timelapse, config
-    )
+    with measure_stage("static_allocation"):
+        static_allocation_timelapse = allocate_static(
+            word_vector_timelapse, config
+        )
 
     # Calculate animated allocation
-    animated_allocation_timelapse = animated_allocate(
-        static_allocation_timelapse, config
-    )
+    with measure_stage("animated_allocation"):
+        animated_allocation_timelapse = animated_allocate(
+            static_allocation_timelapse, config
+        )
 
     return animated_allocation_timelapse
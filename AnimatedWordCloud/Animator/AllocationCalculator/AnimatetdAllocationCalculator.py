@@ -8,11 +8,13 @@ Calculate interpolated allocations between timestamps
 """
 
 from __future__ import annotations
+from typing import Iterable, Iterator
 import numpy as np
 from AnimatedWordCloud.Utils import (
     AllocationTimelapse,
     AllocationInFrame,
     Config,
+    get_current_stats,
 )
 
 
@@ -29,19 +31,58 @@ def animated_allocate(
     # final output
     timelapse_output: AllocationTimelapse = AllocationTimelapse()
 
-    # Branching by interpolation_method
-    n_timestamps = len(
-        allocation_timelapse.timelapse
-    )  # get the number of timestamps
+    for time_name, allocation_frame in animated_allocate_iteratively(
+        allocation_timelapse.timelapse, config
+    ):
+        timelapse_output.add(time_name, allocation_frame)
 
-    # Interpolate between timestamps. the positions of words are changed by linear.
-    for index in range(n_timestamps - 1):
-        # get static frame data
-        from_allocation_frame = allocation_timelapse.get_frame(index)
-        to_allocation_frame = allocation_timelapse.get_frame(index + 1)
-        time_name_from = allocation_timelapse.timelapse[index][0]
-        time_name_to = allocation_timelapse.timelapse[index + 1][0]
+    return timelapse_output
+
+
+def animated_allocate_iteratively(
+    static_frames: Iterable[tuple[str, AllocationInFrame]], config: Config
+) -> Iterator[tuple[str, AllocationInFrame]]:
+    """
+    Same as `animated_allocate()`, but frames are consumed and yielded one by one
+
+    Only two static frames are kept at a time.
+
+    :param Iterable[tuple[str,AllocationInFrame]] static_frames:
+        (time name, static allocation) of each static frame, in order
+    :param Config config:
+    :return: (time name, allocation) of each frame, interpolations inserted
+    :rtype: Iterator[tuple[str, AllocationInFrame]]
+    """
+
+    frames = _insert_interpolations(static_frames, config)
+
+    if config.merging_identical_frames:
+        frames = _merge_identical_frames(frames, config)
 
+    yield from frames
+
+
+def _insert_interpolations(
+    static_frames: Iterable[tuple[str, AllocationInFrame]], config: Config
+) -> Iterator[tuple[str, AllocationInFrame]]:
+    """
+    Insert interpolated frames between each static frames
+
+    :param Iterable[tuple[str,AllocationInFrame]] static_frames:
+        (time name, static allocation) of each static frame, in order
+    :param Config config:
+    :return: (time name, allocation) of each frame, interpolations inserted
+    :rtype: Iterator[tuple[str, AllocationInFrame]]
+    """
+
+    iterator = iter(static_frames)
+    try:
+        time_name_from, from_allocation_frame = next(iterator)
+    except StopIteration:
+        return
+
+    # Interpolate between timestamps. the positions of words are changed by linear.
+    for time_name_to, to_allocation_frame in iterator:
         # interpolate between two frames
         interpolated_frames = _get_interpolated_frames(
             from_allocation_frame,
@@ -49,18 +90,88 @@ def animated_allocate(
             config,
         )
 
-        # add static frame first
-        timelapse_output.add(time_name_from, from_allocation_frame)
+        # static frame first
+        yield (time_name_from, from_allocation_frame)
 
-        # add interpolated frames
+        # interpolated frames
         time_name = time_name_from + config.transition_symbol + time_name_to
         for interpolated_frame in interpolated_frames:
-            timelapse_output.add(time_name, interpolated_frame)
+            yield (time_name, interpolated_frame)
 
-    # add last static frame
-    timelapse_output.add(time_name_to, to_allocation_frame)
+        time_name_from = time_name_to
+        from_allocation_frame = to_allocation_frame
+
+    # last static frame
+    yield (time_name_from, from_allocation_frame)
 
-    return timelapse_output
+
+def _merge_identical_frames(
+    frames: Iterable[tuple[str, AllocationInFrame]], config: Config
+) -> Iterator[tuple[str, AllocationInFrame]]:
+    """
+    Merge consecutive frames drawn the same into the first of them
+
+    The duration of the merged frame is the sum of them.
+    Happens when a transition moves nothing.
+
+    :param Iterable[tuple[str,AllocationInFrame]] frames:
+        (time name, allocation) of each frame, in order
+    :param Config config:
+    :return: (time name, allocation) of each frame, merged
+    :rtype: Iterator[tuple[str, AllocationInFrame]]
+    """
+
+    time_name_pending = None
+    frame_pending = None
+    for time_name, allocation_frame in frames:
+        if frame_pending is not None and _is_drawn_same(
+            time_name_pending,
+            frame_pending,
+            time_name,
+            allocation_frame,
+            config,
+        ):
+            frame_pending.duration = frame_pending.get_duration(
+                config
+            ) + allocation_frame.get_duration(config)
+
+            stats = get_current_stats()
+            if stats is not None:
+                stats.count("frames_merged")
+
+            continue
+
+        if frame_pending is not None:
+            yield (time_name_pending, frame_pending)
+
+        time_name_pending = time_name
+        frame_pending = allocation_frame
+
+    if frame_pending is not None:
+        yield (time_name_pending, frame_pending)
+
+
+def _is_drawn_same(
+    time_name_a: str,
+    allocation_frame_a: AllocationInFrame,
+    time_name_b: str,
+    allocation_frame_b: AllocationInFrame,
+    config: Config,
+) -> bool:
+    """
+    Whether two frames give the same image
+
+    :param str time_name_a, time_name_b: time names of the frames
+    :param AllocationInFrame allocation_frame_a, allocation_frame_b: allocations of the frames
+    :param Config config: used for drawing_time_stamp
+    :return: True if the same
+    :rtype: bool
+    """
+
+    if config.drawing_time_stamp and time_name_a != time_name_b:
+        return False
+
+    return allocation_frame_a.has_same_words(allocation_frame_b)
 
 
 def _get_setdiff(
@@ -218,6 +329,12 @@ def _get_interpolated_frames(
                 (frame_x_pos, frame_y_pos),
             )
 
+    # largest size of each word in the transition, for scaled sprites
+    base_font_sizes = {
+        key: max(from_allocation_frame[key][0], to_allocation_frame[key][0])
+        for key in all_keys
+    }
+
     # Generate interpolated_frames as AllocationInFrame
     output = []
     for index, to_be_added_frame in enumerate(to_be_added_frames):
@@ -225,6 +342,7 @@ def _get_interpolated_frames(
             from_static_allocation=False
         )
         to_be_added_allocation_frame.words = to_be_added_frame
+        to_be_added_allocation_frame.base_font_sizes = base_font_sizes
         output.append(to_be_added_allocation_frame)
 
     return output
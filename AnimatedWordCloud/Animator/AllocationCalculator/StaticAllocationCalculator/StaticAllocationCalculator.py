@@ -8,20 +8,30 @@ Calculate allocation of each words in each static time
 """
 
 from __future__ import annotations
-import numpy as np
+import math
+import time
+from typing import Iterable, Iterator
+import joblib
 from tqdm import tqdm
-from PIL import Image, ImageFont, ImageDraw
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies import (
+    StaticAllocationStrategy,
     MagneticAllocation,
     allocate_randomly,
 )
 from AnimatedWordCloud.Utils import (
     WordVector,
+    TimeFrame,
     TimelapseWordVector,
     AllocationInFrame,
     AllocationTimelapse,
     Word,
     Config,
+    measure_text,
+    measure_texts,
+    TextMetricsStore,
+    get_text_metrics_store,
+    get_current_stats,
+    call_with_stats,
 )
 
 
@@ -42,26 +52,31 @@ def allocate(
 
     word_weights = word_vector.get_ranking(0, config.max_words)
 
-    words: list[Word] = []
-
-    # get attributes for each words,
-    #   and save them as Word instances
-    for word_raw, weight in word_weights:
-        # get size
-        font_size = calculate_font_size(
+    # get size of each words
+    font_sizes = [
+        calculate_font_size(
             weight,
             word_weights[0][1],  # max weight
             word_weights[-1][1],  # min weight
             config.max_font_size,
             config.min_font_size,
         )
-        text_size = estimate_text_size(word_raw, font_size, config.font_path)
-
-        # make instance
-        word = Word(word_raw, weight, font_size, text_size)
+        for _, weight in word_weights
+    ]
+    text_sizes = estimate_text_sizes(
+        [word_raw for word_raw, _ in word_weights],
+        font_sizes,
+        config.font_path,
+        _get_text_metrics_store(config),
+    )
 
-        # save instance
-        words.append(word)
+    # save them as Word instances
+    words: list[Word] = [
+        Word(word_raw, weight, font_size, text_size)
+        for (word_raw, weight), font_size, text_size in zip(
+            word_weights, font_sizes, text_sizes
+        )
+    ]
 
     # calculate allocation by selected strategy
     if config.allocation_strategy == "magnetic":
@@ -102,35 +117,53 @@ def calculate_font_size(
 
 
 def estimate_text_size(
-    word: str, font_size: int, font_path: str
+    word: str,
+    font_size: int,
+    font_path: str,
+    store: TextMetricsStore = None,
 ) -> tuple[int, int]:
     """
     Estimate text box size
 
-    Highly depends on the drawing library
+    Highly depends on the drawing library.
+    Fonts and measured sizes are cached for the whole process.
 
     :param str word: The word
     :param int font_size: The font size
     :param str font_path: The font path
+    :param TextMetricsStore store: Persistent store to consult. Optional.
     :return: Text box size (x, y)
     :rtype: tuple[int, int]
     """
 
-    # according to https://watlab-blog.com/2019/08/27/add-text-pixel/
+    # memoized per process; see Utils.TextMetrics
+    return measure_text(word, font_size, font_path, store)
 
-    # prepare empty image
-    image = np.zeros(
-        (font_size * 2, font_size * (len(word) + 1), 3), dtype=np.uint8
-    )
-    font = ImageFont.truetype(font_path, font_size)
-    image = Image.fromarray(image)
-    draw = ImageDraw.Draw(image)
 
-    # get size
-    w = draw.textlength(word, font=font, font_size=font_size)
-    h = font_size
+def estimate_text_sizes(
+    words: Iterable[str],
+    font_sizes: Iterable[int],
+    font_path: str,
+    store: TextMetricsStore = None,
+) -> list[tuple[float, int]]:
+    """
+    Estimate text box sizes of many words at once
+
+    Same result as `estimate_text_size()` for each word,
+        but measured in a batch. See Utils.TextMetrics.measure_texts
+
+    :param Iterable[str] words: The words
+    :param Iterable[int] font_sizes: Font size of each word
+    :param str font_path: The font path
+    :param TextMetricsStore store: Persistent store to consult. Optional.
+    :return: Text box size (x, y) of each word
+    :rtype: list[tuple[float, int]]
+    """
 
-    return (w, h)
+    font_sizes = list(font_sizes)
+    widths, _ = measure_texts(words, font_sizes, font_path, store)
+
+    return list(zip(widths.tolist(), font_sizes))
 
 
 def allocate_all(
@@ -145,35 +178,360 @@ def allocate_all(
     :rtype: AllocationTimelapse
     """
 
-    times = len(timelapse)
+    if config.static_allocation_chunks > 1:
+        return _allocate_all_chunked(timelapse, config)
 
     allocation_timelapse = AllocationTimelapse()
 
-    # first frame
-    first_frame = _allocate_first_frame(timelapse[0].word_vector, config)
-    allocation_timelapse.add(config.starting_time_stamp, first_frame)
-
     # verbose for iteration
     if config.verbosity in ["debug", "minor"]:
         print("Start static-allocation iteration...")
-        iterator = tqdm(range(times))
+        iterator = tqdm(timelapse.timeframes)
     else:
-        iterator = range(times)
+        iterator = timelapse.timeframes
 
     # calculate allocation for each frame
-    for cnt in iterator:
+    for time_name, allocation in allocate_all_iteratively(iterator, config):
+        allocation_timelapse.add(time_name, allocation)
+
+    return allocation_timelapse
+
+
+def allocate_all_iteratively(
+    timeframes: Iterable[TimeFrame], config: Config
+) -> Iterator[tuple[str, AllocationInFrame]]:
+    """
+    Same as `allocate_all()`, but frames are consumed and yielded one by one
+
+    Allocating a frame adds words to the previous frame,
+        so a frame is yielded after the next frame is allocated.
+    Only two frames are kept at a time.
+
+    :param Iterable[TimeFrame] timeframes: Time frames, in order
+    :param Config config: Config instance
+    :return: (time name, allocation) of each static frame,
+        starting from `config.starting_time_stamp`
+    :rtype: Iterator[tuple[str, AllocationInFrame]]
+    """
+
+    iterator = iter(timeframes)
+    timeframe = next(iterator, None)
+    if timeframe is None:
+        return
+
+    stats = get_current_stats()
+
+    # first frame
+    time_name_previous = config.starting_time_stamp
+    allocation_previous = _allocate_first_frame(timeframe.word_vector, config)
+
+    while timeframe is not None:
+        time_start = time.perf_counter()
+
         allocation = allocate(
-            timelapse[cnt].word_vector,
-            allocation_timelapse.get_frame(
-                cnt
-            ),  # first added -> cnt; one before
+            timeframe.word_vector, allocation_previous, config
+        )
+
+        if stats is not None:
+            stats.add_frame_time(time.perf_counter() - time_start)
+
+        # not modified anymore
+        yield (time_name_previous, allocation_previous)
+
+        time_name_previous = timeframe.time_name
+        allocation_previous = allocation
+        timeframe = next(iterator, None)
+
+    yield (time_name_previous, allocation_previous)
+
+
+def _allocate_all_chunked(
+    timelapse: TimelapseWordVector, config: Config
+) -> AllocationTimelapse:
+    """
+    Same as `allocate_all()`, but segments allocated in parallel processes
+
+    The timelapse is split into `config.static_allocation_chunks` segments.
+    1. Each segment is seeded by a random layout of the frame before it,
+        as the first frame is, independent of the other segments.
+    2. Each segment is allocated sequentially from its seed,
+        in its own process.
+    3. Stitching: the first `config.static_allocation_overlap` frames of each segment
+        are allocated again, sequentially from the actual last frame of the previous segment,
+        so as the movement reluctance is kept at the boundaries.
+        See `_stitch_segment()`.
+    Only the stitching runs sequentially,
+        at most `config.static_allocation_overlap` frames per segment.
+
+    :param TimelapseWordVector timelapse: The timelapse word vector
+    :param Config config: Config instance
+    :return: Allocation data of all the frames
+    :rtype: AllocationTimelapse
+    """
+
+    times = len(timelapse)
+    n_chunks = min(config.static_allocation_chunks, times)
+
+    # split frames evenly; earlier segments take the remainder
+    segments = []
+    start = 0
+    for cnt in range(n_chunks):
+        end = start + times // n_chunks + (1 if cnt < times % n_chunks else 0)
+        segments.append((start, end))
+        start = end
+
+    if config.verbosity in ["debug", "minor"]:
+        print(
+            "Start static-allocation in {} parallel segments...".format(
+                n_chunks
+            )
+        )
+        verbosity = 10
+    else:
+        verbosity = 0
+
+    # stats of each process are merged after
+    results_with_stats = joblib.Parallel(n_jobs=n_chunks, verbose=verbosity)(
+        joblib.delayed(call_with_stats)(
+            _allocate_segment_seeded,
+            timelapse[max(start - 1, 0)].word_vector,
+            [timelapse[cnt].word_vector for cnt in range(start, end)],
             config,
         )
-        allocation_timelapse.add(timelapse[cnt].time_name, allocation)
+        for start, end in segments
+    )
+
+    results = []
+    stats = get_current_stats()
+    for result, stats_segment in results_with_stats:
+        results.append(result)
+        if stats is not None:
+            stats.merge(stats_segment)
+
+    # stitch the segments
+    frames = [results[0][0]] + results[0][1]
+    for (start, _), (seed, frames_segment) in zip(segments[1:], results[1:]):
+        frames.extend(
+            _stitch_segment(
+                timelapse, start, seed, frames_segment, frames[-1], config
+            )
+        )
+
+    allocation_timelapse = AllocationTimelapse()
+    allocation_timelapse.add(config.starting_time_stamp, frames[0])
+    for cnt in range(times):
+        allocation_timelapse.add(timelapse[cnt].time_name, frames[cnt + 1])
 
     return allocation_timelapse
 
 
+def _stitch_segment(
+    timelapse: TimelapseWordVector,
+    start: int,
+    seed: AllocationInFrame,
+    frames_segment: list[AllocationInFrame],
+    frame_previous: AllocationInFrame,
+    config: Config,
+) -> list[AllocationInFrame]:
+    """
+    Connect a segment allocated in parallel to the frame before it
+
+    The first frames are allocated again sequentially from `frame_previous`,
+        and the frames of the parallel pass are handed over to
+        where words move the least more than the sequential allocation.
+    If the layout becomes the same as the parallel pass,
+        handed over there.
+
+    :param TimelapseWordVector timelapse: The timelapse word vector
+    :param int start: Index of the first frame of the segment
+    :param AllocationInFrame seed: Frame the segment was allocated from
+    :param list[AllocationInFrame] frames_segment: Frames of the segment allocated in parallel
+    :param AllocationInFrame frame_previous: Actual last frame of the previous segment.
+        Words are added to it.
+    :param Config config: Config instance
+    :return: Frames of the segment stitched
+    :rtype: list[AllocationInFrame]
+    """
+
+    stats = get_current_stats()
+
+    # allocated sequentially from the previous segment
+    frames_again = []
+    index_handover = 0
+    movement_excess_min = math.inf
+    frame_before = frame_previous
+    n_overlap = min(config.static_allocation_overlap, len(frames_segment))
+    for cnt in range(n_overlap):
+        word_vector_before = timelapse[start + cnt - 1].word_vector
+        word_vector = timelapse[start + cnt].word_vector
+        frame = allocate(word_vector, frame_before, config)
+        if stats is not None:
+            stats.count("frames_restitched")
+
+        if _has_same_layout(frame, frames_segment[cnt], word_vector, config):
+            index_handover = cnt
+            break
+
+        # moving to the parallel frame, compared to the sequential one
+        movement_excess = _get_movement(
+            frame_before,
+            frames_segment[cnt],
+            word_vector_before,
+            word_vector,
+            config,
+        ) - _get_movement(
+            frame_before, frame, word_vector_before, word_vector, config
+        )
+        if movement_excess < movement_excess_min:
+            movement_excess_min = movement_excess
+            index_handover = cnt
+
+        frames_again.append(frame)
+        frame_before = frame
+    else:
+        # no parallel frame left to hand over
+        if n_overlap == len(frames_segment):
+            index_handover = n_overlap
+
+    frames_stitched = frames_again[:index_handover]
+    if index_handover > 0:
+        frame_previous = frames_again[index_handover - 1]
+
+    # words appearing at the handover were put in the frame before
+    if index_handover == 0:
+        frame_source = seed
+    else:
+        frame_source = frames_segment[index_handover - 1]
+    for word, allocation in frame_source.words.items():
+        if word not in frame_previous.words:
+            frame_previous.add(word, allocation[0], allocation[1])
+
+    # words disappeared before are carried along the segment
+    strategy = StaticAllocationStrategy(config)
+    for frame in frames_segment[index_handover:]:
+        strategy.add_missing_word_from_previous_frame(frame_previous, frame)
+        frames_stitched.append(frame)
+        frame_previous = frame
+
+    return frames_stitched
+
+
+def _get_movement(
+    frame_from: AllocationInFrame,
+    frame_to: AllocationInFrame,
+    word_vector_from: WordVector,
+    word_vector_to: WordVector,
+    config: Config,
+) -> float:
+    """
+    Get the mean distance the words ranked in both frames move
+
+    :param AllocationInFrame frame_from: Allocation data of the frame before
+    :param AllocationInFrame frame_to: Allocation data of the frame after
+    :param WordVector word_vector_from: Word vector of the frame before
+    :param WordVector word_vector_to: Word vector of the frame after
+    :param Config config: Config instance
+    :return: Mean distance of the left-top positions. 0 if no word in both.
+    :rtype: float
+    """
+
+    words_from = {
+        word for word, _ in word_vector_from.get_ranking(0, config.max_words)
+    }
+    distances = [
+        math.dist(frame_from[word][1], frame_to[word][1])
+        for word, _ in word_vector_to.get_ranking(0, config.max_words)
+        if word in words_from
+    ]
+    if len(distances) == 0:
+        return 0.0
+
+    return sum(distances) / len(distances)
+
+
+def _has_same_layout(
+    frame: AllocationInFrame,
+    frame_other: AllocationInFrame,
+    word_vector: WordVector,
+    config: Config,
+) -> bool:
+    """
+    Check if the words ranked in the frame are put at the same places
+
+    :param AllocationInFrame frame: Allocation data of the frame
+    :param AllocationInFrame frame_other: Allocation data of the same frame
+    :param WordVector word_vector: Word vector of the frame
+    :param Config config: Config instance
+    :return: True if all the words ranked have the same size and position
+    :rtype: bool
+    """
+
+    for word, _ in word_vector.get_ranking(0, config.max_words):
+        if frame.words.get(word) != frame_other.words.get(word):
+            return False
+
+    return True
+
+
+def _allocate_segment(
+    word_vectors: Iterable[WordVector],
+    allocation_before: AllocationInFrame,
+    config: Config,
+) -> tuple[AllocationInFrame, list[AllocationInFrame]]:
+    """
+    Allocate frames of a segment sequentially
+
+    Intended to be run in a separate process by `_allocate_all_chunked()`
+
+    :param Iterable[WordVector] word_vectors: Word vectors of the segment
+    :param AllocationInFrame allocation_before:
+        Allocation data of one frame before the segment
+    :param Config config: Config instance
+    :return: (`allocation_before` with words added, Allocation data of
+        each frame)
+    :rtype: tuple[AllocationInFrame, list[AllocationInFrame]]
+    """
+
+    # modified by allocating the first frame; returned back to the parent
+    seed = allocation_before
+
+    stats = get_current_stats()
+
+    frames = []
+    for word_vector in word_vectors:
+        time_start = time.perf_counter()
+
+        allocation = allocate(word_vector, allocation_before, config)
+        frames.append(allocation)
+        allocation_before = allocation
+
+        if stats is not None:
+            stats.add_frame_time(time.perf_counter() - time_start)
+
+    return (seed, frames)
+
+
+def _allocate_segment_seeded(
+    word_vector_seed: WordVector,
+    word_vectors: Iterable[WordVector],
+    config: Config,
+) -> tuple[AllocationInFrame, list[AllocationInFrame]]:
+    """
+    Same as `_allocate_segment()`, seeded by a layout made in this process
+
+    :param WordVector word_vector_seed: Word vector of one frame before the segment.
+        Allocated randomly as the first frame.
+    :param Iterable[WordVector] word_vectors: Word vectors of the segment
+    :param Config config: Config instance
+    :return: (Seed with words added, Allocation data of each frame)
+    :rtype: tuple[AllocationInFrame, list[AllocationInFrame]]
+    """
+
+    seed = _allocate_first_frame(word_vector_seed, config)
+
+    return _allocate_segment(word_vectors, seed, config)
+
+
 def _allocate_first_frame(
     word_vector: WordVector, config: Config
 ) -> AllocationInFrame:
@@ -187,21 +545,38 @@ def _allocate_first_frame(
     """
 
     words_tup = word_vector.get_ranking(0, config.max_words)
-    words = []  # Word instances
-
-    # get attributes for each words,
-    #   and save them as Word instances
-    for word_raw, weight in words_tup:
-        # minimum font size for the first frame
-        text_size = estimate_text_size(
-            word_raw, config.min_font_size, config.font_path
-        )
 
-        # make instance
-        word = Word(word_raw, weight, config.min_font_size, text_size)
+    # minimum font size for the first frame
+    text_sizes = estimate_text_sizes(
+        [word_raw for word_raw, _ in words_tup],
+        [config.min_font_size] * len(words_tup),
+        config.font_path,
+        _get_text_metrics_store(config),
+    )
 
-        # save instance
-        words.append(word)
+    # save them as Word instances
+    words = [
+        Word(word_raw, weight, config.min_font_size, text_size)
+        for (word_raw, weight), text_size in zip(words_tup, text_sizes)
+    ]
 
     # allocate randomly
     return allocate_randomly(words, config.image_width, config.image_height)
+
+
+def _get_text_metrics_store(config: Config) -> TextMetricsStore | None:
+    """
+    Get the persistent text metrics store configured
+
+    :param Config config: Config instance
+    :return: Store, or None if not configured
+    :rtype: TextMetricsStore|None
+    """
+
+    if config.text_metrics_store_path is None:
+        return None
+
+    return get_text_metrics_store(
+        config.text_metrics_store_path,
+        config.text_metrics_store_max_entries,
+    )
@@ -11,13 +11,15 @@ Used by MagneticAllocation
 
 
 from __future__ import annotations
-from typing import Iterable
-from bisect import bisect
+import copy
+from typing import Iterable, Iterator
+import numpy as np
 from AnimatedWordCloud.Utils import (
     Vector,
     Rect,
-    is_point_hitting_rects,
+    RectSpatialIndex,
     is_point_hitting_rect,
+    get_current_stats,
 )
 
 TO_RIGHT = Vector(0, 0)
@@ -26,6 +28,104 @@ TO_UP = Vector(0, 0)
 TO_DOWN = Vector(0, 0)
 
 
+class FrontierSide:
+    """
+    Points of the frontier seen from one side of the image.
+
+    There is at most one point on each scan line (launcher position),
+        so the points are kept in a fixed-size array indexed by the scan line.
+    Overwriting a point is O(1), and the points are always
+        ordered by the launcher position.
+
+    Iterating gives the points as Vector.
+    """
+
+    def __init__(
+        self,
+        launcher_positions: np.ndarray,
+        launcher_along_x: bool,
+        ray_positions: np.ndarray = None,
+    ) -> None:
+        """
+        Prepare the side
+
+        :param np.ndarray launcher_positions: Positions of the scan lines
+        :param bool launcher_along_x: True if the launcher moves along x
+        :param np.ndarray ray_positions: Position of the point
+            along the ray of each scan line; NaN if not found.
+            Empty if not given.
+        """
+
+        self.launcher_positions = launcher_positions
+        self.launcher_along_x = launcher_along_x
+
+        if ray_positions is None:
+            ray_positions = np.full(len(launcher_positions), np.nan)
+        self.ray_positions = ray_positions
+
+    def set(self, index: int, ray_position: float) -> None:
+        """
+        Set the point of the scan line, overwriting the former one
+
+        :param int index: Index of the scan line
+        :param float ray_position: Position of the point along the ray
+        :rtype: None
+        """
+
+        self.ray_positions[index] = ray_position
+
+    def copy(self) -> FrontierSide:
+        """
+        Copy the side
+
+        :return: Copied side
+        :rtype: FrontierSide
+        """
+
+        return FrontierSide(
+            self.launcher_positions,
+            self.launcher_along_x,
+            self.ray_positions.copy(),
+        )
+
+    def get_points_as_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the points found
+
+        :return: (x, y) of the points, ordered by the launcher position
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+
+        found = ~np.isnan(self.ray_positions)
+
+        if self.launcher_along_x:
+            return self.launcher_positions[found], self.ray_positions[found]
+        else:
+            return self.ray_positions[found], self.launcher_positions[found]
+
+    def __iter__(self) -> Iterator[Vector]:
+        """
+        Iterate the points found, ordered by the launcher position
+
+        :return: Iterator of the points
+        :rtype: Iterator[Vector]
+        """
+
+        xs, ys = self.get_points_as_arrays()
+
+        return (Vector(x, y) for x, y in zip(xs.tolist(), ys.tolist()))
+
+    def __len__(self) -> int:
+        """
+        Number of the points found
+
+        :return: Number of the points
+        :rtype: int
+        """
+
+        return int(np.count_nonzero(~np.isnan(self.ray_positions)))
+
+
 class MagnetOuterFrontier:
     """
     Outer frontier of the magnet at the center.
@@ -36,15 +136,105 @@ class MagnetOuterFrontier:
     And find the first point that is not overlapped with the magnet.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        image_width: int,
+        image_height: int,
+        interval_x: float,
+        interval_y: float,
+    ) -> None:
         """
         Make empty data
+
+        :param int image_width: Width of the image
+        :param int image_height: Height of the image
+        :param float interval_x: interval of the precision; x
+        :param float interval_y: interval of the precision; y
+        """
+
+        # scan lines; launchers move to right or down
+        # need to shift 1 for the collision detection
+        xs = get_ray_positions(1, interval_x, image_width)
+        ys = get_ray_positions(1, interval_y, image_height)
+
+        self.from_up = FrontierSide(xs, True)
+        self.from_down = FrontierSide(xs, True)
+        self.from_left = FrontierSide(ys, False)
+        self.from_right = FrontierSide(ys, False)
+
+    def copy(self) -> MagnetOuterFrontier:
+        """
+        Copy the frontier
+
+        :return: Copied frontier
+        :rtype: MagnetOuterFrontier
+        """
+
+        copied = copy.copy(self)
+        copied.from_up = self.from_up.copy()
+        copied.from_down = self.from_down.copy()
+        copied.from_left = self.from_left.copy()
+        copied.from_right = self.from_right.copy()
+
+        return copied
+
+
+class RayFrontierEngine:
+    """
+    Finds the outer frontier of the magnet by marching rays.
+
+    Keeps the former frontier, so as only rays near the added rect
+        are launched again. See `get_magnet_outer_frontier()`.
+    """
+
+    def __init__(
+        self,
+        image_width: int,
+        image_height: int,
+        interval_x: float,
+        interval_y: float,
+    ) -> None:
+        """
+        Prepare empty frontier
+
+        :param int image_width: Width of the image
+        :param int image_height: Height of the image
+        :param float interval_x: interval of the precision; x
+        :param float interval_y: interval of the precision; y
+        """
+
+        self.image_width = image_width
+        self.image_height = image_height
+        self.interval_x = interval_x
+        self.interval_y = interval_y
+
+        self.frontier = MagnetOuterFrontier(
+            image_width, image_height, interval_x, interval_y
+        )
+
+    def update(
+        self, rects: Iterable[Rect], rect_added: Rect
+    ) -> MagnetOuterFrontier:
+        """
+        Get the new frontier after the rect added
+
+        :param Iterable[Rect] rects: All rects placed, including `rect_added`
+        :param Rect rect_added: Rectangle that is added at the last step
+        :return: Outer frontier of the magnet at the center
+        :rtype: MagnetOuterFrontier
         """
 
-        self.from_up: list[tuple[int, int]] = []
-        self.from_down: list[tuple[int, int]] = []
-        self.from_left: list[tuple[int, int]] = []
-        self.from_right: list[tuple[int, int]] = []
+        self.frontier = get_magnet_outer_frontier(
+            rects,
+            self.image_width,
+            self.image_height,
+            self.interval_x,
+            self.interval_y,
+            rect_added,
+            self.frontier,
+        )
+
+        return self.frontier
 
 
 def get_magnet_outer_frontier(
@@ -59,20 +249,25 @@ def get_magnet_outer_frontier(
     """
     Find the outer frontier of the magnet at the center
 
-    :param Iterable[Rect] rects: Rectangles that are currently putted in the magnet
+    :param Iterable[Rect] rects: Rectangles that are currently putted in the magnet.
+        Giving a RectSpatialIndex saves building it on every call.
     :param int image_width: Width of the image
     :param int image_height: Height of the image
     :param int interval_x: interval of the precision; x
     :param int interval_y: interval of the precision; y
-    :param Rect rect_added: Rectangle that is added at the last step. If specified with frontier_former, the calculation is faster.
-    :param MagnetOuterFrontier frontier_former: Former frontier. If specified with rect_added, the calculation is faster.
+    :param Rect rect_added: Rectangle that is added at the last step. Only rays near this are launched.
+    :param MagnetOuterFrontier frontier_former: Former frontier. This won't be modified.
     :return: Outer frontier of the magnet at the center
     :rtype: MagnetOuterFrontier
     """
 
     _initialize_directions(interval_x, interval_y)
 
-    magnet_outer_frontier = MagnetOuterFrontier()
+    # index for collision detection
+    if not isinstance(rects, RectSpatialIndex):
+        rects = RectSpatialIndex(max(image_width, image_height) / 16, rects)
+
+    magnet_outer_frontier = frontier_former.copy()
 
     # prepare for iteration
     # need to shift 1 for the collision detection
@@ -94,18 +289,16 @@ def get_magnet_outer_frontier(
         TO_RIGHT,  # from left
         TO_LEFT,  # from right
     ]
-    former_frontiers_by_side = [
-        frontier_former.from_up,  # from up
-        frontier_former.from_down,  # from down
-        frontier_former.from_left,  # from left
-        frontier_former.from_right,  # from right
+    frontiers_by_side = [
+        magnet_outer_frontier.from_up,  # from up
+        magnet_outer_frontier.from_down,  # from down
+        magnet_outer_frontier.from_left,  # from left
+        magnet_outer_frontier.from_right,  # from right
     ]
 
     # detect from 4 sides
-    corresponding_frontiers = []
     for cnt in range(4):
-        # detect
-        detected_points = _detect_frontier_linealy(
+        _detect_frontier_linealy(
             launcher_start_positions[cnt],
             launcher_directions[cnt],
             detection_ray_directions[cnt],
@@ -113,18 +306,9 @@ def get_magnet_outer_frontier(
             image_width,
             image_height,
             rect_added,
-            former_frontiers_by_side[cnt],
+            frontiers_by_side[cnt],
         )
 
-        # update
-        corresponding_frontiers.append(detected_points)
-
-    # update magnet_outer_frontier
-    magnet_outer_frontier.from_up = corresponding_frontiers[0]
-    magnet_outer_frontier.from_down = corresponding_frontiers[1]
-    magnet_outer_frontier.from_left = corresponding_frontiers[2]
-    magnet_outer_frontier.from_right = corresponding_frontiers[3]
-
     return magnet_outer_frontier
 
 
@@ -132,12 +316,12 @@ def _detect_frontier_linealy(
     launcher_point_start: Vector,
     launcher_direction: Vector,
     detection_ray_direction: Vector,
-    rects: Iterable[Rect],
+    rects: RectSpatialIndex,
     image_width: int,
     image_height: int,
     rect_added: Rect,
-    frontier_side: list[tuple[int, int]],
-) -> list[tuple[int, int]]:
+    frontier_side: FrontierSide,
+) -> None:
     """
     Detect the frontier from 1 line.
 
@@ -153,17 +337,14 @@ def _detect_frontier_linealy(
         Direction vector of the launching position moves
     :param Vector detection_ray_direction:
         Direction vector of the detection ray moves
-    :param Iterable[Rect] rects:
+    :param RectSpatialIndex rects:
         Word's Rectangles that are currently putted in the magnet
     :param int image_width: Width of the image
     :param int image_height: Height of the image
     :param Rect rect_added: Rectangle that is added at the last step.
-    :param list[tuple[int, int]] frontier_former_side: List of points of a side if former frontier.
-    :return: List of points that are detected
-    :rtype: list[tuple[int, int]]
+    :param FrontierSide frontier_side: Side of the frontier. This will be modified.
+    :rtype: None
     """
-    # a clone made
-    frontier_side = _sort_by_direction(frontier_side, detection_ray_direction)
 
     # true while the launcher is in the area hitting the rect_added
     hitting = False
@@ -171,7 +352,11 @@ def _detect_frontier_linealy(
     image_size = (image_width, image_height)
     launcher_position = launcher_point_start.clone()
 
+    # component of the ray direction
+    ray_axis = 1 if frontier_side.launcher_along_x else 0
+
     # while lancher is inside the image...
+    scan_line = 0
     while is_point_hitting_rect(launcher_position, Rect((0, 0), image_size)):
         # if ray will hit the new rect...
         if _will_hit_rect_added(
@@ -189,9 +374,9 @@ def _detect_frontier_linealy(
             )
 
             # update frontier
-            _remember_ray_result(
-                result_ray_launched, frontier_side, launcher_direction
-            )
+            if result_ray_launched is not None:
+                detection_ray_position, _ = result_ray_launched
+                frontier_side.set(scan_line, detection_ray_position[ray_axis])
 
         # if the ray launcher escapes from the new rect hitting area...
         elif hitting:
@@ -200,40 +385,13 @@ def _detect_frontier_linealy(
 
         # move launcher
         launcher_position += launcher_direction
-
-    return frontier_side
-
-
-def _remember_ray_result(
-    result_ray_launched: tuple[Vector, Rect] | None,
-    detected_points: list[tuple[int, int]],
-    launcher_direction: Vector,
-) -> None:
-    """
-    remember the result of the ray launched.
-
-    :param tuple[Vector, Rect]|None result_ray_launched: Result of the ray launched
-    :param list[tuple[int, int]] detected_points: List of points that are detected. This will be modified.
-    :param Vector launcher_direction: Direction vector of the launcher
-    :rtype: None
-    """
-
-    if result_ray_launched is None:
-        return
-
-    # get the result
-    detection_ray_position, _ = result_ray_launched
-
-    # overwrite the old list
-    _add_newly_found_point(
-        detection_ray_position, detected_points, launcher_direction
-    )
+        scan_line += 1
 
 
 def _launch_ray(
     launching_position: Vector,
     detection_ray_direction: Vector,
-    rects: Iterable[Rect],
+    rects: RectSpatialIndex,
     image_rect: Rect,
 ) -> tuple[Vector, Rect] | None:
     """
@@ -243,7 +401,7 @@ def _launch_ray(
 
     :param Vector launching_position: Starting position of the ray
     :param Vector detection_ray_direction: Direction vector of the detection ray moves
-    :param Iterable[Rect] rects: Rectangles that are currently putted in the magnet
+    :param RectSpatialIndex rects: Rectangles that are currently putted in the magnet
     :param Rect image_rect: Rectangle of the image
     :return: If hitted -> (Position of the first point hits, Rectangle that is hitting); if not hitted -> None
     :rtype: Tuple[Vector, Rect]|None
@@ -252,48 +410,30 @@ def _launch_ray(
     # clone to avoid modifying the original vector
     detection_ray_position = launching_position.clone()
 
+    result = None
+    steps = 0
+
     # while detection ray is inside the image...
     while is_point_hitting_rect(detection_ray_position, image_rect):
         # check hit
-        flag_hitted, hitted_rect = is_point_hitting_rects(
-            detection_ray_position, rects
+        flag_hitted, hitted_rect = rects.is_point_hitting(
+            detection_ray_position
         )
 
         if flag_hitted:
-            return (detection_ray_position, hitted_rect)
+            result = (detection_ray_position, hitted_rect)
+            break
 
         # move detection ray
         detection_ray_position += detection_ray_direction
+        steps += 1
 
-    return None
-
-
-def _sort_by_direction(
-    points: list[tuple[int, int]],
-    direction: Vector,
-) -> list[tuple[int, int]]:
-    """
-    Sort the points by the direction.
-
-    :param list[tuple[int, int]] points: List of points. This won't be modified.
-    :param Vector direction: Direction vector. Must be either TO_RIGHT, TO_LEFT, TO_UP, or TO_DOWN.
-    :return: Sorted list of points
-    :rtype: list[tuple[int, int]]
-    """
-    # also get components of the target direction for using bisect.bisect
-
-    points = points.copy()
-
-    # if direction is x-axis...
-    if direction.x == 0:
-        # sort by x in ascending order
-        points.sort(key=lambda x: x[0])
+    stats = get_current_stats()
+    if stats is not None:
+        stats.count("rays_launched")
+        stats.count("ray_steps", steps)
 
-    else:
-        # sort by y in ascending order
-        points.sort(key=lambda x: x[1])
-
-    return points
+    return result
 
 
 def _initialize_directions(interval_x: float, interval_y: float) -> None:
@@ -347,64 +487,28 @@ def _will_hit_rect_added(
         )
 
 
-def _add_newly_found_point(
-    point_found: tuple[int, int],
-    frontier_points: list[tuple[int, int]],
-    launcher_direction: Vector,
-) -> None:
+def get_ray_positions(start: float, step: float, length: float) -> np.ndarray:
     """
-    Add the newly found point to the frontier.
+    Positions visited by marching from `start` while inside (0, length)
 
-    :param tuple[int, int] point_found: Point found
-    :param list[tuple[int, int]] frontier_points: List of points of the frontier. This will be modified.
-    :param Vector launcher_direction: Direction vector of the launcher
-    :rtype: None
-    """
+    Accumulated one by one, so as to be the same as marching.
 
-    # if the launcher moving vertically...
-    if launcher_direction.x == 0:
-        # find by y axis
-        components = [point[1] for point in frontier_points]
-
-        _add_newly_found_point_with_specified_component(
-            components, frontier_points, point_found, point_found[1]
-        )
-
-    # if the launcher moving horizontally...
-    else:
-        # find by x axis
-        components = [point[0] for point in frontier_points]
-
-        _add_newly_found_point_with_specified_component(
-            components, frontier_points, point_found, point_found[0]
-        )
-
-
-def _add_newly_found_point_with_specified_component(
-    components: list[int],
-    frontier_points: list[tuple[int, int]],
-    point_found: tuple[int, int],
-    point_component: int,
-) -> None:
+    :param float start: Starting position
+    :param float step: Step of the marching. May be negative.
+    :param float length: Length of the image on this axis
+    :return: Positions
+    :rtype: np.ndarray
     """
-    Update the frontier with the newly found point by _add_newly_found_point()
 
-    :param list[int] components: List of components of the frontier points
-    :param list[tuple[int, int]] frontier_points: List of points of the frontier. This will be modified.
-    :param tuple[int, int] point_found: Point found
-    :param int point_component: Component of the point found
-    :rtype: None
-    """
-    index = bisect(components, point_component)
+    # enough steps to exit the image; cut later
+    n_steps = int(length / abs(step)) + 2
+    positions = np.add.accumulate(
+        np.concatenate(([float(start)], np.full(n_steps, float(step))))
+    )
 
-    # if there was a proceeding point...
-    if (index < len(components)) and (point_component == components[index]):
-        # ... overwrite
-        frontier_points[index] = point_found
+    inside = (0 < positions) & (positions < length)
 
-    # if there was no proceeding point...
-    else:
-        # ... newly insert
+    # stop at the first exit
+    n_inside = len(positions) if inside.all() else int(inside.argmin())
 
-        # bisect.bisect returns the index of the point that is bigger than the target point
-        frontier_points.insert(index, point_found)
+    return positions[:n_inside]
@@ -16,21 +16,30 @@ Repeating this process, all words will be allocated.
 from __future__ import annotations
 import math
 from typing import Iterable
+import numpy as np
 from tqdm import tqdm
 from AnimatedWordCloud.Utils import (
-    is_rect_hitting_rects,
+    RectSpatialIndex,
     AllocationInFrame,
     Vector,
     Rect,
     Word,
     Config,
+    get_current_stats,
 )
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.StaticAllocationStrategy import (
     StaticAllocationStrategy,
 )
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagnetOuterFrontier import (
     MagnetOuterFrontier,
-    get_magnet_outer_frontier,
+    FrontierSide,
+    RayFrontierEngine,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.OccupancyFrontier import (
+    OccupancyFrontierEngine,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.AnalyticFrontier import (
+    AnalyticFrontierEngine,
 )
 
 
@@ -66,10 +75,16 @@ class MagneticAllocation(StaticAllocationStrategy):
         self.add_missing_word_to_previous_frame(allocation_before, words)
 
         output = AllocationInFrame(from_static_allocation=True)
-        magnet_outer_frontier = MagnetOuterFrontier()
+        frontier_engine = self._create_frontier_engine()
 
         # Word rectangles that are currenly putted at the outermost of the magnet
-        self.rects = set()
+        # indexed by grid cells about the size of the largest words
+        self.rects = RectSpatialIndex(self.config.max_font_size * 2)
+
+        # same rects as arrays for the vectorized evaluation
+        # [left, top, right, bottom] of each rect
+        self.rect_edges = np.empty((len(self.words), 4))
+        self.n_rects = 0
 
         # put the first word at the center
         self.center = (
@@ -90,7 +105,7 @@ class MagneticAllocation(StaticAllocationStrategy):
                 first_word_position[1] + first_word.text_size[1],
             ),
         )
-        self.rects.add(rect_adding)
+        self._register_rect(rect_adding)
         output.add(first_word.text, first_word.font_size, first_word_position)
 
         # verbose for iteration
@@ -104,14 +119,8 @@ class MagneticAllocation(StaticAllocationStrategy):
         for word in iterator:
             # get outer frontier of the magnet
             # The position candidates will be selected from this frontier
-            magnet_outer_frontier = get_magnet_outer_frontier(
-                self.rects,
-                self.config.image_width,
-                self.config.image_height,
-                self.interval_x,
-                self.interval_y,
-                rect_adding,
-                magnet_outer_frontier,
+            magnet_outer_frontier = frontier_engine.update(
+                self.rects, rect_adding
             )
 
             # find the best left-top position
@@ -131,7 +140,7 @@ class MagneticAllocation(StaticAllocationStrategy):
             )
 
             # register rect
-            self.rects.add(rect_adding)
+            self._register_rect(rect_adding)
 
             # register to output
             output.add(word.text, word.font_size, position)
@@ -141,6 +150,54 @@ class MagneticAllocation(StaticAllocationStrategy):
 
         return output
 
+    def _create_frontier_engine(
+        self,
+    ) -> RayFrontierEngine | OccupancyFrontierEngine | AnalyticFrontierEngine:
+        """
+        Create the engine finding the frontier, selected by the config
+
+        :return: Frontier engine
+        :rtype: RayFrontierEngine|OccupancyFrontierEngine|AnalyticFrontierEngine
+        """
+
+        if self.config.frontier_engine == "ray":
+            engine_class = RayFrontierEngine
+        elif self.config.frontier_engine == "bitmap":
+            engine_class = OccupancyFrontierEngine
+        elif self.config.frontier_engine == "analytic":
+            engine_class = AnalyticFrontierEngine
+        else:
+            raise ValueError(
+                "Unknown frontier engine: {}".format(
+                    self.config.frontier_engine
+                )
+            )
+
+        return engine_class(
+            self.config.image_width,
+            self.config.image_height,
+            self.interval_x,
+            self.interval_y,
+        )
+
+    def _register_rect(self, rect: Rect) -> None:
+        """
+        Register the rect of the word putted
+
+        :param Rect rect: Rect of the word
+        :rtype: None
+        """
+
+        self.rects.add(rect)
+
+        self.rect_edges[self.n_rects] = (
+            rect.left_top[0],
+            rect.left_top[1],
+            rect.right_bottom[0],
+            rect.right_bottom[1],
+        )
+        self.n_rects += 1
+
     def _evaluate_position(
         self, position_from: tuple[int, int], position_to: tuple[int, int]
     ) -> float:
@@ -228,6 +285,63 @@ class MagneticAllocation(StaticAllocationStrategy):
             magnet_outer_frontier.from_right,
         ]
 
+        if self.config.candidate_evaluation == "vectorized":
+            best_position = self._try_put_all_candidates_vectorized(
+                pivots_to_center_list,
+                frontier_sides,
+                word.text_size,
+                position_from,
+            )
+        elif self.config.candidate_evaluation == "best_first":
+            best_position = self._try_put_all_candidates_best_first(
+                pivots_to_center_list,
+                frontier_sides,
+                word.text_size,
+                position_from,
+            )
+        elif self.config.candidate_evaluation == "scalar":
+            best_position = self._find_best_center_position_scalar(
+                pivots_to_center_list,
+                frontier_sides,
+                word.text_size,
+                position_from,
+            )
+        else:
+            raise ValueError(
+                "Unknown candidate evaluation: {}".format(
+                    self.config.candidate_evaluation
+                )
+            )
+
+        # to left-top position
+        best_position_left_top = (
+            best_position[0] - word.text_size[0] / 2,
+            best_position[1] - word.text_size[1] / 2,
+        )
+
+        return best_position_left_top
+
+    def _find_best_center_position_scalar(
+        self,
+        pivots_to_center_list: Iterable[Iterable[Vector]],
+        frontier_sides: Iterable[FrontierSide],
+        size: tuple[int, int],
+        position_from: tuple[int, int],
+    ) -> tuple[int, int]:
+        """
+        Find the best center position, evaluating candidates one by one
+
+        :param Iterable[Iterable[Vector]] pivots_to_center_list:
+            List of vectors from the pivot to the center of the word
+        :param Iterable[FrontierSide] frontier_sides:
+            Points of the frontier of each side
+        :param tuple[int,int] size: Size of the word
+        :param tuple[int,int] position_from:
+            Position of the center of the word comming from
+        :return: Best center position
+        :rtype: tuple[int, int]
+        """
+
         # get center position candidates
         center_position_candidates = self._compute_candidates(
             pivots_to_center_list, frontier_sides
@@ -239,30 +353,282 @@ class MagneticAllocation(StaticAllocationStrategy):
                 "No available position found. Try to reduce font size or expand image size."
             )
 
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count(
+                "candidates_evaluated", len(center_position_candidates)
+            )
+            stats.count(
+                "rect_collision_tests", len(center_position_candidates)
+            )
+
         # find the best position
-        best_position = self._try_put_all_candidates(
-            center_position_candidates, word.text_size, position_from
+        return self._try_put_all_candidates(
+            center_position_candidates, size, position_from
         )
 
-        # to left-top position
-        best_position_left_top = (
-            best_position[0] - word.text_size[0] / 2,
-            best_position[1] - word.text_size[1] / 2,
+    def _try_put_all_candidates_vectorized(
+        self,
+        pivots_to_center_list: Iterable[Iterable[Vector]],
+        frontier_sides: Iterable[FrontierSide],
+        size: tuple[int, int],
+        position_from: tuple[int, int],
+    ) -> tuple[float, float]:
+        """
+        Same as `_find_best_center_position_scalar()`, but with NumPy
+
+        All candidates are tested against all rects at once.
+        Candidates scored near the best are scored again
+            by `_evaluate_position()`,
+            so as the result is exactly the same as the scalar one.
+
+        :param Iterable[Iterable[Vector]] pivots_to_center_list:
+            List of vectors from the pivot to the center of the word
+        :param Iterable[FrontierSide] frontier_sides:
+            Points of the frontier of each side
+        :param tuple[int,int] size: Size of the word
+        :param tuple[int,int] position_from:
+            Position of the center of the word comming from
+        :return: Best center position
+        :rtype: tuple[float, float]
+        """
+
+        xs, ys = self._compute_candidates_as_arrays(
+            pivots_to_center_list, frontier_sides
         )
 
-        return best_position_left_top
+        # error handling: too small image area that cannot put the word anywhere anymore
+        if len(xs) == 0:
+            raise Exception(
+                "No available position found. Try to reduce font size or expand image size."
+            )
+
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count("candidates_evaluated", len(xs))
+            stats.count("rect_collision_tests", len(xs))
+
+        # collision detection; same calculation as `_is_hitting_other_words()`
+        x_half = size[0] / 2
+        y_half = size[1] / 2
+        lefts = (xs - x_half)[:, np.newaxis]
+        tops = (ys - y_half)[:, np.newaxis]
+        rights = (xs + x_half)[:, np.newaxis]
+        bottoms = (ys + y_half)[:, np.newaxis]
+        rect_edges = self.rect_edges[: self.n_rects]
+        is_separated = (
+            (rights < rect_edges[:, 0])
+            | (lefts > rect_edges[:, 2])
+            | (bottoms < rect_edges[:, 1])
+            | (tops > rect_edges[:, 3])
+        )
+        is_hitting = (~is_separated).any(axis=1)
+
+        scores = self._evaluate_positions(position_from, xs, ys)
+        scores[is_hitting] = -np.inf
+
+        # guard
+        best_score = scores.max()
+        if best_score == -np.inf:
+            raise Exception(
+                "No available position found. Try to reduce font size or expand image size."
+            )
+
+        # np.log may differ from math.log at the last digit,
+        #   so find the best again by the scalar evaluation
+        return self._find_best_by_scalar(
+            xs,
+            ys,
+            np.flatnonzero(scores >= best_score - _get_tolerance(best_score)),
+            position_from,
+        )
+
+    def _try_put_all_candidates_best_first(
+        self,
+        pivots_to_center_list: Iterable[Iterable[Vector]],
+        frontier_sides: Iterable[FrontierSide],
+        size: tuple[int, int],
+        position_from: tuple[int, int],
+    ) -> tuple[float, float]:
+        """
+        Same as `_find_best_center_position_scalar()`,
+            but tests collisions from the best scored candidates
+
+        Scores never depend on collisions,
+            so once a collision-free candidate found,
+            candidates scored less than it cannot be the best.
+        The search stops there, skipping most of the collision tests.
+
+        :param Iterable[Iterable[Vector]] pivots_to_center_list:
+            List of vectors from the pivot to the center of the word
+        :param Iterable[FrontierSide] frontier_sides:
+            Points of the frontier of each side
+        :param tuple[int,int] size: Size of the word
+        :param tuple[int,int] position_from:
+            Position of the center of the word comming from
+        :return: Best center position
+        :rtype: tuple[float, float]
+        """
+
+        xs, ys = self._compute_candidates_as_arrays(
+            pivots_to_center_list, frontier_sides
+        )
+
+        # error handling: too small image area that cannot put the word anywhere anymore
+        if len(xs) == 0:
+            raise Exception(
+                "No available position found. Try to reduce font size or expand image size."
+            )
+
+        scores = self._evaluate_positions(position_from, xs, ys)
+
+        # best first; stable so as ties keep the candidate order
+        order = np.argsort(-scores, kind="stable")
+
+        # collision-free candidates that can be the best
+        indices_free = []
+        threshold = -np.inf
+        n_tested = 0
+        for index in order.tolist():
+            # no more candidates can beat the best found
+            if scores[index] < threshold:
+                break
+
+            n_tested += 1
+            if not self._is_hitting_other_words(
+                (float(xs[index]), float(ys[index])), size
+            ):
+                if len(indices_free) == 0:
+                    # np.log may differ from math.log at the last digit,
+                    #   so continue a little
+                    threshold = scores[index] - _get_tolerance(scores[index])
+                indices_free.append(index)
+
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count("candidates_evaluated", len(xs))
+            stats.count("rect_collision_tests", n_tested)
+
+        # guard
+        if len(indices_free) == 0:
+            raise Exception(
+                "No available position found. Try to reduce font size or expand image size."
+            )
+
+        # find the best again by the scalar evaluation, in candidate order
+        return self._find_best_by_scalar(
+            xs, ys, sorted(indices_free), position_from
+        )
+
+    def _evaluate_positions(
+        self,
+        position_from: tuple[float, float],
+        xs: np.ndarray,
+        ys: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Same as `_evaluate_position()`, but for arrays of positions
+
+        The result may differ from `_evaluate_position()` at the last digit.
+
+        :param tuple[float,float] position_from:
+            Position of the center of the word comming from
+        :param np.ndarray xs: x of the centers of the word going to be putted
+        :param np.ndarray ys: y of the centers of the word going to be putted
+        :return: Evaluation values. Larger is the better
+        :rtype: np.ndarray
+        """
+
+        distance_movement = np.sqrt(
+            (position_from[0] - xs) ** 2 + (position_from[1] - ys) ** 2
+        )
+
+        distance_center = np.sqrt(
+            (xs - self.center[0]) ** 2 + (ys - self.center[1]) ** 2
+        )
+
+        return (
+            -self.config.movement_reluctance * np.log(distance_movement + 0.01)
+            - 1.0 * distance_center**2
+        )
+
+    def _find_best_by_scalar(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        indices: Iterable[int],
+        position_from: tuple[float, float],
+    ) -> tuple[float, float]:
+        """
+        Find the best of the candidates by `_evaluate_position()`
+
+        The first one is taken among the same scores.
+
+        :param np.ndarray xs: x of the candidates
+        :param np.ndarray ys: y of the candidates
+        :param Iterable[int] indices: Indices of the candidates to evaluate,
+            in the candidate order
+        :param tuple[float,float] position_from:
+            Position of the center of the word comming from
+        :return: Best center position
+        :rtype: tuple[float, float]
+        """
+
+        best_position = None
+        best_score = -float("inf")
+        for index in indices:
+            position = (float(xs[index]), float(ys[index]))
+            score = self._evaluate_position(position_from, position)
+            if score > best_score:
+                best_score = score
+                best_position = position
+
+        return best_position
+
+    def _compute_candidates_as_arrays(
+        self,
+        pivots_to_center_list: Iterable[Iterable[Vector]],
+        frontier_sides: Iterable[FrontierSide],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Same as `_compute_candidates()`, but as arrays of x and y
+
+        :param Iterable[Iterable[Vector]] pivots_to_center_list:
+            List of vectors from the pivot to the center of the word
+        :param Iterable[FrontierSide] frontier_sides:
+            Points of the frontier of each side
+        :return: (x, y) of the candidates of the center position
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+
+        xs_list = []
+        ys_list = []
+        for cnt in range(4):
+            points_x, points_y = frontier_sides[cnt].get_points_as_arrays()
+            pivots_x = np.array(
+                [pivot.x for pivot in pivots_to_center_list[cnt]]
+            )
+            pivots_y = np.array(
+                [pivot.y for pivot in pivots_to_center_list[cnt]]
+            )
+
+            # ordered by point, then by pivot, as `_get_candidates_from_one_side()`
+            xs_list.append(np.add.outer(points_x, pivots_x).ravel())
+            ys_list.append(np.add.outer(points_y, pivots_y).ravel())
+
+        return np.concatenate(xs_list), np.concatenate(ys_list)
 
     def _compute_candidates(
         self,
         pivots_to_center_list: Iterable[Iterable[Vector]],
-        frontier_sides: Iterable[Iterable[Vector]],
+        frontier_sides: Iterable[FrontierSide],
     ) -> list[tuple[int, int]]:
         """
         Compute all candidates of the center position
 
         :param Iterable[Iterable[Vector]] pivots_to_center_list:
             List of vectors from the pivot to the center of the word
-        :param Iterable[Iterable[Vector]]
+        :param Iterable[FrontierSide] frontier_sides:
             List of vectors from the frontier to the center of the word
         :return: Candidates of the center position
         """
@@ -366,12 +732,11 @@ class MagneticAllocation(StaticAllocationStrategy):
         left_top = center_position - size / 2
         right_bottom = center_position + size / 2
 
-        return is_rect_hitting_rects(
+        return self.rects.is_rect_hitting(
             Rect(
                 left_top.convert_to_tuple(),
                 right_bottom.convert_to_tuple(),
-            ),
-            self.rects,
+            )
         )
 
     def _try_put_position(
@@ -398,3 +763,15 @@ class MagneticAllocation(StaticAllocationStrategy):
         score = self._evaluate_position(position_from, center_position)
 
         return score
+
+
+def _get_tolerance(score: float) -> float:
+    """
+    Tolerance of the vectorized score against `_evaluate_position()`
+
+    :param float score: Score evaluated
+    :return: Tolerance
+    :rtype: float
+    """
+
+    return 1e-9 * (abs(score) + 1.0)
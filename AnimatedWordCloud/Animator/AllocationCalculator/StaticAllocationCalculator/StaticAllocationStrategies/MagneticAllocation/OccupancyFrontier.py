@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Frontier of magnet at the center, found by occupancy bitmaps
+
+Alternative of marching rays in `MagnetOuterFrontier`.
+Every point a ray would visit is kept in a NumPy grid,
+    and each placed rect is rasterized into it.
+The first hit of every ray is then found at once by `argmax`.
+
+Used by MagneticAllocation
+"""
+
+from __future__ import annotations
+from typing import Iterable
+import numpy as np
+from AnimatedWordCloud.Utils import Rect, get_current_stats
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagnetOuterFrontier import (
+    MagnetOuterFrontier,
+    FrontierSide,
+    get_ray_positions,
+)
+
+
+class OccupancyFrontierEngine:
+    """
+    Finds the outer frontier of the magnet with occupancy bitmaps.
+
+    Gives the same frontier as `RayFrontierEngine`.
+    """
+
+    def __init__(
+        self,
+        image_width: int,
+        image_height: int,
+        interval_x: float,
+        interval_y: float,
+    ) -> None:
+        """
+        Prepare empty bitmaps
+
+        :param int image_width: Width of the image
+        :param int image_height: Height of the image
+        :param float interval_x: interval of the precision; x
+        :param float interval_y: interval of the precision; y
+        """
+
+        self.frontier = MagnetOuterFrontier(
+            image_width, image_height, interval_x, interval_y
+        )
+
+        # positions visited by the rays, same as marching
+        # need to shift 1 for the collision detection
+        xs_from_left = get_ray_positions(1, interval_x, image_width)
+        xs_from_right = get_ray_positions(
+            image_width - 1, -interval_x, image_width
+        )
+        ys_from_up = get_ray_positions(1, interval_y, image_height)
+        ys_from_down = get_ray_positions(
+            image_height - 1, -interval_y, image_height
+        )
+
+        self.sides = [
+            _OccupancySide(self.frontier.from_up, ys_from_up),
+            _OccupancySide(self.frontier.from_down, ys_from_down),
+            _OccupancySide(self.frontier.from_left, xs_from_left),
+            _OccupancySide(self.frontier.from_right, xs_from_right),
+        ]
+
+    def update(
+        self, rects: Iterable[Rect], rect_added: Rect
+    ) -> MagnetOuterFrontier:
+        """
+        Add the rect and get the new frontier
+
+        The frontier returned is updated in place by the next call.
+
+        :param Iterable[Rect] rects: All rects placed. Unused; the bitmaps
+            already have them except `rect_added`.
+        :param Rect rect_added: Rectangle that is added at the last step
+        :return: Outer frontier of the magnet at the center
+        :rtype: MagnetOuterFrontier
+        """
+
+        for side in self.sides:
+            side.update(rect_added)
+
+        return self.frontier
+
+
+class _OccupancySide:
+    """
+    Bitmap of rays launched from one side of the image
+
+    Row: a scan line, column: a position along the ray.
+    """
+
+    def __init__(
+        self, frontier_side: FrontierSide, ray_positions: np.ndarray
+    ) -> None:
+        """
+        Prepare empty bitmap
+
+        :param FrontierSide frontier_side: Side of the frontier to update
+        :param np.ndarray ray_positions: Positions the ray visits in order
+        """
+
+        self.frontier_side = frontier_side
+        self.ray_positions = ray_positions
+
+        self.occupancy = np.zeros(
+            (len(frontier_side.launcher_positions), len(ray_positions)),
+            dtype=bool,
+        )
+
+    def update(self, rect_added: Rect) -> None:
+        """
+        Rasterize the rect, and update rays in its band
+
+        :param Rect rect_added: Rectangle added
+        :rtype: None
+        """
+
+        launcher_positions = self.frontier_side.launcher_positions
+        if self.frontier_side.launcher_along_x:
+            launcher_axis, ray_axis = 0, 1
+        else:
+            launcher_axis, ray_axis = 1, 0
+
+        # rasterize; a point inside the rect is hitting
+        rows_inside = (
+            rect_added.left_top[launcher_axis] < launcher_positions
+        ) & (launcher_positions < rect_added.right_bottom[launcher_axis])
+        columns_inside = (
+            rect_added.left_top[ray_axis] < self.ray_positions
+        ) & (self.ray_positions < rect_added.right_bottom[ray_axis])
+        self.occupancy[np.ix_(rows_inside, columns_inside)] = True
+
+        # launch rays of the band again
+        band = np.flatnonzero(
+            (rect_added.left_top[launcher_axis] <= launcher_positions)
+            & (launcher_positions <= rect_added.right_bottom[launcher_axis])
+        )
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count("rays_launched", len(band))
+
+        occupancy_band = self.occupancy[band]
+        is_hit = occupancy_band.any(axis=1)
+        self.frontier_side.ray_positions[band[is_hit]] = self.ray_positions[
+            occupancy_band[is_hit].argmax(axis=1)
+        ]
@@ -1,9 +1,11 @@
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationCalculator import (
     allocate,
     allocate_all,
+    allocate_all_iteratively,
 )
 
 __all__ = [
     "allocate",
     "allocate_all",
+    "allocate_all_iteratively",
 ]
@@ -4,26 +4,37 @@
 #
 # Licensed under the MIT License.
 """
-Integrates the images into a single video (gif)
+Integrates the images into a single video (gif, webp or apng)
 """
 
 from __future__ import annotations
 import os
+import itertools
+from typing import Iterable
 from PIL import Image
-from AnimatedWordCloud.Utils import Config, AllocationTimelapse
+from AnimatedWordCloud.Animator.AnimationWriter import (
+    AnimationWriter,
+    create_animation_writer,
+)
+from AnimatedWordCloud.Utils import (
+    Config,
+    AllocationTimelapse,
+    AllocationInFrame,
+)
 
 
 def integrate_images(
-    image_paths: list[str],
+    image_paths: Iterable[str] | Iterable[Image.Image],
     allocation_timelapse: AllocationTimelapse,
     config: Config,
     filename: str = "output.gif",
 ) -> str:
     """
-    Create images of each frame
+    Integrate the images into an animation file, writing frame by frame
 
     :param
-    List[str] image_paths: List of image_paths created by AnimatedWordCloud.Animator.ImageCreator.create_images
+    Iterable[str]|Iterable[Image.Image] image_paths: List of image_paths created by AnimatedWordCloud.Animator.ImageCreator.create_images,
+        or images rendered by AnimatedWordCloud.Animator.ImageCreator.render_frames, consumed one by one
     :param AllocationTimelapse allocation_timelapse: AllocationTimelapse instance
     :param Config config: Config instance
     :return: The path of the output animation file
@@ -33,27 +44,138 @@ def integrate_images(
     if config.verbosity == "debug":
         print("Integrating images...")
 
-    # input
-    gif_images = [Image.open(path) for path in image_paths]
-
     # output
     filepath_output = os.path.join(config.output_path, filename)
 
-    # compute the duration of each frame
-    durations = []
-    for _, allocation_in_frame in allocation_timelapse.timelapse:
-        if allocation_in_frame.from_static_allocation:
-            durations.append(config.duration_per_static_frame)
-        else:
-            durations.append(config.duration_per_interpolation_frame)
-
-    # save gif
-    gif_images[0].save(
+    # write frame by frame
+    _write_frames(
+        (
+            (allocation_in_frame, image)
+            for image, (_, allocation_in_frame) in zip(
+                image_paths, allocation_timelapse.timelapse
+            )
+        ),
         filepath_output,
-        save_all=True,
-        append_images=gif_images[1:],
-        duration=durations,
-        loop=0,
+        config,
     )
 
     return filepath_output
+
+
+def integrate_images_iteratively(
+    image_frames: Iterable[tuple[AllocationInFrame, Image.Image | str]],
+    config: Config,
+    filename: str = "output.gif",
+) -> str:
+    """
+    Same as `integrate_images()`, but images are consumed one by one
+
+    Each frame is encoded as soon as it is given,
+        so the encoding overlaps with the rendering.
+
+    :param Iterable[tuple[AllocationInFrame,Image.Image|str]] image_frames:
+        (allocation, image or its path) of each frame, in order.
+        Given by AnimatedWordCloud.Animator.ImageCreator.create_images_iteratively
+    :param Config config: Config instance
+    :param str filename: Filename of the output animation file
+    :return: The path of the output animation file
+    :rtype: str
+    """
+
+    if config.verbosity == "debug":
+        print("Integrating images...")
+
+    # output
+    filepath_output = os.path.join(config.output_path, filename)
+
+    # write frame by frame
+    _write_frames(image_frames, filepath_output, config)
+
+    return filepath_output
+
+
+def _write_frames(
+    image_frames: Iterable[tuple[AllocationInFrame, Image.Image | str]],
+    path: str,
+    config: Config,
+) -> None:
+    """
+    Write the frames to the animation file
+
+    The writer is opened with the first frame,
+        whose palette is the global palette if `config.gif_palette` is "global".
+
+    :param Iterable[tuple[AllocationInFrame,Image.Image|str]] image_frames:
+        (allocation, image or its path) of each frame, in order.
+    :param str path: Path of the animation file
+    :param Config config: Config instance
+    :rtype: None
+    """
+
+    image_frames = iter(image_frames)
+    image_first = None
+    frame_first = next(image_frames, None)
+    if frame_first is not None:
+        image_first = _open_image(frame_first[1])
+        image_frames = itertools.chain(
+            [(frame_first[0], image_first)], image_frames
+        )
+
+    with _create_writer(path, config, image_first) as writer:
+        for allocation_in_frame, image in image_frames:
+            writer.add_frame(
+                _open_image(image), _get_duration(allocation_in_frame, config)
+            )
+
+
+def _create_writer(
+    path: str, config: Config, image_first: Image.Image | None
+) -> AnimationWriter:
+    """
+    Create the writer of the animation file
+
+    :param str path: Path of the animation file
+    :param Config config: Config instance
+    :param Image.Image|None image_first: Image of the first frame.
+        In the global palette if `config.gif_palette` is "global".
+    :return: Writer opened
+    :rtype: AnimationWriter
+    """
+
+    palette = None
+    if config.gif_palette == "global" and image_first is not None:
+        palette = image_first.getpalette()
+
+    return create_animation_writer(
+        path, config.animation_format, loop=0, palette=palette
+    )
+
+
+def _open_image(image: Image.Image | str) -> Image.Image:
+    """
+    Open the image if a path is given
+
+    :param Image.Image|str image: Image or its path
+    :return: Image
+    :rtype: Image.Image
+    """
+
+    if isinstance(image, str):
+        return Image.open(image)
+    else:
+        return image
+
+
+def _get_duration(
+    allocation_in_frame: AllocationInFrame, config: Config
+) -> int:
+    """
+    Get the duration of the frame
+
+    :param AllocationInFrame allocation_in_frame: Allocation of the frame
+    :param Config config: Config instance
+    :return: Duration in milliseconds
+    :rtype: int
+    """
+
+    return allocation_in_frame.get_duration(config)
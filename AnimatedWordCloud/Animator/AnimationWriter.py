@@ -0,0 +1,808 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Write animation files frame by frame
+
+Pillow's `Image.save(save_all=True)` keeps every frame until the end.
+The writers here encode each frame as soon as it is added,
+    so the memory does not grow with the number of raw frames.
+
+They use the private API of Pillow,
+    so used only with the versions of Pillow checked.
+With other versions, `SaveAllWriter` saves by `Image.save(save_all=True)`.
+
+Formats: GIF, animated WebP and APNG
+"""
+
+from __future__ import annotations
+import io
+import os
+from typing import Any
+import numpy as np
+import PIL
+from PIL import (
+    Image,
+    ImageChops,
+    ImageFile,
+    GifImagePlugin,
+    PngImagePlugin,
+)
+
+try:
+    from PIL._binary import o8, o16be as o16, o32be as o32
+except ImportError:
+    # private module of Pillow
+    o8 = o16 = o32 = None
+
+try:
+    from PIL import _webp
+except ImportError:
+    # Pillow built without libwebp
+    _webp = None
+
+# GIF disposal method: leave the frame as it is
+_DISPOSAL_NONE = 1
+
+# animation format -> versions of Pillow whose private API is used, [first, last)
+_PILLOW_VERSIONS_OF_FORMAT = {
+    "gif": ((10, 2), (12, 0)),
+    "webp": ((10, 3), (11, 0)),
+    "apng": ((9, 5), (12, 0)),
+}
+
+# (major, minor) of the Pillow installed
+_PILLOW_VERSION = tuple(int(part) for part in PIL.__version__.split(".")[:2])
+
+# animation format -> format name of Pillow
+_PILLOW_FORMATS = {"gif": "GIF", "webp": "WEBP", "apng": "PNG"}
+
+# file extension -> animation format
+_FORMATS_OF_EXTENSION = {
+    ".gif": "gif",
+    ".webp": "webp",
+    ".png": "apng",
+    ".apng": "apng",
+}
+
+
+class AnimationWriter:
+    """
+    Base class of animation files written frame by frame
+
+    Usable with `with` statement, closing the file at the end.
+    """
+
+    def __init__(self, path: str, loop: int = 0) -> None:
+        """
+        Open the file to write
+
+        :param str path: Path of the animation file
+        :param int loop: Number of loops. 0 for infinite.
+        """
+
+        self.path = path
+        self.loop = loop
+
+        self._fp = open(path, "wb")
+
+        self.n_frames_written = 0
+
+    def add_frame(self, image: Image.Image, duration: int) -> None:
+        """
+        Add a frame
+
+        This is abstract method.
+
+        :param Image.Image image: Image of the frame
+        :param int duration: Duration of the frame in milliseconds
+        :rtype: None
+        """
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Write the rest and close the file
+
+        :rtype: None
+        """
+
+        if self._fp.closed:
+            return
+
+        try:
+            self._finish()
+        finally:
+            self._fp.close()
+
+    def _finish(self) -> None:
+        """
+        Write the rest of the file
+
+        This is abstract method.
+        Raises ValueError if no frame is added.
+
+        :rtype: None
+        """
+
+        raise NotImplementedError
+
+    def __enter__(self) -> AnimationWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            try:
+                self.close()
+            except BaseException:
+                # no broken file left
+                os.remove(self.path)
+                raise
+        else:
+            # keep the original error, and leave no broken file
+            self._fp.close()
+            os.remove(self.path)
+
+
+class GifWriter(AnimationWriter):
+    """
+    GIF file written frame by frame
+
+    Frames are encoded by the difference from the previous frame:
+    - Each frame is converted to an adaptive palette,
+        unless the global palette is given
+    - Only the box changed from the previous frame is written,
+        over the previous frame kept by the disposal method
+    - Unchanged pixels in the box are made transparent
+        only if it makes the frame smaller
+    - Identical consecutive frames are merged, adding up their durations
+
+    Decoded frames are the same as Pillow's `Image.save(save_all=True)`.
+    """
+
+    def __init__(
+        self, path: str, loop: int = 0, palette: list[int] = None
+    ) -> None:
+        """
+        Open the file to write
+
+        :param str path: Path of the GIF file
+        :param int loop: Number of loops. 0 for infinite.
+        :param list[int] palette: Global palette as [r, g, b, r, g, b, ...].
+            Frames are expected to be in this palette already.
+            If None(default), each frame has its own adaptive palette.
+        """
+
+        super().__init__(path, loop)
+
+        self.palette = palette
+
+        # frame waiting for identical frames to merge
+        self._frame_pending: dict[str, Any] | None = None
+
+        # last frame added, in palette
+        self._image_previous: Image.Image | None = None
+
+    def add_frame(self, image: Image.Image, duration: int) -> None:
+        """
+        Add a frame
+
+        :param Image.Image image: Image of the frame
+        :param int duration: Duration of the frame in milliseconds
+        :rtype: None
+        """
+
+        image = GifImagePlugin._normalize_mode(image)
+
+        # keep the previous frame under the next box
+        encoderinfo = {"loop": self.loop, "disposal": _DISPOSAL_NONE}
+        if self.palette is None:
+            encoderinfo["optimize"] = True
+        if "transparency" in image.info:
+            encoderinfo["transparency"] = image.info["transparency"]
+        image = GifImagePlugin._normalize_palette(
+            image, self.palette, encoderinfo
+        )
+        encoderinfo["duration"] = duration
+
+        bbox = None
+        image_filled = None
+        transparency_filled = None
+        if self._image_previous is not None:
+            delta, bbox = GifImagePlugin._getbbox(self._image_previous, image)
+
+            if not bbox:
+                # identical to the previous frame
+                self._frame_pending["encoderinfo"]["duration"] += duration
+                return
+
+            encoderinfo_filled = encoderinfo.copy()
+            image_filled = _fill_unchanged(image, delta, encoderinfo_filled)
+            if image_filled is image:
+                # no room for the transparency
+                image_filled = None
+            else:
+                transparency_filled = encoderinfo_filled["transparency"]
+
+        self._write_pending()
+
+        self._image_previous = image
+        self._frame_pending = {
+            "image": image,
+            "image_filled": image_filled,
+            "bbox": bbox,
+            "encoderinfo": encoderinfo,
+            "transparency_filled": transparency_filled,
+        }
+
+    def _finish(self) -> None:
+        """
+        Write the last frame and the trailer
+
+        :rtype: None
+        """
+
+        if self._frame_pending is None:
+            raise ValueError("No frame is added")
+
+        self._write_pending()
+        self._fp.write(b";")  # end of file
+
+    def _write_pending(self) -> None:
+        """
+        Write the frame waiting
+
+        :rtype: None
+        """
+
+        if self._frame_pending is None:
+            return
+
+        image = self._frame_pending["image"]
+        bbox = self._frame_pending["bbox"]
+        encoderinfo = self._frame_pending["encoderinfo"]
+
+        if not bbox:
+            # first frame; global header
+            for header in GifImagePlugin._get_global_header(
+                image, encoderinfo
+            ):
+                self._fp.write(header)
+            GifImagePlugin._write_frame_data(
+                self._fp, image, (0, 0), encoderinfo
+            )
+        else:
+            # only the changed box
+            data = _encode_box(image, bbox, encoderinfo, self.palette)
+
+            image_filled = self._frame_pending["image_filled"]
+            if image_filled is not None:
+                encoderinfo_filled = encoderinfo.copy()
+                encoderinfo_filled["transparency"] = self._frame_pending[
+                    "transparency_filled"
+                ]
+                data_filled = _encode_box(
+                    image_filled, bbox, encoderinfo_filled, self.palette
+                )
+                if len(data_filled) < len(data):
+                    data = data_filled
+
+            self._fp.write(data)
+
+        self._frame_pending = None
+        self.n_frames_written += 1
+
+
+class WebPWriter(AnimationWriter):
+    """
+    Animated WebP file written frame by frame
+
+    Each frame is encoded by libwebp as soon as it is added.
+    libwebp keeps the encoded frames until the end,
+        and identical consecutive frames are merged by it.
+    Gives the same file as Pillow's `Image.save(save_all=True)`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        loop: int = 0,
+        quality: int = 80,
+        lossless: bool = False,
+        method: int = 0,
+    ) -> None:
+        """
+        Open the file to write
+
+        :param str path: Path of the WebP file
+        :param int loop: Number of loops. 0 for infinite.
+        :param int quality: Quality of lossy compression, 0-100
+        :param bool lossless: Whether to compress losslessly
+        :param int method: Effort of compression, 0(fast)-6(slow)
+        """
+
+        if _webp is None or not hasattr(_webp, "WebPAnimEncoder"):
+            raise ValueError("Pillow is built without animated WebP support")
+
+        super().__init__(path, loop)
+
+        self.quality = quality
+        self.lossless = lossless
+        self.method = method
+
+        # created when the size is known
+        self._encoder = None
+
+        # start time of the next frame in milliseconds
+        self._timestamp = 0
+
+    def add_frame(self, image: Image.Image, duration: int) -> None:
+        """
+        Add a frame
+
+        :param Image.Image image: Image of the frame
+        :param int duration: Duration of the frame in milliseconds
+        :rtype: None
+        """
+
+        if image.mode not in ["RGB", "RGBA"]:
+            has_alpha = "A" in image.mode or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        if self._encoder is None:
+            # same keyframe interval as Pillow
+            kmin, kmax = (9, 17) if self.lossless else (3, 5)
+            self._encoder = _webp.WebPAnimEncoder(
+                image.size[0],
+                image.size[1],
+                0,  # background: transparent black
+                self.loop,
+                False,  # minimize_size
+                kmin,
+                kmax,
+                False,  # allow_mixed
+                False,  # verbose
+            )
+
+        # RGBX is faster to convert
+        rawmode = "RGBX" if image.mode == "RGB" else image.mode
+        self._encoder.add(
+            image.tobytes("raw", rawmode),
+            round(self._timestamp),
+            image.size[0],
+            image.size[1],
+            rawmode,
+            self.lossless,
+            self.quality,
+            100,  # alpha_quality
+            self.method,
+        )
+
+        self._timestamp += duration
+        self.n_frames_written += 1
+
+    def _finish(self) -> None:
+        """
+        Assemble the encoded frames and write them
+
+        :rtype: None
+        """
+
+        if self._encoder is None:
+            raise ValueError("No frame is added")
+
+        # end time of the last frame
+        self._encoder.add(
+            None,
+            round(self._timestamp),
+            0,
+            0,
+            "",
+            self.lossless,
+            self.quality,
+            100,
+            0,
+        )
+
+        data = self._encoder.assemble("", "", "")
+        if data is None:
+            raise OSError("Cannot write file as WebP")
+
+        self._fp.write(data)
+
+
+class ApngWriter(AnimationWriter):
+    """
+    APNG file written frame by frame
+
+    Gives the same file as Pillow's `Image.save(save_all=True)`:
+    - Only the box changed from the previous frame is written
+    - Identical consecutive frames are merged, adding up their durations
+
+    The number of frames is written in the header at the end,
+        so the file must be seekable.
+    """
+
+    def __init__(self, path: str, loop: int = 0) -> None:
+        """
+        Open the file to write
+
+        :param str path: Path of the PNG file
+        :param int loop: Number of loops. 0 for infinite.
+        """
+
+        super().__init__(path, loop)
+
+        # mode of all frames; decided by the first frame
+        self._mode: str | None = None
+
+        # frame waiting for identical frames to merge
+        self._frame_pending: dict[str, Any] | None = None
+
+        # last frame added
+        self._image_previous: Image.Image | None = None
+
+        # sequence number of the next fcTL and fdAT chunks
+        self._sequence_number = 0
+
+        # position of the animation control chunk, rewritten at the end
+        self._animation_control_position: int | None = None
+
+    def add_frame(self, image: Image.Image, duration: int) -> None:
+        """
+        Add a frame
+
+        :param Image.Image image: Image of the frame
+        :param int duration: Duration of the frame in milliseconds
+        :rtype: None
+        """
+
+        if self._mode is None:
+            has_alpha = "A" in image.mode or "transparency" in image.info
+            self._mode = "RGBA" if has_alpha else "RGB"
+        if image.mode != self._mode:
+            image = image.convert(self._mode)
+
+        bbox = None
+        if self._image_previous is not None:
+            delta = ImageChops.subtract_modulo(
+                image.convert("RGBA"), self._image_previous.convert("RGBA")
+            )
+            bbox = delta.getbbox(alpha_only=False)
+
+            if not bbox:
+                # identical to the previous frame
+                self._frame_pending["duration"] += duration
+                return
+
+        self._write_pending()
+
+        self._image_previous = image
+        self._frame_pending = {
+            "image": image,
+            "bbox": bbox,
+            "duration": duration,
+        }
+
+    def _finish(self) -> None:
+        """
+        Write the last frame and the trailer,
+            and the number of frames in the header
+
+        :rtype: None
+        """
+
+        if self._frame_pending is None:
+            raise ValueError("No frame is added")
+
+        self._write_pending()
+        PngImagePlugin.putchunk(self._fp, b"IEND", b"")
+
+        # now the number of frames is known
+        self._fp.seek(self._animation_control_position)
+        self._write_animation_control()
+        self._fp.seek(0, os.SEEK_END)
+
+    def _write_pending(self) -> None:
+        """
+        Write the frame waiting
+
+        :rtype: None
+        """
+
+        if self._frame_pending is None:
+            return
+
+        image = self._frame_pending["image"]
+        bbox = self._frame_pending["bbox"]
+        duration = self._frame_pending["duration"]
+        rawmode, mode_bytes = PngImagePlugin._OUTMODES[self._mode]
+
+        if self.n_frames_written == 0:
+            self._write_header(image.size, mode_bytes)
+
+        if not bbox:
+            bbox = (0, 0) + image.size
+        else:
+            image = image.crop(bbox)
+
+        # frame control
+        PngImagePlugin.putchunk(
+            self._fp,
+            b"fcTL",
+            o32(self._sequence_number),
+            o32(image.size[0]),  # width
+            o32(image.size[1]),  # height
+            o32(bbox[0]),  # x offset
+            o32(bbox[1]),  # y offset
+            o16(int(round(duration))),  # delay numerator
+            o16(1000),  # delay denominator
+            o8(PngImagePlugin.Disposal.OP_NONE),
+            o8(PngImagePlugin.Blend.OP_SOURCE),
+        )
+        self._sequence_number += 1
+
+        # frame data
+        tile = [("zip", (0, 0) + image.size, 0, rawmode)]
+        if self.n_frames_written == 0:
+            # first frame in IDAT for the viewers without APNG support
+            ImageFile._save(
+                image,
+                PngImagePlugin._idat(self._fp, PngImagePlugin.putchunk),
+                tile,
+            )
+        else:
+            frame_data = PngImagePlugin._fdat(
+                self._fp, PngImagePlugin.putchunk, self._sequence_number
+            )
+            ImageFile._save(image, frame_data, tile)
+            self._sequence_number = frame_data.seq_num
+
+        self._frame_pending = None
+        self.n_frames_written += 1
+
+    def _write_header(self, size: tuple[int, int], mode_bytes: bytes) -> None:
+        """
+        Write the signature, the image header,
+            and the animation control to be rewritten
+
+        :param tuple[int,int] size: Size of the image
+        :param bytes mode_bytes: Bit depth and color type
+        :rtype: None
+        """
+
+        self._fp.write(PngImagePlugin._MAGIC)
+        PngImagePlugin.putchunk(
+            self._fp,
+            b"IHDR",
+            o32(size[0]),
+            o32(size[1]),
+            mode_bytes,
+            b"\0",  # compression
+            b"\0",  # filter
+            b"\0",  # interlace
+        )
+
+        self._animation_control_position = self._fp.tell()
+        self._write_animation_control()
+
+    def _write_animation_control(self) -> None:
+        """
+        Write the animation control chunk with the frames written
+
+        :rtype: None
+        """
+
+        PngImagePlugin.putchunk(
+            self._fp,
+            b"acTL",
+            o32(self.n_frames_written),  # number of frames
+            o32(self.loop),  # number of plays
+        )
+
+
+class SaveAllWriter(AnimationWriter):
+    """
+    Animation file saved by Pillow's `Image.save(save_all=True)` at the end
+
+    Used instead of the other writers
+        if the Pillow installed is not of the versions checked,
+        as they use its private API.
+    Frames are kept until the end.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        animation_format: str,
+        loop: int = 0,
+        palette: list[int] = None,
+    ) -> None:
+        """
+        Open the file to write
+
+        :param str path: Path of the animation file
+        :param str animation_format: "gif", "webp" or "apng"
+        :param int loop: Number of loops. 0 for infinite.
+        :param list[int] palette: Global palette of GIF as [r, g, b, ...].
+            Frames are expected to be in this palette already.
+        """
+
+        super().__init__(path, loop)
+
+        self.animation_format = animation_format
+        self.palette = palette
+
+        # kept until the end
+        self._images: list[Image.Image] = []
+        self._durations: list[int] = []
+
+    def add_frame(self, image: Image.Image, duration: int) -> None:
+        """
+        Add a frame
+
+        :param Image.Image image: Image of the frame
+        :param int duration: Duration of the frame in milliseconds
+        :rtype: None
+        """
+
+        self._images.append(image)
+        self._durations.append(duration)
+
+    def _finish(self) -> None:
+        """
+        Save all the frames
+
+        :rtype: None
+        """
+
+        if len(self._images) == 0:
+            raise ValueError("No frame is added")
+
+        params = {}
+        if self.animation_format == "gif" and self.palette is not None:
+            # keep the global palette
+            params["optimize"] = False
+
+        self._images[0].save(
+            self._fp,
+            format=_PILLOW_FORMATS[self.animation_format],
+            save_all=True,
+            append_images=self._images[1:],
+            duration=self._durations,
+            loop=self.loop,
+            **params,
+        )
+        self.n_frames_written = len(self._images)
+
+
+def create_animation_writer(
+    path: str,
+    animation_format: str = "auto",
+    loop: int = 0,
+    palette: list[int] = None,
+) -> AnimationWriter:
+    """
+    Create the writer of the format
+
+    :param str path: Path of the animation file
+    :param str animation_format: "gif", "webp" or "apng".
+        "auto" decides by the extension of the path, GIF if unknown.
+    :param int loop: Number of loops. 0 for infinite.
+    :param list[int] palette: Global palette of GIF as [r, g, b, ...].
+        Ignored by the other formats.
+    :return: Writer opened.
+        `SaveAllWriter` if the Pillow installed is not of the versions checked.
+    :rtype: AnimationWriter
+    """
+
+    if animation_format == "auto":
+        extension = os.path.splitext(path)[1].lower()
+        animation_format = _FORMATS_OF_EXTENSION.get(extension, "gif")
+
+    if animation_format not in _PILLOW_VERSIONS_OF_FORMAT:
+        raise ValueError(
+            "Unknown animation format: {}".format(animation_format)
+        )
+
+    if not _can_use_pillow_internals(animation_format):
+        return SaveAllWriter(path, animation_format, loop, palette)
+
+    if animation_format == "gif":
+        return GifWriter(path, loop, palette)
+    elif animation_format == "webp":
+        return WebPWriter(path, loop)
+    else:
+        return ApngWriter(path, loop)
+
+
+def _can_use_pillow_internals(animation_format: str) -> bool:
+    """
+    Check if the writer of the format can use the Pillow installed
+
+    :param str animation_format: "gif", "webp" or "apng"
+    :return: True if the version of Pillow is checked,
+        and the private API is found
+    :rtype: bool
+    """
+
+    first, last = _PILLOW_VERSIONS_OF_FORMAT[animation_format]
+    if not first <= _PILLOW_VERSION < last or o8 is None:
+        return False
+
+    if animation_format == "webp":
+        return _webp is not None and hasattr(_webp, "WebPAnimEncoder")
+
+    return True
+
+
+def _encode_box(
+    image: Image.Image,
+    bbox: tuple[int, int, int, int],
+    encoderinfo: dict[str, Any],
+    palette: list[int] | None,
+) -> bytes:
+    """
+    Encode the box of the frame as a GIF image block
+
+    :param Image.Image image: Image of the whole frame in palette
+    :param tuple[int,int,int,int] bbox: Box to write
+    :param dict[str,Any] encoderinfo: Info of the frame
+    :param list[int]|None palette: Global palette.
+        If None, the block has its own color table.
+    :return: Encoded block
+    :rtype: bytes
+    """
+
+    encoderinfo = encoderinfo.copy()
+    if palette is None:
+        encoderinfo["include_color_table"] = True
+
+    buffer = io.BytesIO()
+    GifImagePlugin._write_frame_data(
+        buffer, image.crop(bbox), bbox[:2], encoderinfo
+    )
+
+    return buffer.getvalue()
+
+
+def _fill_unchanged(
+    image: Image.Image, delta: Image.Image, encoderinfo: dict[str, Any]
+) -> Image.Image:
+    """
+    Make the pixels unchanged from the previous frame transparent,
+        if the palette has a room for it
+
+    Same pixels as Pillow fills.
+
+    :param Image.Image image: Image in palette
+    :param Image.Image delta: Difference from the previous frame
+    :param dict[str,Any] encoderinfo: Info of the frame.
+        "transparency" is set if filled.
+    :return: Image filled. `image` itself if not filled.
+    :rtype: Image.Image
+    """
+
+    if image.mode == "1":
+        return image
+
+    if "transparency" not in encoderinfo:
+        try:
+            encoderinfo["transparency"] = image.palette._new_color_index(image)
+        except ValueError:
+            return image
+
+    # mask of the changed pixels
+    changed = np.asarray(delta) != 0
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+
+    pixels = np.array(image)
+    pixels[~changed] = encoderinfo["transparency"]
+    image_filled = image.copy()
+    image_filled.frombytes(pixels.tobytes())
+
+    return image_filled
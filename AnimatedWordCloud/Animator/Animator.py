@@ -10,17 +10,45 @@ Get the input and returns the output,
 """
 
 from __future__ import annotations
-from typing import Iterable
-from AnimatedWordCloud.Utils import Config, TimelapseWordVector
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+from tqdm import tqdm
+from AnimatedWordCloud.Utils import (
+    Config,
+    TimeFrame,
+    TimelapseWordVector,
+    AnimationStats,
+    measure_stage,
+    get_current_stats,
+)
 from AnimatedWordCloud.Animator.AllocationCalculator import allocate
-from AnimatedWordCloud.Animator.ImageCreator import create_images
-from AnimatedWordCloud.Animator.AnimationIntegrator import integrate_images
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator import (
+    allocate_all_iteratively,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.AnimatetdAllocationCalculator import (
+    animated_allocate_iteratively,
+)
+from AnimatedWordCloud.Animator.ImageCreator import (
+    create_images,
+    render_frames,
+    create_images_iteratively,
+)
+from AnimatedWordCloud.Animator.AnimationIntegrator import (
+    integrate_images,
+    integrate_images_iteratively,
+)
+
+if TYPE_CHECKING:
+    from AnimatedWordCloud.Animator.RendererPool import RendererPool
 
 
 def animate(
     word_vector_timelapse: Iterable[tuple[str, dict[str, float]]],
     config: Config = None,
     output_filename: str = "output.gif",
+    stats: AnimationStats = None,
+    renderer_pool: RendererPool = None,
 ) -> str:
     """
     Create an animation of word cloud,
@@ -35,6 +63,10 @@ def animate(
         which includes "name of the time(str)" and "word vector(Dict[str, float])"
     :param Config config: Configuration of the animation. If None, default config will be used.
     :param str output_filename: Filename of the animation file.
+        ".gif", ".webp" or ".png" decides the format, unless specified in config.
+    :param AnimationStats stats: Records time of each stage and counters of the process, if given.
+    :param RendererPool renderer_pool: Workers to render the frames with, if given.
+        Reusing a pool across calls skips starting the processes.
     :return: The path of the animation file.
     :rtype: str
     """
@@ -43,6 +75,40 @@ def animate(
     if config is None:
         config = Config()
 
+    with stats.activate() if stats is not None else nullcontext():
+        if config.streaming:
+            animation_path = _animate_streaming(
+                word_vector_timelapse, config, output_filename, renderer_pool
+            )
+        else:
+            animation_path = _animate_all(
+                word_vector_timelapse, config, output_filename, renderer_pool
+            )
+
+    if config.verbosity == "minor" or config.verbosity == "debug":
+        _success_message(animation_path)
+
+    return animation_path
+
+
+def _animate_all(
+    word_vector_timelapse: Iterable[tuple[str, dict[str, float]]],
+    config: Config,
+    output_filename: str,
+    renderer_pool: RendererPool = None,
+) -> str:
+    """
+    Create an animation, finishing each stage for all frames at once
+
+    :param Iterable[tuple[str, dict[str, float]]] word_vector_timelapse:
+        Timelapse data of word vectors.
+    :param Config config: Configuration of the animation.
+    :param str output_filename: Filename of the animation file.
+    :param RendererPool renderer_pool: Workers to render with, if given.
+    :return: The path of the animation file.
+    :rtype: str
+    """
+
     # convert data to TimelapseWordVector
     timelapse_word_vector = TimelapseWordVector.convert_from_dicts_list(
         word_vector_timelapse
@@ -52,19 +118,131 @@ def animate(
     allocation_timelapse = allocate(timelapse_word_vector, config)
 
     # to images
-    image_paths = create_images(allocation_timelapse, config)
+    if config.save_intermediate_frames:
+        with measure_stage("create_images"):
+            images = create_images(allocation_timelapse, config)
+    else:
+        # rendered lazily while integrated,
+        #   so only a batch of frames is kept in memory
+        images = _TimedIterator(
+            render_frames(
+                allocation_timelapse, config, renderer_pool=renderer_pool
+            )
+        )
 
     # to one animation file
+    time_start = time.perf_counter()
     animation_path = integrate_images(
-        image_paths, allocation_timelapse, config, filename=output_filename
+        images,
+        allocation_timelapse,
+        config,
+        filename=output_filename,
     )
+    time_total = time.perf_counter() - time_start
 
-    if config.verbosity == "minor" or config.verbosity == "debug":
-        _success_message(animation_path)
+    # stages run interleaved if rendered lazily; exclude time of rendering
+    stats = get_current_stats()
+    if stats is not None:
+        time_rendering = 0.0
+        if isinstance(images, _TimedIterator):
+            time_rendering = images.seconds
+            stats.add_stage_time("create_images", time_rendering)
+        stats.add_stage_time("integrate_images", time_total - time_rendering)
+
+    return animation_path
+
+
+def _animate_streaming(
+    word_vector_timelapse: Iterable[tuple[str, dict[str, float]]],
+    config: Config,
+    output_filename: str,
+    renderer_pool: RendererPool = None,
+) -> str:
+    """
+    Create an animation, passing each frame through all stages
+
+    The input is read lazily,
+        and only a few frames are kept in memory at a time.
+
+    :param Iterable[tuple[str, dict[str, float]]] word_vector_timelapse:
+        Timelapse data of word vectors. Can be a generator.
+    :param Config config: Configuration of the animation.
+    :param str output_filename: Filename of the animation file.
+    :param RendererPool renderer_pool: Workers to render with, if given.
+    :return: The path of the animation file.
+    :rtype: str
+    """
+
+    # convert data to TimeFrame lazily
+    timeframes = (
+        TimeFrame.convert_from_tup_dict(word_weights)
+        for word_weights in word_vector_timelapse
+    )
+
+    # verbose for iteration
+    if config.verbosity in ["debug", "minor"]:
+        print("Start streaming iteration...")
+        timeframes = tqdm(timeframes)
+
+    # chain the stages, timing each
+    static_frames = _TimedIterator(
+        allocate_all_iteratively(timeframes, config)
+    )
+    frames = _TimedIterator(
+        animated_allocate_iteratively(static_frames, config)
+    )
+    image_frames = _TimedIterator(
+        create_images_iteratively(frames, config, renderer_pool=renderer_pool)
+    )
+
+    time_start = time.perf_counter()
+    animation_path = integrate_images_iteratively(
+        image_frames, config, filename=output_filename
+    )
+    time_total = time.perf_counter() - time_start
+
+    # stages run interleaved; exclude time of the stages consumed
+    stats = get_current_stats()
+    if stats is not None:
+        stats.add_stage_time("static_allocation", static_frames.seconds)
+        stats.add_stage_time(
+            "animated_allocation", frames.seconds - static_frames.seconds
+        )
+        stats.add_stage_time(
+            "create_images", image_frames.seconds - frames.seconds
+        )
+        stats.add_stage_time(
+            "integrate_images", time_total - image_frames.seconds
+        )
 
     return animation_path
 
 
+class _TimedIterator:
+    """
+    Iterator recording the wall time spent to get the items,
+        including the time of the iterators it consumes
+    """
+
+    def __init__(self, iterable: Iterable) -> None:
+        """
+        :param Iterable iterable: Iterable to wrap
+        """
+
+        self.iterator = iter(iterable)
+        self.seconds = 0.0
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self) -> Any:
+        time_start = time.perf_counter()
+        try:
+            return next(self.iterator)
+        finally:
+            self.seconds += time.perf_counter() - time_start
+
+
 def _success_message(animation_path: str) -> None:
     """
     print success message.
@@ -10,17 +10,42 @@ Create images of each frame
 
 from __future__ import annotations
 import os
+import shutil
+import tempfile
+import contextlib
 import hashlib
+import functools
+import itertools
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
 import numpy as np
 import matplotlib.pyplot as plt
 import joblib
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw
 from AnimatedWordCloud.Utils import (
     ensure_directory_exists,
     Config,
     AllocationTimelapse,
     AllocationInFrame,
+    AnimationStats,
+    get_current_stats,
+    call_with_stats,
+    get_font,
+    quantize_font_size,
 )
+from AnimatedWordCloud.Utils.Consts import FRAMES_BUFFER_SIZE
+from AnimatedWordCloud.Animator.SpriteRenderer import render_frame_with_sprites
+
+if TYPE_CHECKING:
+    from AnimatedWordCloud.Animator.RendererPool import RendererPool
+
+# number of colors in a palette
+_PALETTE_SIZE = 256
+
+# shades from the background to each color at least, for anti-aliasing
+_MIN_SHADES = 4
+
+# iterations of k-means reducing the colors of the words
+_N_CLUSTERING_ITERATIONS = 10
 
 
 class colormap_color_func(object):
@@ -53,26 +78,244 @@ class colormap_color_func(object):
         return "rgb({:.0f}, {:.0f}, {:.0f})".format(r, g, b)
 
 
-def create_image(
+def get_global_palette(
+    config: Config, color_table: dict[str, tuple[int, int, int]] = None
+) -> Image.Image | None:
+    """
+    Get the palette shared by all frames, if `config.gif_palette` is "global"
+
+    Made of the background color, the colors of the words
+        and the time stamp color,
+        with shades from the background to each color for anti-aliasing
+        as many as the palette has room for.
+    If the colors of the words are too many to have `_MIN_SHADES` shades each,
+        they are clustered to representatives.
+
+    :param Config config: Config instance
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word of the whole animation.
+        See `get_color_table()`.
+        If None(default), every color of `config.color_map`, as `colormap_color_func` gives.
+    :return: Image of mode "P" having the palette.
+        None if `config.gif_palette` is "adaptive".
+    :rtype: Image.Image|None
+    """
+
+    if config.gif_palette == "adaptive":
+        return None
+    elif config.gif_palette != "global":
+        raise ValueError("Unknown gif_palette: {}".format(config.gif_palette))
+
+    background = ImageColor.getrgb(config.background_color)[:3]
+
+    if color_table is None:
+        word_colors = _get_colormap_colors(config.color_map)
+    else:
+        word_colors = sorted(set(color_table.values()))
+
+    other_colors = []
+    if config.drawing_time_stamp:
+        other_colors.append(ImageColor.getrgb(config.time_stamp_color)[:3])
+    other_colors = [color for color in other_colors if color != background]
+
+    word_colors = [
+        color
+        for color in dict.fromkeys(word_colors)
+        if color != background and color not in other_colors
+    ]
+    n_word_colors = (_PALETTE_SIZE - 1) // _MIN_SHADES - len(other_colors)
+    if len(word_colors) > n_word_colors:
+        word_colors = _cluster_colors(word_colors, n_word_colors)
+    text_colors = word_colors + other_colors
+
+    # shades from the background to the color, including the color
+    n_shades = max(1, (_PALETTE_SIZE - 1) // max(1, len(text_colors)))
+    colors = [background]
+    for color in text_colors:
+        for shade in range(1, n_shades + 1):
+            colors.append(
+                tuple(
+                    round(
+                        value_background
+                        + (value - value_background) * shade / n_shades
+                    )
+                    for value_background, value in zip(background, color)
+                )
+            )
+    colors = list(dict.fromkeys(colors))[:_PALETTE_SIZE]
+
+    palette = Image.new("P", (1, 1))
+    palette.putpalette([value for color in colors for value in color])
+
+    return palette
+
+
+def _cluster_colors(
+    colors: list[tuple[int, int, int]], n_clusters: int
+) -> list[tuple[int, int, int]]:
+    """
+    Reduce the colors to representatives by k-means
+
+    Started from the colors sampled evenly, so the result is deterministic.
+
+    :param list[tuple[int,int,int]] colors: RGB colors, distinct
+    :param int n_clusters: Number of representatives
+    :return: Mean color of each cluster
+    :rtype: list[tuple[int, int, int]]
+    """
+
+    points = np.array(colors, dtype=np.float64)
+    indices = np.linspace(0, len(points) - 1, n_clusters).round().astype(int)
+    centers = points[indices]
+
+    for _ in range(_N_CLUSTERING_ITERATIONS):
+        distances = ((points[:, np.newaxis] - centers) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        for cnt in range(n_clusters):
+            members = points[labels == cnt]
+            if len(members) > 0:
+                centers[cnt] = members.mean(axis=0)
+
+    return list(
+        dict.fromkeys(
+            tuple(int(value) for value in center) for center in centers.round()
+        )
+    )
+
+
+def _get_colormap_colors(color_map: str) -> list[tuple[int, int, int]]:
+    """
+    Get every color `colormap_color_func` gives
+
+    :param str color_map: Name of the matplotlib colormap
+    :return: RGB colors, same rounding as `colormap_color_func`
+    :rtype: list[tuple[int, int, int]]
+    """
+
+    color_map = plt.get_cmap(name=color_map)
+
+    # integers index the colors of the colormap
+    colors = []
+    for rgba in color_map(np.arange(color_map.N)):
+        r, g, b, _ = np.maximum(0, 255 * rgba)
+        colors.append(
+            (
+                int("{:.0f}".format(r)),
+                int("{:.0f}".format(g)),
+                int("{:.0f}".format(b)),
+            )
+        )
+
+    return colors
+
+
+def get_color_table(
+    frames: Iterable[tuple[str, AllocationInFrame]],
+    config: Config,
+    color_func=None,
+    color_table: dict[str, tuple[int, int, int]] = None,
+) -> dict[str, tuple[int, int, int]]:
+    """
+    Get the color of each word in the frames
+
+    The color function is called once per word,
+        with the font size and position of its first appearance.
+    Renderers look the colors up
+        instead of calling the color function for every draw.
+
+    :param Iterable[tuple[str,AllocationInFrame]] frames:
+        (time name, allocation) of each frame
+    :param Config config: Config instance
+    :param object color_func:  Custom function for color mapping, default is None.
+    :param dict[str,tuple[int,int,int]] color_table: Table to add the new words to.
+        Words already in it are not colored again.
+        If None(default), a new table is made.
+    :return: word -> RGB
+    :rtype: dict[str, tuple[int, int, int]]
+    """
+
+    if color_func is None:
+        color_func = colormap_color_func(config.color_map)
+
+    if color_table is None:
+        color_table = {}
+
+    for _, allocation_in_frame in frames:
+        for word, (font_size, position) in allocation_in_frame.words.items():
+            if word in color_table:
+                continue
+
+            color = color_func(
+                word=word, font_size=font_size, position=position
+            )
+            if isinstance(color, str):
+                # same parsing as Pillow does for `fill`
+                color = ImageColor.getcolor(color, "RGB")
+            color_table[word] = tuple(color[:3])
+
+    return color_table
+
+
+def render_frame(
     allocation_in_frame: AllocationInFrame,
     config: Config,
-    frame_number: int,
     time_name: str,
     color_func=None,
-) -> tuple[int, str]:
+    palette: Image.Image = None,
+    color_table: dict[str, tuple[int, int, int]] = None,
+) -> Image.Image:
     """
-    Create image of a frame
+    Render image of a frame in memory
 
     :param AllocationInFrame allocation_in_frame: Position/size data of a video frame.
     :param Config config: Config instance
-    :param int frame_number: Number of the frame. Used for filename
     :param str time_name: Name of the time. Used for time stamp
     :param object color_func:  Custom function for color mapping, default is None.
-    :return: (frame_number, save_path)
-    :rtype: tuple[int, str]
+        Ignored if `color_table` is given.
+    :param Image.Image palette: Palette to convert the image to. See `get_global_palette()`.
+        If None(default), the image is kept in RGB.
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word. See `get_color_table()`.
+        If None(default), made from `color_func` for this frame.
+    :return: Image of the frame
+    :rtype: Image.Image
+    """
+    if color_table is None:
+        color_table = get_color_table(
+            [(time_name, allocation_in_frame)], config, color_func
+        )
+
+    if config.renderer == "pillow":
+        image = _render_frame_pillow(
+            allocation_in_frame, config, time_name, color_table
+        )
+    elif config.renderer in ["sprite", "scaled_sprite"]:
+        image = render_frame_with_sprites(
+            allocation_in_frame, config, time_name, color_table
+        )
+    else:
+        raise ValueError("Unknown renderer: {}".format(config.renderer))
+
+    if palette is not None:
+        image = image.quantize(palette=palette, dither=Image.Dither.NONE)
+
+    return image
+
+
+def _render_frame_pillow(
+    allocation_in_frame: AllocationInFrame,
+    config: Config,
+    time_name: str,
+    color_table: dict[str, tuple[int, int, int]],
+) -> Image.Image:
+    """
+    Render image of a frame by drawing each word with Pillow
+
+    :param AllocationInFrame allocation_in_frame: Position/size data of a video frame.
+    :param Config config: Config instance
+    :param str time_name: Name of the time. Used for time stamp
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word
+    :return: RGB image of the frame
+    :rtype: Image.Image
     """
-    if color_func is None:
-        color_func = colormap_color_func(config.color_map)
 
     image = Image.new(
         "RGB",
@@ -86,18 +329,20 @@ def create_image(
     for word, position in allocation_in_frame_word_dict.items():
         font_size = position[0]
         (x, y) = position[1]
-        font = ImageFont.truetype(config.font_path, font_size)
+        font = get_font(
+            config.font_path,
+            quantize_font_size(font_size, config.font_size_quantization),
+        )
         draw.text(
             (x, y),
             word,
-            fill=color_func(word=word, font_size=font_size, position=(x, y)),
+            fill=color_table[word],
             font=font,
         )
 
     # draw time stamp
     if config.drawing_time_stamp:
-        font_size = config.time_stamp_font_size
-        font = ImageFont.truetype(config.font_path, font_size)
+        font = get_font(config.font_path, config.time_stamp_font_size)
         draw.text(
             config.time_stamp_position,
             time_name,
@@ -105,6 +350,42 @@ def create_image(
             font=font,
         )
 
+    return image
+
+
+def create_image(
+    allocation_in_frame: AllocationInFrame,
+    config: Config,
+    frame_number: int,
+    time_name: str,
+    color_func=None,
+    palette: Image.Image = None,
+    color_table: dict[str, tuple[int, int, int]] = None,
+) -> tuple[int, str]:
+    """
+    Create image of a frame, and save it as PNG
+
+    :param AllocationInFrame allocation_in_frame: Position/size data of a video frame.
+    :param Config config: Config instance
+    :param int frame_number: Number of the frame. Used for filename
+    :param str time_name: Name of the time. Used for time stamp
+    :param object color_func:  Custom function for color mapping, default is None.
+        Ignored if `color_table` is given.
+    :param Image.Image palette: Palette to convert the image to. See `get_global_palette()`.
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word. See `get_color_table()`.
+    :return: (frame_number, save_path)
+    :rtype: tuple[int, str]
+    """
+
+    image = render_frame(
+        allocation_in_frame,
+        config,
+        time_name,
+        color_func,
+        palette,
+        color_table,
+    )
+
     # save the image
     filename = f"{config.intermediate_frames_id}_{frame_number}.png"
     save_path = os.path.join(config.output_path, filename)
@@ -119,7 +400,7 @@ def create_images(
     color_func=None,
 ) -> list[str]:
     """
-    Create images of each frame
+    Create images of each frame, and save them as PNG
 
     :param AllocationTimelapse position_in_frames: List of position/size data of each video frame.
     :param Config config: Config instance
@@ -133,30 +414,535 @@ def create_images(
 
     ensure_directory_exists(config.output_path)
 
-    image_paths = []
+    color_table = get_color_table(
+        position_in_frames.timelapse, config, color_func
+    )
+    palette = get_global_palette(config, color_table)
+
+    with _get_parallel(config) as parallel:
+        return _save_frames(
+            parallel,
+            position_in_frames.timelapse,
+            0,
+            config,
+            color_table,
+            palette,
+        )
+
+
+def render_frames(
+    position_in_frames: AllocationTimelapse,
+    config: Config,
+    color_func=None,
+    renderer_pool: RendererPool = None,
+) -> Iterator[Image.Image]:
+    """
+    Render images of each frame in memory
+
+    Rendered in parallel processes,
+        which write the pixels to memory shared with this process.
+    Images are yielded batch by batch as rendered,
+        so only a batch is kept in memory if consumed one by one.
+
+    :param AllocationTimelapse position_in_frames: List of position/size data of each video frame.
+    :param Config config: Config instance
+    :param object color_func:  Custom function for color mapping, default is None.
+    :param RendererPool renderer_pool: Workers to render with, kept after this call.
+        If None(default), processes are started for this call.
+    :return: RGB images, in order of the input
+    :rtype: Iterator[Image.Image]
+    """
 
-    verbosity = 0
     if config.verbosity in ["debug"]:
-        verbosity = 5
+        print("Rendering images of each frame...")
+
+    color_table = get_color_table(
+        position_in_frames.timelapse, config, color_func
+    )
+    palette = get_global_palette(config, color_table)
+
+    if renderer_pool is not None:
+        yield from renderer_pool.render_frames(
+            position_in_frames.timelapse, config, color_table, palette
+        )
+        return
+
+    with _get_parallel(config) as parallel:
+        yield from _render_frames_shared(
+            parallel,
+            position_in_frames.timelapse,
+            config,
+            color_table,
+            palette,
+        )
+
+
+def create_images_iteratively(
+    frames: Iterable[tuple[str, AllocationInFrame]],
+    config: Config,
+    color_func=None,
+    renderer_pool: RendererPool = None,
+) -> Iterator[tuple[AllocationInFrame, Image.Image | str]]:
+    """
+    Same as `create_images()` or `render_frames()`,
+        but frames are consumed and yielded one by one
+
+    Frames are created in parallel by chunks of
+        `config.n_frames_for_interpolation + 1` frames,
+        so only a chunk is kept at a time.
+    As the words are not known ahead,
+        the global palette is made of the colors of `config.color_map`.
+
+    :param Iterable[tuple[str,AllocationInFrame]] frames:
+        (time name, allocation) of each frame, in order
+    :param Config config: Config instance
+    :param object color_func:  Custom function for color mapping, default is None.
+    :param RendererPool renderer_pool: Workers to render in memory with, kept after this call.
+        Not used if `config.save_intermediate_frames`.
+        If None(default), processes are started for this call.
+    :return: (allocation, image) of each frame, in order.
+        The image is the path of the PNG if `config.save_intermediate_frames`,
+        otherwise the image in memory.
+    :rtype: Iterator[tuple[AllocationInFrame, Image.Image|str]]
+    """
+
+    if config.verbosity in ["debug"]:
+        print("Creating images of each frame...")
+
+    if config.save_intermediate_frames:
+        ensure_directory_exists(config.output_path)
+
+    chunk_size = config.n_frames_for_interpolation + 1
+    iterator = iter(frames)
+    frame_number_start = 0
+    color_table = {}
+    palette = get_global_palette(config)
+
+    # processes of joblib not started if the pool renders
+    parallel_context = _get_parallel(config)
+    if renderer_pool is not None and not config.save_intermediate_frames:
+        parallel_context = contextlib.nullcontext()
+
+    with parallel_context as parallel:
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if len(chunk) == 0:
+                break
+
+            # colors of the words appeared first
+            get_color_table(chunk, config, color_func, color_table)
+
+            if config.save_intermediate_frames:
+                images = _save_frames(
+                    parallel,
+                    chunk,
+                    frame_number_start,
+                    config,
+                    color_table,
+                    palette,
+                )
+            elif renderer_pool is not None:
+                images = renderer_pool.render_frames(
+                    chunk, config, color_table, palette
+                )
+            else:
+                images = _render_frames_shared(
+                    parallel, chunk, config, color_table, palette
+                )
+
+            for (_, allocation_in_frame), image in zip(chunk, images):
+                yield (allocation_in_frame, image)
+
+            frame_number_start += len(chunk)
+
+
+def _save_frames(
+    parallel: joblib.Parallel,
+    frames: list[tuple[str, AllocationInFrame]],
+    frame_number_start: int,
+    config: Config,
+    color_table: dict[str, tuple[int, int, int]],
+    palette: Image.Image | None,
+) -> list[str]:
+    """
+    Create images of the frames, and save them as PNG
+
+    :param joblib.Parallel parallel: Parallel to run with
+    :param list[tuple[str,AllocationInFrame]] frames:
+        (time name, allocation) of each frame
+    :param int frame_number_start: Number of the first frame
+    :param Config config: Config instance
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word
+    :param Image.Image|None palette: Palette to convert the images to.
+        See `get_global_palette()`.
+    :return: The path of the images, in order of the input
+    :rtype: list[str]
+    """
+
+    stats = get_current_stats()
+    function = _get_delayed(create_image, stats)
 
     # create images of each frame
-    result = joblib.Parallel(n_jobs=-1, verbose=verbosity)(
-        joblib.delayed(create_image)(
+    result = parallel(
+        function(
             allocation_in_frame=allocation_in_frame,
             config=config,
-            frame_number=frame_number,
-            color_func=color_func,
+            frame_number=frame_number_start + cnt,
             time_name=time_name,
+            palette=palette,
+            color_table=color_table,
         )
-        for frame_number, (time_name, allocation_in_frame) in enumerate(
-            position_in_frames.timelapse
-        )
+        for cnt, (time_name, allocation_in_frame) in enumerate(frames)
     )
 
+    result = _merge_stats(result, stats)
+
     # sort by frame number (ascending)
     result.sort(key=lambda x: x[0])
 
     # get only the path
-    image_paths = [path for _, path in result]
+    return [path for _, path in result]
+
+
+def _render_frames_shared(
+    parallel: joblib.Parallel,
+    frames: list[tuple[str, AllocationInFrame]],
+    config: Config,
+    color_table: dict[str, tuple[int, int, int]],
+    palette: Image.Image | None,
+) -> Iterator[Image.Image]:
+    """
+    Render images of the frames into memory shared with the processes
+
+    A memory-mapped file is shared,
+        so the pixels are not pickled back to this process.
+    The file holds a bounded number of frames,
+        reused by the batches of frames in turn.
+
+    :param joblib.Parallel parallel: Parallel to run with
+    :param list[tuple[str,AllocationInFrame]] frames:
+        (time name, allocation) of each frame
+    :param Config config: Config instance
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word
+    :param Image.Image|None palette: Palette to convert the images to.
+        See `get_global_palette()`.
+    :return: Images, in order of the input, yielded after each batch.
+        In the palette if given, otherwise RGB.
+    :rtype: Iterator[Image.Image]
+    """
+
+    stats = get_current_stats()
+    function = _get_delayed(_render_frame_to_buffer, stats)
+
+    n_frames_buffered = min(
+        len(frames), get_frames_buffer_capacity(config, palette)
+    )
+    if n_frames_buffered == 0:
+        return
+
+    with FramesBuffer(n_frames_buffered, config, palette) as frames_buffer:
+        for index_start in range(0, len(frames), n_frames_buffered):
+            batch = frames[index_start : index_start + n_frames_buffered]
+
+            result = parallel(
+                function(
+                    frames_buffer=frames_buffer,
+                    index=cnt,
+                    allocation_in_frame=allocation_in_frame,
+                    config=config,
+                    time_name=time_name,
+                    color_table=color_table,
+                    palette=palette,
+                )
+                for cnt, (time_name, allocation_in_frame) in enumerate(batch)
+            )
+
+            _merge_stats(result, stats)
+
+            # copied out before the next batch overwrites
+            for cnt in range(len(batch)):
+                yield frames_buffer.read(cnt, palette)
+
+
+class FramesBuffer:
+    """
+    Memory-mapped file of rendered frames, shared with the processes
+
+    Processes get this pickled, and open the same file,
+        so the pixels are not pickled between the processes.
+    The file is mapped only during each read and write,
+        so no mapping is left when it is removed;
+        Windows cannot remove a file mapped.
+
+    Use as a context manager, or call `close()` at the end.
+
+    :param int n_frames: Number of frames held
+    :param Config config: Config instance
+    :param Image.Image palette: Palette the frames are converted to, default is None.
+        If given, a byte of palette index per pixel.
+    """
+
+    def __init__(
+        self, n_frames: int, config: Config, palette: Image.Image = None
+    ) -> None:
+        self.frame_shape = _get_frame_shape(config, palette)
+        self.frame_size = int(np.prod(self.frame_shape))
+        self.n_frames = n_frames
+        self.path = _create_buffer_file(n_frames * self.frame_size)
+
+    def __enter__(self) -> FramesBuffer:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Remove the file
+
+        :rtype: None
+        """
+
+        if self.path is not None:
+            os.remove(self.path)
+            self.path = None
+
+    def write(self, index: int, image: Image.Image) -> None:
+        """
+        Write the frame
+
+        :param int index: Index of the frame in the buffer
+        :param Image.Image image: Image of the frame.
+            In the palette if the buffer is of palette indices, otherwise RGB.
+        :rtype: None
+        """
+
+        frame = self._map(index, "r+")
+        try:
+            frame[:] = np.asarray(image)
+        finally:
+            del frame
+
+    def read(self, index: int, palette: Image.Image = None) -> Image.Image:
+        """
+        Copy the frame out as an image
+
+        :param int index: Index of the frame in the buffer
+        :param Image.Image palette: Palette the frames are converted to, default is None.
+        :return: Image not referring to the buffer
+        :rtype: Image.Image
+        """
+
+        frame = self._map(index, "r")
+        try:
+            if palette is None:
+                image = Image.fromarray(frame, "RGB")
+            else:
+                # "P" refers to the array without copying
+                image = Image.fromarray(np.array(frame), "P")
+                image.putpalette(palette.getpalette())
+        finally:
+            del frame
+
+        return image
+
+    def _map(self, index: int, mode: str) -> np.memmap:
+        """
+        Map a frame of the file
+
+        :param int index: Index of the frame in the buffer
+        :param str mode: Mode of `np.memmap`
+        :return: Array of the frame, to be deleted after use
+        :rtype: np.memmap
+        """
+
+        return np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode=mode,
+            shape=self.frame_shape,
+            offset=index * self.frame_size,
+        )
+
+
+def get_frames_buffer_capacity(
+    config: Config, palette: Image.Image = None
+) -> int:
+    """
+    Get the number of frames a `FramesBuffer` holds at most
+
+    :param Config config: Config instance
+    :param Image.Image palette: Palette the frames are converted to, default is None.
+    :return: Number of frames within `FRAMES_BUFFER_SIZE`, at least 1
+    :rtype: int
+    """
+
+    frame_size = int(np.prod(_get_frame_shape(config, palette)))
+
+    return max(1, FRAMES_BUFFER_SIZE // frame_size)
+
+
+def _get_frame_shape(
+    config: Config, palette: Image.Image = None
+) -> tuple[int, ...]:
+    """
+    Get the shape of a frame in the buffer
+
+    :param Config config: Config instance
+    :param Image.Image palette: Palette the frames are converted to, default is None.
+    :return: (y, x, RGB), or (y, x) if `palette` is given
+    :rtype: tuple[int, ...]
+    """
+
+    # a byte per pixel in palette
+    shape = (config.image_height, config.image_width)
+    if palette is None:
+        shape += (3,)
+
+    return shape
+
+
+def _create_buffer_file(size: int) -> str:
+    """
+    Create a file of the size for memory mapping
+
+    Put on RAM if there is room, otherwise in the temporary folder.
+
+    :param int size: Size in bytes
+    :return: Path of the file
+    :rtype: str
+    """
+
+    folders = [None]
+    folder_shared = _get_shared_memory_folder(size)
+    if folder_shared is not None:
+        folders.insert(0, folder_shared)
+
+    for folder in folders:
+        file_descriptor, path = tempfile.mkstemp(suffix=".mmap", dir=folder)
+        try:
+            if hasattr(os, "posix_fallocate"):
+                # reserved now, so running out of space is an error here
+                #   rather than SIGBUS when the memory is written
+                os.posix_fallocate(file_descriptor, 0, size)
+            else:
+                os.ftruncate(file_descriptor, size)
+        except OSError:
+            os.close(file_descriptor)
+            os.remove(path)
+            if folder is None:
+                raise
+            continue
+
+        os.close(file_descriptor)
+        return path
+
+
+def _render_frame_to_buffer(
+    frames_buffer: FramesBuffer,
+    index: int,
+    allocation_in_frame: AllocationInFrame,
+    config: Config,
+    time_name: str,
+    color_table: dict[str, tuple[int, int, int]],
+    palette: Image.Image = None,
+) -> int:
+    """
+    Render image of a frame, and write it to the buffer
+
+    :param FramesBuffer frames_buffer: Buffer to write to
+    :param int index: Index of the frame in the buffer
+    :param AllocationInFrame allocation_in_frame: Position/size data of a video frame.
+    :param Config config: Config instance
+    :param str time_name: Name of the time. Used for time stamp
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word
+    :param Image.Image palette: Palette to convert the image to, default is None.
+    :return: index
+    :rtype: int
+    """
+
+    image = render_frame(
+        allocation_in_frame,
+        config,
+        time_name,
+        palette=palette,
+        color_table=color_table,
+    )
+    frames_buffer.write(index, image)
+
+    return index
+
+
+def _get_shared_memory_folder(size: int) -> str | None:
+    """
+    Get the folder on RAM to put the memory-mapped files
+
+    :param int size: Size of the file in bytes
+    :return: "/dev/shm" if available and has room for the size.
+        None if not.
+    :rtype: str|None
+    """
+
+    folder = "/dev/shm"
+    if not (os.path.isdir(folder) and os.access(folder, os.W_OK)):
+        return None
+
+    # small in containers, such as 64MB by default of Docker
+    if shutil.disk_usage(folder).free < size:
+        return None
+
+    return folder
+
+
+def _get_parallel(config: Config) -> joblib.Parallel:
+    """
+    Get Parallel to create images with
+
+    :param Config config: Config instance
+    :return: Parallel using all CPUs
+    :rtype: joblib.Parallel
+    """
+
+    verbosity = 0
+    if config.verbosity in ["debug"]:
+        verbosity = 5
+
+    return joblib.Parallel(n_jobs=-1, verbose=verbosity)
+
+
+def _get_delayed(function: Callable, stats: AnimationStats | None) -> Callable:
+    """
+    Get the function delayed for joblib,
+        returning stats of the process too if recording
+
+    :param Callable function: Function to run in the processes
+    :param AnimationStats|None stats: Stats of this process
+    :return: Delayed function
+    :rtype: Callable
+    """
+
+    # stats of each process are merged after
+    if stats is None:
+        return joblib.delayed(function)
+    else:
+        return functools.partial(joblib.delayed(call_with_stats), function)
+
+
+def _merge_stats(result: list, stats: AnimationStats | None) -> list:
+    """
+    Merge stats returned from each process, if recording
+
+    :param list result: Results of the function,
+        with stats if recording
+    :param AnimationStats|None stats: Stats of this process
+    :return: Results of the function
+    :rtype: list
+    """
+
+    if stats is None:
+        return result
+
+    for _, stats_frame in result:
+        stats.merge(stats_frame)
 
-    return image_paths
+    return [frame_result for frame_result, _ in result]
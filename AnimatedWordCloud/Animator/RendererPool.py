@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Pool of worker processes rendering frames, kept across animations
+
+Starting processes and pickling the config and colors for every frame
+    may cost more than rendering short animations.
+Workers of the pool are started once,
+    holding the config, the fonts and the color table,
+    and frames are sent by chunks.
+Colors are sent to the workers only until every worker holds them.
+Caches of each worker (fonts, sprites) stay warm for the next animation.
+"""
+
+from __future__ import annotations
+import math
+import os
+import threading
+from collections import ChainMap, deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Any, Iterator
+from PIL import Image
+from AnimatedWordCloud.Utils import (
+    Config,
+    AllocationInFrame,
+    AnimationStats,
+    get_current_stats,
+    call_with_stats,
+    get_font,
+    quantize_font_size,
+)
+from AnimatedWordCloud.Animator.ImageCreator import (
+    get_global_palette,
+    render_frame,
+    FramesBuffer,
+    get_frames_buffer_capacity,
+)
+
+# state of a worker process, set by `_initialize_worker()`
+_worker_config: Config | None = None
+_worker_color_table: dict[str, tuple[int, int, int]] = {}
+
+
+class RendererPool:
+    """
+    Worker processes rendering frames, reusable across `animate()` calls
+
+    Workers start at the first animation rendered,
+        or at construction if `config` is given.
+    Animations with another config are rendered too,
+        sending the config with each chunk.
+
+    Use as a context manager, or call `close()` at the end.
+
+    :param Config config: Config to initialize the workers with, default is None.
+    :param dict[str,tuple[int,int,int]] color_table: Colors to initialize the workers with, default is None.
+        Colors not in it are sent with the chunks, and kept by the workers.
+    :param int n_workers: Number of processes. If None(default), number of CPUs.
+    :param int chunk_size: Frames sent to a worker at once.
+        If None(default), frames are split to two chunks per worker.
+    """
+
+    def __init__(
+        self,
+        config: Config = None,
+        color_table: dict[str, tuple[int, int, int]] = None,
+        n_workers: int = None,
+        chunk_size: int = None,
+    ) -> None:
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.config = None
+        # colors every worker holds
+        self.color_table = {}
+        # process ID -> colors the worker holds, besides `color_table`
+        self._colors_held = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+        if config is not None:
+            self._start(config, color_table or {})
+
+    def __enter__(self) -> RendererPool:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the workers
+
+        The pool can be used again, starting new workers.
+
+        :rtype: None
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def render_frames(
+        self,
+        frames: list[tuple[str, AllocationInFrame]],
+        config: Config,
+        color_table: dict[str, tuple[int, int, int]],
+        palette: Image.Image = None,
+    ) -> Iterator[Image.Image]:
+        """
+        Render images of the frames in the workers
+
+        Pixels are written to memory shared with the workers,
+            holding a bounded number of chunks reused in turn.
+        Images are yielded chunk by chunk as rendered.
+
+        :param list[tuple[str,AllocationInFrame]] frames:
+            (time name, allocation) of each frame
+        :param Config config: Config instance
+        :param dict[str,tuple[int,int,int]] color_table: Color of each word.
+            See `get_color_table()`.
+        :param Image.Image palette: Palette to convert the images to.
+            If None(default), made from `color_table` by `get_global_palette()`.
+        :return: Images, in order of the input.
+            In the global palette if `config.gif_palette` is "global", otherwise RGB.
+        :rtype: Iterator[Image.Image]
+        """
+
+        if self._executor is None:
+            self._start(config, color_table)
+
+        # sent only if the workers do not have it
+        config_sent = None
+        if not _is_same_config(config, self.config):
+            config_sent = config
+
+        stats = get_current_stats()
+        if palette is None:
+            palette = get_global_palette(config, color_table)
+        capacity = get_frames_buffer_capacity(config, palette)
+        chunk_size = self._get_chunk_size(len(frames), capacity)
+        chunks = [
+            frames[index_start : index_start + chunk_size]
+            for index_start in range(0, len(frames), chunk_size)
+        ]
+        if len(chunks) == 0:
+            return
+
+        # the buffer holds a ring of chunks, reused in turn
+        n_slots = min(len(chunks), max(1, capacity // chunk_size))
+
+        with FramesBuffer(n_slots * chunk_size, config, palette) as buffer:
+            # (index of the first frame in the buffer, number of frames, future)
+            pending = deque()
+            try:
+                for cnt, chunk in enumerate(chunks):
+                    # slot freed by copying out the oldest chunk
+                    if len(pending) == n_slots:
+                        yield from self._collect_chunk(
+                            buffer, pending.popleft(), palette, stats
+                        )
+
+                    index_start = (cnt % n_slots) * chunk_size
+                    new_colors = self._get_new_colors(chunk, color_table)
+                    future = self._executor.submit(
+                        _render_chunk,
+                        buffer,
+                        index_start,
+                        chunk,
+                        new_colors,
+                        config_sent,
+                        palette,
+                        stats is not None,
+                    )
+                    pending.append(
+                        (index_start, len(chunk), new_colors, future)
+                    )
+
+                while len(pending) > 0:
+                    yield from self._collect_chunk(
+                        buffer, pending.popleft(), palette, stats
+                    )
+            finally:
+                # no worker writing when the buffer is removed
+                wait([future for _, _, _, future in pending])
+
+    def _start(
+        self, config: Config, color_table: dict[str, tuple[int, int, int]]
+    ) -> None:
+        """
+        Start the workers
+
+        :param Config config: Config to initialize the workers with
+        :param dict[str,tuple[int,int,int]] color_table: Colors to initialize the workers with
+        :rtype: None
+        """
+
+        self.config = config
+        self.color_table = dict(color_table)
+        self._colors_held = {}
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_initialize_worker,
+            initargs=(config, self.color_table),
+        )
+
+    def _get_chunk_size(self, n_frames: int, capacity: int) -> int:
+        """
+        Get the number of frames sent to a worker at once
+
+        Limited so as every worker has a chunk in the buffer.
+
+        :param int n_frames: Number of frames to render
+        :param int capacity: Frames the buffer can hold
+        :return: Chunk size
+        :rtype: int
+        """
+
+        chunk_size = self.chunk_size
+        if chunk_size is None:
+            chunk_size = math.ceil(n_frames / (self.n_workers * 2))
+
+        return max(1, min(chunk_size, capacity // self.n_workers))
+
+    def _get_new_colors(
+        self,
+        frames: list[tuple[str, AllocationInFrame]],
+        color_table: dict[str, tuple[int, int, int]],
+    ) -> dict[str, tuple[int, int, int]]:
+        """
+        Get the colors not every worker holds
+
+        :param list[tuple[str,AllocationInFrame]] frames:
+            (time name, allocation) of each frame
+        :param dict[str,tuple[int,int,int]] color_table: Color of each word
+        :return: word -> RGB, only the colors not in `self.color_table`
+        :rtype: dict[str, tuple[int, int, int]]
+        """
+
+        new_colors = {}
+        for _, allocation_in_frame in frames:
+            for word in allocation_in_frame.words:
+                color = color_table[word]
+                if self.color_table.get(word) != color:
+                    new_colors[word] = color
+
+        return new_colors
+
+    def _collect_chunk(
+        self,
+        frames_buffer: FramesBuffer,
+        pending_chunk: tuple[
+            int, int, dict[str, tuple[int, int, int]], Future
+        ],
+        palette: Image.Image | None,
+        stats: AnimationStats | None,
+    ) -> list[Image.Image]:
+        """
+        Wait for a chunk, and copy its frames out of the buffer
+
+        Colors the worker kept are recorded.
+
+        :param FramesBuffer frames_buffer: Buffer the chunk is written to
+        :param tuple[int,int,dict[str,tuple[int,int,int]],Future] pending_chunk:
+            (index of the first frame in the buffer, number of frames, colors sent, future)
+        :param Image.Image|None palette: Palette the frames are converted to
+        :param AnimationStats|None stats: Stats of this process
+        :return: Images of the chunk, in order
+        :rtype: list[Image.Image]
+        """
+
+        index_start, n_frames, new_colors, future = pending_chunk
+
+        process_id, colors_added, stats_chunk = future.result()
+        if stats is not None:
+            stats.merge(stats_chunk)
+            stats.count("render_chunks")
+
+        self._record_colors_held(process_id, colors_added)
+
+        return [
+            frames_buffer.read(index_start + cnt, palette)
+            for cnt in range(n_frames)
+        ]
+
+    def _record_colors_held(
+        self, process_id: int, colors_added: dict[str, tuple[int, int, int]]
+    ) -> None:
+        """
+        Record the colors a worker added to its table
+
+        Colors every worker holds are moved to `color_table`,
+            and not sent anymore.
+        Workers never change the colors they hold,
+            so `color_table` stays true while other calls run.
+
+        :param int process_id: Process ID of the worker
+        :param dict[str,tuple[int,int,int]] colors_added: Colors added
+        :rtype: None
+        """
+
+        with self._lock:
+            self._colors_held.setdefault(process_id, {}).update(colors_added)
+
+            # workers not started yet hold only the initial colors
+            if len(self._colors_held) < self.n_workers:
+                return
+
+            for word, color in colors_added.items():
+                if all(
+                    colors.get(word) == color
+                    for colors in self._colors_held.values()
+                ):
+                    self.color_table[word] = color
+                    for colors in self._colors_held.values():
+                        del colors[word]
+
+
+def _is_same_config(config: Config, config_other: Config | None) -> bool:
+    """
+    Check if the two configs have the same values
+
+    :param Config config: Config instance
+    :param Config|None config_other: Config instance
+    :return: True if all the attributes are equal
+    :rtype: bool
+    """
+
+    if config_other is None:
+        return False
+
+    return config is config_other or vars(config) == vars(config_other)
+
+
+def _initialize_worker(
+    config: Config, color_table: dict[str, tuple[int, int, int]]
+) -> None:
+    """
+    Keep the config and the colors in the worker, and load the fonts
+
+    Run once in each worker when it starts.
+
+    :param Config config: Config instance
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word
+    :rtype: None
+    """
+
+    global _worker_config, _worker_color_table
+
+    _worker_config = config
+    _worker_color_table = color_table
+
+    # every font size drawn, as snapped by the quantization
+    step = config.font_size_quantization or 1
+    n_sizes = int((config.max_font_size - config.min_font_size) / step)
+    for cnt in range(n_sizes + 1):
+        font_size = config.min_font_size + cnt * step
+        get_font(
+            config.font_path,
+            quantize_font_size(font_size, config.font_size_quantization),
+        )
+    if config.drawing_time_stamp:
+        get_font(config.font_path, config.time_stamp_font_size)
+
+
+def _render_chunk(
+    frames_buffer: FramesBuffer,
+    index_start: int,
+    frames: list[tuple[str, AllocationInFrame]],
+    new_colors: dict[str, tuple[int, int, int]],
+    config: Config | None,
+    palette: Image.Image | None,
+    recording_stats: bool,
+) -> tuple[int, dict[str, tuple[int, int, int]], AnimationStats | None]:
+    """
+    Render the frames in a worker, and write them to the buffer
+
+    Colors of words the worker does not have are kept for the next chunks.
+
+    :param FramesBuffer frames_buffer: Buffer to write to
+    :param int index_start: Index of the first frame in the buffer
+    :param list[tuple[str,AllocationInFrame]] frames:
+        (time name, allocation) of each frame
+    :param dict[str,tuple[int,int,int]] new_colors: Colors the worker may not have
+    :param Config|None config: Config instance. If None, the worker's config.
+    :param Image.Image|None palette: Palette to convert the images to
+    :param bool recording_stats: Whether to record and return the stats
+    :return: (process ID of the worker, colors added to the worker's table,
+        stats recorded if `recording_stats`)
+    :rtype: tuple[int, dict[str, tuple[int, int, int]], AnimationStats|None]
+    """
+
+    if recording_stats:
+        (process_id, colors_added, _), stats = call_with_stats(
+            _render_chunk,
+            frames_buffer,
+            index_start,
+            frames,
+            new_colors,
+            config,
+            palette,
+            False,
+        )
+        return (process_id, colors_added, stats)
+
+    if config is None:
+        config = _worker_config
+
+    # kept for the next chunks; colors held are never changed
+    colors_added = {
+        word: color
+        for word, color in new_colors.items()
+        if word not in _worker_color_table
+    }
+    _worker_color_table.update(colors_added)
+    color_table = ChainMap(new_colors, _worker_color_table)
+
+    for cnt, (time_name, allocation_in_frame) in enumerate(frames):
+        image = render_frame(
+            allocation_in_frame,
+            config,
+            time_name,
+            palette=palette,
+            color_table=color_table,
+        )
+        frames_buffer.write(index_start + cnt, image)
+
+    return (os.getpid(), colors_added, None)
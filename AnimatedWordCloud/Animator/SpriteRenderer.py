@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Render frames by compositing cached sprites of words
+
+The same (word, font size) appears in many consecutive frames.
+Each of them is rasterized by FreeType only once into an alpha mask,
+    and frames are composed by blending the masks into a NumPy canvas.
+
+Positions are rounded to whole pixels,
+    while Pillow draws at sub-pixel positions.
+
+Interpolated frames can also use scaled sprites:
+    each word is rasterized once per transition at its largest size,
+    and the sizes in between are downscaled from it.
+"""
+
+from __future__ import annotations
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from AnimatedWordCloud.Utils import (
+    Config,
+    AllocationInFrame,
+    LRUCache,
+    get_font,
+    quantize_font_size,
+    get_current_stats,
+)
+from AnimatedWordCloud.Utils.Consts import SPRITE_CACHE_BYTES
+
+# bounded by the bytes of the masks, varying with the words and font sizes
+_sprite_cache = LRUCache(SPRITE_CACHE_BYTES, lambda sprite: sprite[0].nbytes)
+
+# canvas reused by the frames rendered in this process,
+#   and the background to reset it with
+_canvas: np.ndarray | None = None
+_background: np.ndarray | None = None
+
+
+def get_sprite(
+    font_path: str, text: str, font_size: float
+) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Get the alpha mask of the text, rasterizing it only at the first time
+
+    :param str font_path: Path to the font file
+    :param str text: Text to rasterize
+    :param float font_size: Font size
+    :return: (alpha mask of (y, x, 1) in uint8,
+        offset of the mask from the drawing position)
+    :rtype: tuple[np.ndarray, tuple[int, int]]
+    """
+
+    key = (font_path, text, font_size)
+
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        font = get_font(font_path, font_size)
+        left, top, right, bottom = font.getbbox(text)
+
+        image = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(image).text((-left, -top), text, fill=255, font=font)
+
+        alpha = np.asarray(image, dtype=np.uint8)[:, :, np.newaxis]
+        sprite = (alpha, (left, top))
+        _sprite_cache.put(key, sprite)
+
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count("sprites_rasterized")
+
+    return sprite
+
+
+def get_scaled_sprite(
+    font_path: str, text: str, font_size: float, base_font_size: float
+) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Get the alpha mask of the text downscaled from a larger size,
+        scaling it only at the first time
+
+    :param str font_path: Path to the font file
+    :param str text: Text to rasterize
+    :param float font_size: Font size
+    :param float base_font_size: Font size rasterized, larger than `font_size`
+    :return: Same as `get_sprite()`
+    :rtype: tuple[np.ndarray, tuple[int, int]]
+    """
+
+    key = (font_path, text, font_size, base_font_size)
+
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        alpha_base, (left, top) = get_sprite(font_path, text, base_font_size)
+        scale = font_size / base_font_size
+
+        # antialiased by Pillow when downscaling
+        image = Image.fromarray(alpha_base[:, :, 0], "L")
+        image = image.resize(
+            (
+                max(1, round(image.width * scale)),
+                max(1, round(image.height * scale)),
+            ),
+            Image.Resampling.BICUBIC,
+        )
+
+        alpha = np.asarray(image, dtype=np.uint8)[:, :, np.newaxis]
+        sprite = (alpha, (round(left * scale), round(top * scale)))
+        _sprite_cache.put(key, sprite)
+
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count("sprites_scaled")
+
+    return sprite
+
+
+def get_sprite_cache_info() -> dict[str, int]:
+    """
+    Get hit/miss counters of the sprite cache
+
+    :return: {"hits", "misses", "size", "max_size"}, sizes in bytes
+    :rtype: dict[str, int]
+    """
+
+    return _sprite_cache.get_info()
+
+
+def clear_sprite_cache() -> None:
+    """
+    Drop all cached sprites and reset the counters
+
+    :rtype: None
+    """
+
+    _sprite_cache.clear()
+
+
+def render_frame_with_sprites(
+    allocation_in_frame: AllocationInFrame,
+    config: Config,
+    time_name: str,
+    color_table: dict[str, tuple[int, int, int]],
+) -> Image.Image:
+    """
+    Render image of a frame by blending sprites of the words
+
+    :param AllocationInFrame allocation_in_frame: Position/size data of a video frame.
+    :param Config config: Config instance
+    :param str time_name: Name of the time. Used for time stamp
+    :param dict[str,tuple[int,int,int]] color_table: Color of each word
+    :return: RGB image of the frame
+    :rtype: Image.Image
+    """
+
+    canvas = _get_canvas(config)
+
+    # scaled from the largest size in the transition, if interpolated
+    base_font_sizes = None
+    if config.renderer == "scaled_sprite":
+        base_font_sizes = allocation_in_frame.base_font_sizes
+
+    # Draw all words
+    for word, (font_size, (x, y)) in allocation_in_frame.words.items():
+        font_size = quantize_font_size(
+            font_size, config.font_size_quantization
+        )
+        base_font_size = font_size
+        if (
+            base_font_sizes is not None
+            and font_size >= config.scaled_sprite_min_font_size
+        ):
+            base_font_size = quantize_font_size(
+                base_font_sizes[word], config.font_size_quantization
+            )
+
+        if base_font_size > font_size:
+            alpha, (left, top) = get_scaled_sprite(
+                config.font_path, word, font_size, base_font_size
+            )
+        else:
+            # small fonts drawn exactly, as hinting matters
+            alpha, (left, top) = get_sprite(config.font_path, word, font_size)
+        draw_sprite(
+            canvas,
+            alpha,
+            (round(x) + left, round(y) + top),
+            color_table[word],
+        )
+
+    # draw time stamp
+    if config.drawing_time_stamp:
+        alpha, (left, top) = get_sprite(
+            config.font_path, time_name, config.time_stamp_font_size
+        )
+        x, y = config.time_stamp_position
+        draw_sprite(
+            canvas,
+            alpha,
+            (round(x) + left, round(y) + top),
+            ImageColor.getcolor(config.time_stamp_color, "RGB"),
+        )
+
+    # copied, so the canvas can be reused
+    return Image.fromarray(canvas, "RGB")
+
+
+def draw_sprite(
+    canvas: np.ndarray,
+    alpha: np.ndarray,
+    left_top: tuple[int, int],
+    color: tuple[int, int, int],
+) -> None:
+    """
+    Blend the color into the canvas through the alpha mask
+
+    Same rounding as Pillow's `ImageDraw.text()`.
+    The part out of the canvas is clipped.
+
+    :param np.ndarray canvas: RGB canvas of (y, x, RGB), updated in place
+    :param np.ndarray alpha: Alpha mask of (y, x, 1) in uint8
+    :param tuple[int,int] left_top: Position of the mask on the canvas
+    :param tuple[int,int,int] color: Color to blend
+    :rtype: None
+    """
+
+    x, y = left_top
+    height, width, _ = alpha.shape
+
+    # clip by the canvas
+    x_start = max(x, 0)
+    y_start = max(y, 0)
+    x_end = min(x + width, canvas.shape[1])
+    y_end = min(y + height, canvas.shape[0])
+    if x_start >= x_end or y_start >= y_end:
+        return
+
+    alpha = alpha[y_start - y : y_end - y, x_start - x : x_end - x].astype(
+        np.uint16
+    )
+    region = canvas[y_start:y_end, x_start:x_end]
+
+    # at most 255 * 255 + 128, fits in uint16
+    value = (
+        region * (255 - alpha) + np.array(color, dtype=np.uint16) * alpha + 128
+    )
+
+    # divided by 255 with rounding
+    region[:] = (value + (value >> 8)) >> 8
+
+
+def _get_canvas(config: Config) -> np.ndarray:
+    """
+    Get the canvas of this process filled with the background color
+
+    Allocated only when the size or the background color changes.
+
+    :param Config config: Config instance
+    :return: Canvas of (y, x, RGB)
+    :rtype: np.ndarray
+    """
+
+    global _canvas, _background
+
+    shape = (config.image_height, config.image_width, 3)
+    color = ImageColor.getcolor(config.background_color, "RGB")
+    if (
+        _canvas is None
+        or _canvas.shape != shape
+        or tuple(_background[0, 0]) != color
+    ):
+        _canvas = np.empty(shape, dtype=np.uint8)
+        _background = np.empty(shape, dtype=np.uint8)
+        _background[:] = color
+
+    # copying is far faster than filling
+    np.copyto(_canvas, _background)
+
+    return _canvas
@@ -1,3 +1,4 @@
 from AnimatedWordCloud.Animator.Animator import animate
+from AnimatedWordCloud.Animator.RendererPool import RendererPool
 
-__all__ = ["animate"]
+__all__ = ["animate", "RendererPool"]
@@ -0,0 +1,510 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Long-running process animating jobs from a queue
+
+Starting Python, importing and loading fonts for every animation
+    may cost more than the animation itself.
+The service keeps worker processes of allocation and rendering warm,
+    and runs the jobs queued, locally by `RenderService.submit()`
+    or over a UNIX socket by `RenderService.serve()`.
+
+Protocol of the socket: a JSON object per line for both ways.
+Requests:
+- {"type": "animate", "timelapse": [[time name, {word: weight}], ...],
+    "config": {Config arguments}, "output_filename": str,
+    "return_bytes": bool}
+- {"type": "stats"}
+Responses have "ok", and "error" if not ok.
+
+Files of the server are not chosen by the requests:
+    config arguments of paths are taken from the config of the service,
+    and "output_filename" must not have a directory.
+The socket is accessible only by the user running the service.
+"""
+
+from __future__ import annotations
+import base64
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import statistics
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Iterable
+from AnimatedWordCloud.Utils import (
+    Config,
+    TimelapseWordVector,
+    AllocationTimelapse,
+    ensure_directory_exists,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator import allocate
+from AnimatedWordCloud.Animator.ImageCreator import render_frames
+from AnimatedWordCloud.Animator.AnimationIntegrator import integrate_images
+from AnimatedWordCloud.Animator.RendererPool import RendererPool
+
+# latencies kept to report their statistics
+_N_LATENCIES_KEPT = 1000
+
+# Config arguments of the server's files, taken from the service's config
+_CONFIG_KEYS_OF_SERVER = (
+    "font_path",
+    "output_path",
+    "text_metrics_store_path",
+)
+
+# Config arguments not accepted over the socket
+_CONFIG_KEYS_REJECTED = _CONFIG_KEYS_OF_SERVER + (
+    "save_intermediate_frames",
+    "intermediate_frames_id",
+)
+
+
+class RenderService:
+    """
+    Animate jobs queued, with warm worker processes
+
+    Allocation runs in a pool of processes,
+        keeping their caches of text sizes between jobs.
+    Rendering runs in a `RendererPool`.
+    `n_concurrent_jobs` jobs run at once,
+        so a job can be allocated while another is rendered.
+
+    `Config.streaming` is not used; each job is processed stage by stage.
+
+    Use as a context manager, or call `close()` at the end.
+
+    :param Config config: Config to start the renderers with, default is None.
+        Jobs can have other configs.
+        Jobs over the socket use its paths of fonts, output and text metrics.
+    :param int n_concurrent_jobs: Jobs run at once, default is 2.
+    :param int n_allocation_workers: Processes allocating. If None(default), number of CPUs.
+    :param int n_render_workers: Processes rendering. If None(default), number of CPUs.
+    """
+
+    def __init__(
+        self,
+        config: Config = None,
+        n_concurrent_jobs: int = 2,
+        n_allocation_workers: int = None,
+        n_render_workers: int = None,
+    ) -> None:
+        if config is None:
+            config = Config()
+
+        self.config = config
+        self.allocation_executor = ProcessPoolExecutor(n_allocation_workers)
+        self.renderer_pool = RendererPool(config, n_workers=n_render_workers)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._n_running = 0
+        self._n_completed = 0
+        self._n_failed = 0
+        self._queue_times = deque(maxlen=_N_LATENCIES_KEPT)
+        self._latencies = deque(maxlen=_N_LATENCIES_KEPT)
+        self._server = None
+
+        self._threads = [
+            threading.Thread(target=self._run_jobs, daemon=True)
+            for _ in range(n_concurrent_jobs)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> RenderService:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def submit(
+        self,
+        word_vector_timelapse: Iterable[tuple[str, dict[str, float]]],
+        config: Config = None,
+        output_filename: str = None,
+        return_bytes: bool = False,
+    ) -> Future:
+        """
+        Queue a job of animation
+
+        :param Iterable[tuple[str,dict[str,float]]] word_vector_timelapse:
+            Timelapse data of word vectors. Same as `animate()`.
+        :param Config config: Configuration of the animation. If None, default config will be used.
+        :param str output_filename: Filename of the animation file.
+            If None(default), a unique name in `config.output_path`, as jobs run at once.
+        :param bool return_bytes: If True, the file is read and removed.
+            Written to a unique name, the extension of `output_filename` deciding the format.
+        :return: Future of {"path" or "data", "queue_seconds", "run_seconds", "latency_seconds"}.
+            "data" is the bytes of the file if `return_bytes`.
+        :rtype: Future
+        """
+
+        if config is None:
+            config = Config()
+
+        future = Future()
+        self._queue.put(
+            _Job(
+                future,
+                list(word_vector_timelapse),
+                config,
+                output_filename,
+                return_bytes,
+            )
+        )
+
+        return future
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get the stats of the jobs
+
+        Seconds are of the latest jobs finished.
+
+        :return: {"queue_depth", "running", "completed", "failed",
+            "queue_seconds", "latency_seconds"};
+            seconds as {"median", "p95", "max"}, None if no job finished
+        :rtype: dict[str, Any]
+        """
+
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "running": self._n_running,
+                "completed": self._n_completed,
+                "failed": self._n_failed,
+                "queue_seconds": _summarize_seconds(self._queue_times),
+                "latency_seconds": _summarize_seconds(self._latencies),
+            }
+
+    def serve(self, socket_path: str) -> None:
+        """
+        Accept jobs on the UNIX socket until `close()` is called
+
+        Only the user running the service can connect to the socket.
+        RuntimeError is raised if the platform has no UNIX socket.
+
+        :param str socket_path: Path of the socket to create.
+            A socket left at the path is replaced.
+        :rtype: None
+        """
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError(
+                "UNIX sockets are not available on this platform."
+                " Use submit() in the same process instead."
+            )
+
+        # left by a service not closed
+        if os.path.exists(socket_path) and stat.S_ISSOCK(
+            os.stat(socket_path).st_mode
+        ):
+            os.remove(socket_path)
+
+        self._server = socketserver.ThreadingUnixStreamServer(
+            socket_path, _RequestHandler, bind_and_activate=False
+        )
+        # created with no permission of others, no moment accessible
+        umask = os.umask(0o177)
+        try:
+            self._server.server_bind()
+        finally:
+            os.umask(umask)
+        self._server.server_activate()
+        self._server.daemon_threads = True
+        self._server.service = self
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            os.remove(socket_path)
+
+    def close(self) -> None:
+        """
+        Finish the jobs queued, and stop the workers and the socket
+
+        :rtype: None
+        """
+
+        if self._server is not None:
+            self._server.shutdown()
+
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+        self.allocation_executor.shutdown()
+        self.renderer_pool.close()
+
+    def _run_jobs(self) -> None:
+        """
+        Run jobs from the queue until None is got
+
+        :rtype: None
+        """
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            time_start = time.perf_counter()
+            with self._lock:
+                self._n_running += 1
+
+            try:
+                result = self._run_job(job)
+            except Exception as e:
+                job.future.set_exception(e)
+                with self._lock:
+                    self._n_running -= 1
+                    self._n_failed += 1
+                continue
+
+            time_end = time.perf_counter()
+            result["queue_seconds"] = time_start - job.time_queued
+            result["run_seconds"] = time_end - time_start
+            result["latency_seconds"] = time_end - job.time_queued
+
+            with self._lock:
+                self._n_running -= 1
+                self._n_completed += 1
+                self._queue_times.append(result["queue_seconds"])
+                self._latencies.append(result["latency_seconds"])
+
+            job.future.set_result(result)
+
+    def _run_job(self, job: _Job) -> dict[str, Any]:
+        """
+        Animate a job
+
+        :param _Job job: Job to run
+        :return: {"path"} or {"data"}
+        :rtype: dict[str, Any]
+        """
+
+        allocation_timelapse = self.allocation_executor.submit(
+            _allocate, job.word_vector_timelapse, job.config
+        ).result()
+
+        images = render_frames(
+            allocation_timelapse, job.config, renderer_pool=self.renderer_pool
+        )
+
+        # jobs running at once must not write to the same file
+        filename = job.output_filename
+        unique = filename is None or job.return_bytes
+        if unique:
+            filename = _create_unique_file(job.config.output_path, filename)
+
+        try:
+            path = integrate_images(
+                images, allocation_timelapse, job.config, filename=filename
+            )
+
+            if job.return_bytes:
+                with open(path, "rb") as f:
+                    result = {"data": f.read()}
+            else:
+                result = {"path": path}
+        except BaseException:
+            if unique:
+                os.remove(os.path.join(job.config.output_path, filename))
+            raise
+
+        if job.return_bytes:
+            os.remove(path)
+
+        return result
+
+
+class _Job:
+    """
+    Job of animation queued
+    """
+
+    def __init__(
+        self,
+        future: Future,
+        word_vector_timelapse: list[tuple[str, dict[str, float]]],
+        config: Config,
+        output_filename: str,
+        return_bytes: bool,
+    ) -> None:
+        self.future = future
+        self.word_vector_timelapse = word_vector_timelapse
+        self.config = config
+        self.output_filename = output_filename
+        self.return_bytes = return_bytes
+        self.time_queued = time.perf_counter()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handle requests of a connection, a JSON object per line
+    """
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = self._respond(json.loads(line))
+            except Exception as e:
+                response = {
+                    "ok": False,
+                    "error": "{}: {}".format(type(e).__name__, e),
+                }
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+    def _respond(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Get the response of a request
+
+        :param dict[str,Any] request: Request decoded
+        :return: Response to encode
+        :rtype: dict[str, Any]
+        """
+
+        service = self.server.service
+
+        if request["type"] == "stats":
+            return {"ok": True, **service.get_stats()}
+        elif request["type"] != "animate":
+            raise ValueError(
+                "Unknown request type: {}".format(request["type"])
+            )
+
+        result = service.submit(
+            request["timelapse"],
+            _create_config(request.get("config", {}), service.config),
+            _check_filename(request.get("output_filename")),
+            request.get("return_bytes", False),
+        ).result()
+
+        if "data" in result:
+            result["data"] = base64.b64encode(result["data"]).decode()
+
+        return {"ok": True, **result}
+
+
+def _allocate(
+    word_vector_timelapse: list[tuple[str, dict[str, float]]], config: Config
+) -> AllocationTimelapse:
+    """
+    Calculate the allocation of a job, in a worker process
+
+    :param list[tuple[str,dict[str,float]]] word_vector_timelapse:
+        Timelapse data of word vectors.
+    :param Config config: Configuration of the animation.
+    :return: Timelapse of calculated allocation
+    :rtype: AllocationTimelapse
+    """
+
+    return allocate(
+        TimelapseWordVector.convert_from_dicts_list(word_vector_timelapse),
+        config,
+    )
+
+
+def _create_config(
+    arguments: dict[str, Any], config_service: Config
+) -> Config:
+    """
+    Create the config of a request
+
+    :param dict[str,Any] arguments: Config arguments of the request
+    :param Config config_service: Config of the service, giving the paths
+    :return: Config instance
+    :rtype: Config
+    """
+
+    for key in arguments:
+        if key in _CONFIG_KEYS_REJECTED:
+            raise ValueError(
+                "Config argument not accepted by the service: {}".format(key)
+            )
+
+    for key in _CONFIG_KEYS_OF_SERVER:
+        arguments[key] = getattr(config_service, key)
+
+    return Config(**arguments)
+
+
+def _check_filename(filename: str | None) -> str | None:
+    """
+    Check that the filename has no directory
+
+    :param str|None filename: Filename of a request
+    :return: The filename
+    :rtype: str|None
+    """
+
+    if filename is None:
+        return None
+
+    if (
+        not isinstance(filename, str)
+        or os.path.basename(filename) != filename
+        or (os.altsep is not None and os.altsep in filename)
+        or filename in ["", os.curdir, os.pardir]
+    ):
+        raise ValueError("Filename not accepted: {}".format(filename))
+
+    return filename
+
+
+def _create_unique_file(directory_path: str, filename: str | None) -> str:
+    """
+    Create an empty file of a name no other job uses
+
+    :param str directory_path: Directory to create the file in
+    :param str|None filename: Filename given, whose extension is kept.
+        GIF if None.
+    :return: Filename created, without the directory
+    :rtype: str
+    """
+
+    if filename is None:
+        extension = ".gif"
+    else:
+        extension = os.path.splitext(filename)[1]
+
+    ensure_directory_exists(directory_path)
+    descriptor, path = tempfile.mkstemp(
+        suffix=extension, prefix="service_", dir=directory_path
+    )
+    os.close(descriptor)
+
+    return os.path.basename(path)
+
+
+def _summarize_seconds(seconds: Iterable[float]) -> dict[str, float] | None:
+    """
+    Get the median, 95th percentile and maximum
+
+    :param Iterable[float] seconds: Seconds
+    :return: {"median", "p95", "max"}, or None if empty
+    :rtype: dict[str, float]|None
+    """
+
+    seconds = sorted(seconds)
+    if len(seconds) == 0:
+        return None
+
+    return {
+        "median": statistics.median(seconds),
+        "p95": seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))],
+        "max": seconds[-1],
+    }
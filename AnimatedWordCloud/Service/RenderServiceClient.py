@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Client of `RenderService` over its UNIX socket
+"""
+
+from __future__ import annotations
+import base64
+import json
+import socket
+from typing import Any, Iterable
+
+
+class RenderServiceClient:
+    """
+    Send jobs to a `RenderService` serving on a UNIX socket
+
+    A connection is kept, and requests are sent one by one.
+    Use as a context manager, or call `close()` at the end.
+
+    :param str socket_path: Path of the socket the service serves on
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(socket_path)
+        self._file = self._socket.makefile("rwb")
+
+    def __enter__(self) -> RenderServiceClient:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def animate(
+        self,
+        word_vector_timelapse: Iterable[tuple[str, dict[str, float]]],
+        config: dict[str, Any] = None,
+        output_filename: str = None,
+        return_bytes: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Animate by the service, waiting for the job to finish
+
+        :param Iterable[tuple[str,dict[str,float]]] word_vector_timelapse:
+            Timelapse data of word vectors. Same as `animate()`.
+        :param dict[str,Any] config: Arguments of Config, default is None.
+        :param str output_filename: Filename of the animation file.
+            If None(default), a unique name.
+        :param bool return_bytes: If True, the file is returned and removed.
+        :return: {"path" or "data", "queue_seconds", "run_seconds", "latency_seconds"}.
+            "data" is the bytes of the file if `return_bytes`.
+        :rtype: dict[str, Any]
+        """
+
+        response = self._request(
+            {
+                "type": "animate",
+                "timelapse": list(word_vector_timelapse),
+                "config": config or {},
+                "output_filename": output_filename,
+                "return_bytes": return_bytes,
+            }
+        )
+
+        if "data" in response:
+            response["data"] = base64.b64decode(response["data"])
+
+        return response
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get the stats of the service
+
+        :return: Same as `RenderService.get_stats()`
+        :rtype: dict[str, Any]
+        """
+
+        return self._request({"type": "stats"})
+
+    def close(self) -> None:
+        """
+        Close the connection
+
+        :rtype: None
+        """
+
+        self._file.close()
+        self._socket.close()
+
+    def _request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Send a request and get the response
+
+        :param dict[str,Any] request: Request to encode
+        :return: Response decoded, without "ok"
+        :rtype: dict[str, Any]
+        """
+
+        self._file.write(json.dumps(request).encode() + b"\n")
+        self._file.flush()
+
+        line = self._file.readline()
+        if len(line) == 0:
+            raise ConnectionError("Service closed the connection")
+
+        response = json.loads(line)
+        if not response.pop("ok"):
+            raise RuntimeError(response["error"])
+
+        return response
@@ -0,0 +1,4 @@
+from AnimatedWordCloud.Service.RenderService import RenderService
+from AnimatedWordCloud.Service.RenderServiceClient import RenderServiceClient
+
+__all__ = ["RenderService", "RenderServiceClient"]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Run `RenderService` on a UNIX socket
+
+usage:
+    python -m AnimatedWordCloud.Service --socket /tmp/animated_word_cloud.sock
+"""
+
+import argparse
+from AnimatedWordCloud.Service import RenderService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--socket", default="/tmp/animated_word_cloud.sock")
+    parser.add_argument("--concurrent-jobs", type=int, default=2)
+    parser.add_argument("--allocation-workers", type=int, default=None)
+    parser.add_argument("--render-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with RenderService(
+        n_concurrent_jobs=args.concurrent_jobs,
+        n_allocation_workers=args.allocation_workers,
+        n_render_workers=args.render_workers,
+    ) as service:
+        try:
+            service.serve(args.socket)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Instrumentation of the animation pipeline
+
+Wall time of each stage and each static frame,
+    and counters of hot-path events.
+
+Only the stats activated by `AnimationStats.activate()` record anything.
+Without it, instrumented code only checks `get_current_stats()` is None.
+"""
+
+from __future__ import annotations
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Iterator
+
+_current_stats: AnimationStats | None = None
+
+
+class AnimationStats:
+    """
+    Stats of an animation
+
+    Counters recorded:
+    - "rays_launched": rays launched to find the frontier
+    - "ray_steps": steps of the rays marched
+    - "rect_collision_tests": candidate positions tested for collision
+    - "candidates_evaluated": candidate positions of words
+    - "fonts_loaded": font files loaded
+    - "sprites_rasterized": words rasterized by the sprite renderer
+    - "sprites_scaled": words downscaled by the sprite renderer
+    - "frames_merged": frames merged to the previous identical frame
+    - "frames_restitched": frames allocated again to stitch parallel segments
+    """
+
+    def __init__(self, callback: Callable[[str, float], None] = None) -> None:
+        """
+        Prepare empty stats
+
+        :param Callable[[str,float],None] callback:
+            Called with (stage name, seconds) when a stage finishes,
+            and with ("static_frame", seconds) when a static frame is
+            allocated. Optional.
+        """
+
+        self.callback = callback
+
+        # stage name -> seconds
+        self.stage_times: dict[str, float] = {}
+
+        # seconds of allocating each static frame, in order
+        self.frame_times: list[float] = []
+
+        # event name -> count
+        self.counters: dict[str, int] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Count an event
+
+        :param str name: Name of the event
+        :param int n: Number of events
+        :rtype: None
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        """
+        Record time of a stage. Added up if recorded twice.
+
+        :param str stage: Name of the stage
+        :param float seconds: Wall time
+        :rtype: None
+        """
+
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def add_frame_time(self, seconds: float) -> None:
+        """
+        Record time of allocating a static frame
+
+        :param float seconds: Wall time
+        :rtype: None
+        """
+
+        self.frame_times.append(seconds)
+
+        if self.callback is not None:
+            self.callback("static_frame", seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Record wall time of the `with` block as a stage
+
+        :param str stage: Name of the stage
+        :rtype: Iterator[None]
+        """
+
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - time_start)
+
+    @contextmanager
+    def activate(self) -> Iterator[AnimationStats]:
+        """
+        Make this the stats recorded by the instrumented code
+            in the `with` block
+
+        :return: This stats
+        :rtype: Iterator[AnimationStats]
+        """
+
+        global _current_stats
+
+        stats_before = _current_stats
+        _current_stats = self
+        try:
+            yield self
+        finally:
+            _current_stats = stats_before
+
+    def merge(self, other: AnimationStats) -> None:
+        """
+        Add up the counters and frame times of other stats,
+            such as one recorded in a worker process
+
+        :param AnimationStats other: Stats to add
+        :rtype: None
+        """
+
+        for name, n in other.counters.items():
+            self.count(name, n)
+
+        for seconds in other.frame_times:
+            self.add_frame_time(seconds)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Get the stats as a dict
+
+        :return: {"stage_times", "frame_times", "counters"}
+        :rtype: dict[str, Any]
+        """
+
+        return {
+            "stage_times": dict(self.stage_times),
+            "frame_times": list(self.frame_times),
+            "counters": dict(self.counters),
+        }
+
+
+def get_current_stats() -> AnimationStats | None:
+    """
+    Get the stats activated
+
+    :return: Stats, or None if not activated
+    :rtype: AnimationStats|None
+    """
+
+    return _current_stats
+
+
+def measure_stage(stage: str) -> ContextManager:
+    """
+    Record wall time of the `with` block to the stats activated, if any
+
+    :param str stage: Name of the stage
+    :return: Context manager
+    :rtype: ContextManager
+    """
+
+    if _current_stats is None:
+        return nullcontext()
+
+    return _current_stats.measure(stage)
+
+
+def call_with_stats(
+    function: Callable, *args: Any, **kwargs: Any
+) -> tuple[Any, AnimationStats]:
+    """
+    Call the function with new stats activated
+
+    Intended to be run in worker processes,
+        and the stats returned merged to the parent's stats.
+
+    :param Callable function: Function to call
+    :return: (Return value of the function, Stats recorded)
+    :rtype: tuple[Any, AnimationStats]
+    """
+
+    stats = AnimationStats()
+    with stats.activate():
+        result = function(*args, **kwargs)
+
+    return result, stats
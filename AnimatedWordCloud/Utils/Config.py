@@ -37,6 +37,27 @@ class Config:
         There are "magnetic" only for now.
     :param int image_division: The number of division of the image.
         This is available for magnetic strategy only.
+    :param str frontier_engine: How to find the frontier of the magnet.
+        This is available for magnetic strategy only.
+        "ray" marches rays point by point,
+        "bitmap" keeps occupancy bitmaps and finds the same frontier with NumPy,
+        "analytic" puts the points exactly on the word edges without marching.
+    :param str candidate_evaluation: How to evaluate the position candidates.
+        This is available for magnetic strategy only.
+        "scalar" evaluates one by one,
+        "vectorized" evaluates all at once with NumPy,
+        "best_first" tests collisions from the best scored and stops early.
+        All give the same result.
+    :param int static_allocation_chunks: Number of segments of the timelapse allocated in parallel processes.
+        1(default) allocates all frames sequentially.
+        Each segment starts from its own random layout, as the first frame does, and is stitched to the previous segment.
+    :param int static_allocation_overlap: Frames at the start of each segment allocated again sequentially
+        from the previous segment when stitching, unless the layout becomes the same as the parallel one before.
+        This is the only sequential part of the chunked allocation, so a smaller value runs faster,
+        while a larger value keeps the movement reluctance better at the boundaries.
+    :param bool streaming: Whether to process the timelapse frame by frame.
+        If True, the input is read lazily and only a few frames are kept in memory at a time.
+        static_allocation_chunks is ignored then.
     :param float movement_reluctance: Reluctance of the movement of the word. If higher, the word tends to stay near to the previous position.
     :param str verbosity: Verbosity of the log.
         "silent" for no log, "minor" for only important logs, "debug" for all logs.
@@ -45,17 +66,44 @@ class Config:
     :param str starting_time_stamp: Time stamp of the starting time. (Before the first time stamp in the input data)
     :param int duration_per_interpolation_frame: Duration of each interpolation frame in milliseconds.
     :param int duration_per_static_frame: Duration of each static frame in milliseconds.
+    :param bool merging_identical_frames: Whether to merge consecutive frames drawn the same into one frame,
+        adding up their durations. They are rendered and written only once.
     :param int n_frames_for_interpolation: Number of frames in the animation.
     :param str interpolation_method: Method to interpolate the frames.
         There are "linear" only for now.
+    :param float font_size_quantization: Step of the font sizes drawn. Interpolated font sizes are snapped to it,
+        so fonts loaded are reused across frames. None for no snapping.
+    :param str renderer: How to draw the words in each frame.
+        "pillow"(default) draws each word with Pillow.
+        "sprite" rasterizes each word and size once, and blends the cached masks with NumPy.
+        Faster, but the positions are rounded to whole pixels.
+        "scaled_sprite" is "sprite", but the words in interpolated frames are rasterized once per transition
+        at the largest size, and downscaled to the sizes in between.
+    :param float scaled_sprite_min_font_size: Words smaller than this are rasterized exactly with "scaled_sprite" renderer.
     :param bool drawing_time_stamp: Whether to draw time stamp on the image.
     :param str time_stamp_color: Color of the time stamp.
     :param int time_stamp_font_size: Font size of the time stamp.
         If None(default), it will be set to 75% of max_font_size
     :param tuple[int, int] time_stamp_position: Position of the time stamp.
         If None(default), it will be set to (image_width*0.75, image_height*0.75) which is right bottom.
+    :param str animation_format: Format of the animation file.
+        "gif", "webp" (animated WebP) or "apng" (animated PNG).
+        If "auto"(default), decided by the extension of the output filename, GIF if unknown.
+    :param str gif_palette: Palette of the frames.
+        "adaptive"(default) makes a palette for each frame when written in GIF.
+        "global" renders all frames in one palette made from the colors of the words, background_color and time_stamp_color,
+        which is faster to write and does not flicker.
+        Colors of the words are approximated if more than 62, to keep shades for anti-aliasing,
+        or when streaming with a custom color function.
+    :param bool save_intermediate_frames: Whether to save the image of each frame as PNG in output_path. For debugging.
+        If False(default), the images are passed to the animation in memory.
     :param str intermediate_frames_id: Static images of each frame of itermediate product will be saved as "{intermediate_frames_id}_{frame_number}.png".
         If None(default), this will be set randomly.
+    :param str text_metrics_store_path: Path of a SQLite file to persist measured text sizes.
+        Processes using the same file skip measuring words already measured.
+        If None(default), nothing is persisted.
+    :param int text_metrics_store_max_entries: Maximum number of entries in the text metrics store.
+        Least recently used entries are deleted when exceeded.
     """
 
     def __init__(
@@ -71,19 +119,35 @@ class Config:
         color_map: str = "Dark2",
         allocation_strategy: Literal["magnetic"] = "magnetic",
         image_division: int = 300,
+        frontier_engine: Literal["ray", "bitmap", "analytic"] = "ray",
+        candidate_evaluation: Literal[
+            "scalar", "vectorized", "best_first"
+        ] = "scalar",
+        static_allocation_chunks: int = 1,
+        static_allocation_overlap: int = 3,
+        streaming: bool = False,
         movement_reluctance: float = 0.05,
         verbosity: Literal["silent", "minor", "debug"] = "silent",
         transition_symbol: str = " to ",
         starting_time_stamp: str = " ",
         duration_per_interpolation_frame: int = 50,
         duration_per_static_frame: int = 700,
+        merging_identical_frames: bool = True,
         n_frames_for_interpolation: int = 20,
         interpolation_method: Literal["linear"] = "linear",
+        font_size_quantization: float = 0.5,
+        renderer: Literal["pillow", "sprite", "scaled_sprite"] = "pillow",
+        scaled_sprite_min_font_size: float = 20,
         drawing_time_stamp: bool = True,
         time_stamp_color: str = "black",
         time_stamp_font_size: int = None,
         time_stamp_position: tuple[int, int] = None,
+        animation_format: Literal["auto", "gif", "webp", "apng"] = "auto",
+        gif_palette: Literal["adaptive", "global"] = "adaptive",
+        save_intermediate_frames: bool = False,
         intermediate_frames_id: str = None,
+        text_metrics_store_path: str = None,
+        text_metrics_store_max_entries: int = 1000000,
     ) -> None:
         # explanation written above
 
@@ -103,6 +167,11 @@ class Config:
         self.color_map = color_map
         self.allocation_strategy = allocation_strategy
         self.image_division = image_division
+        self.frontier_engine = frontier_engine
+        self.candidate_evaluation = candidate_evaluation
+        self.static_allocation_chunks = static_allocation_chunks
+        self.static_allocation_overlap = static_allocation_overlap
+        self.streaming = streaming
         self.movement_reluctance = movement_reluctance
         self.verbosity = verbosity
         self.transition_symbol = transition_symbol
@@ -111,10 +180,16 @@ class Config:
             duration_per_interpolation_frame
         )
         self.duration_per_static_frame = duration_per_static_frame
+        self.merging_identical_frames = merging_identical_frames
         self.n_frames_for_interpolation = n_frames_for_interpolation
         self.interpolation_method = interpolation_method
+        self.font_size_quantization = font_size_quantization
+        self.renderer = renderer
+        self.scaled_sprite_min_font_size = scaled_sprite_min_font_size
         self.drawing_time_stamp = drawing_time_stamp
         self.time_stamp_color = time_stamp_color
+        self.text_metrics_store_path = text_metrics_store_path
+        self.text_metrics_store_max_entries = text_metrics_store_max_entries
 
         self.time_stamp_font_size = self._compute_time_stamp_font_size(
             time_stamp_font_size
@@ -124,6 +199,9 @@ class Config:
             time_stamp_position
         )
 
+        self.animation_format = animation_format
+        self.gif_palette = gif_palette
+        self.save_intermediate_frames = save_intermediate_frames
         self.intermediate_frames_id = self._compute_intermediate_frames_id(
             intermediate_frames_id
         )
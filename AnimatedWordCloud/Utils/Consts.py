@@ -32,3 +32,33 @@ DEFAULT_OUTPUT_PATH = os.path.join(LIBRARY_DIR, "output")
 """
 Default output path of the generated images when none is specified.
 """
+
+FONT_CACHE_SIZE = 256
+"""
+Maximum number of font objects kept per process.
+Keyed by (font path, font size).
+"""
+
+SPRITE_CACHE_BYTES = 32 * 1024 * 1024
+"""
+Maximum bytes of rasterized words kept per process by the sprite renderer.
+Keyed by (font path, word, font size).
+Every rendering process holds its own cache.
+"""
+
+FRAMES_BUFFER_SIZE = 32 * 1024 * 1024
+"""
+Maximum bytes of the memory-mapped file rendered frames are passed through.
+Frames more than it holds are rendered by batches reusing the file.
+"""
+
+TEXT_METRICS_CACHE_SIZE = 100000
+"""
+Maximum number of measured text sizes kept per process.
+Keyed by (word, font size, font path).
+"""
+
+GLYPH_TABLE_SIZE = 1000000
+"""
+Maximum number of glyph advances (or kernings) kept per font.
+"""
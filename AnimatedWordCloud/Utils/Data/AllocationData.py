@@ -8,6 +8,10 @@ Classes that includes the data of size and position of each words
 """
 
 from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from AnimatedWordCloud.Utils.Config import Config
 
 
 class AllocationInFrame:
@@ -27,6 +31,14 @@ class AllocationInFrame:
         # word -> (font size, left-top position)
         self.words: dict[str, tuple[float, tuple[float, float]]] = {}
 
+        # duration in milliseconds, if not the default of the config
+        # set when identical frames are merged into this
+        self.duration: int | None = None
+
+        # word -> largest font size in the transition this frame is in
+        # set on interpolated frames, shared by the frames of a transition
+        self.base_font_sizes: dict[str, float] | None = None
+
     def add(
         self, word: str, font_size: float, left_top: tuple[float, float]
     ) -> None:
@@ -52,6 +64,35 @@ class AllocationInFrame:
 
         return self.words[word]
 
+    def get_duration(self, config: Config) -> int:
+        """
+        Get the duration of the frame
+
+        :param Config config: Config instance
+        :return: Duration in milliseconds
+        :rtype: int
+        """
+
+        if self.duration is not None:
+            return self.duration
+        elif self.from_static_allocation:
+            return config.duration_per_static_frame
+        else:
+            return config.duration_per_interpolation_frame
+
+    def has_same_words(self, other: AllocationInFrame) -> bool:
+        """
+        Whether the words are drawn the same as the other frame
+
+        The order of the words is also compared, as it is the drawing order.
+
+        :param AllocationInFrame other: Frame to compare
+        :return: True if the same
+        :rtype: bool
+        """
+
+        return list(self.words.items()) == list(other.words.items())
+
 
 class AllocationTimelapse:
     """
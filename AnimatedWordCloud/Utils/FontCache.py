@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Process-wide cache of loaded fonts
+
+Loading a TrueType file is far heavier than using it,
+    so every module should get fonts from here.
+"""
+
+from __future__ import annotations
+from PIL import ImageFont
+from AnimatedWordCloud.Utils.Consts import FONT_CACHE_SIZE
+from AnimatedWordCloud.Utils.LRUCache import LRUCache
+from AnimatedWordCloud.Utils.AnimationStats import get_current_stats
+
+_font_cache = LRUCache(FONT_CACHE_SIZE)
+
+
+def get_font(font_path: str, font_size: float) -> ImageFont.FreeTypeFont:
+    """
+    Get the font object, loading it only at the first time
+
+    :param str font_path: Path to the font file
+    :param float font_size: Font size
+    :return: Font object
+    :rtype: ImageFont.FreeTypeFont
+    """
+
+    key = (font_path, font_size)
+
+    font = _font_cache.get(key)
+    if font is None:
+        font = ImageFont.truetype(font_path, font_size)
+        _font_cache.put(key, font)
+
+        stats = get_current_stats()
+        if stats is not None:
+            stats.count("fonts_loaded")
+
+    return font
+
+
+def quantize_font_size(font_size: float, step: float | None) -> float:
+    """
+    Snap the font size to a multiple of the step
+
+    Interpolated frames have continuous font sizes,
+        which would load a new font for every frame.
+
+    :param float font_size: Font size
+    :param float|None step: Step of the font size. None or 0 for no snapping.
+    :return: Font size snapped
+    :rtype: float
+    """
+
+    if not step:
+        return font_size
+
+    return round(font_size / step) * step
+
+
+def get_font_cache_info() -> dict[str, int]:
+    """
+    Get hit/miss counters of the font cache
+
+    :return: {"hits", "misses", "size", "max_size"}
+    :rtype: dict[str, int]
+    """
+
+    return _font_cache.get_info()
+
+
+def clear_font_cache() -> None:
+    """
+    Drop all cached fonts and reset the counters
+
+    :rtype: None
+    """
+
+    _font_cache.clear()
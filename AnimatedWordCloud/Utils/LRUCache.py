@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Bounded cache evicting the least recently used entry
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    Mapping with a maximum size.
+
+    When full, the least recently used entries are dropped.
+    Hits and misses of `get()` are counted for monitoring.
+    """
+
+    def __init__(
+        self, max_size: int, get_size: Callable[[Any], int] = None
+    ) -> None:
+        """
+        Prepare empty cache
+
+        :param int max_size: Maximum total size of the entries kept
+        :param Callable[[Any],int] get_size: Size of a value, such as its bytes.
+            If None(default), every entry is of size 1,
+            so `max_size` is the number of entries.
+        """
+
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.max_size = max_size
+        self.get_size = get_size
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+        # ordered from least recently used to most recently used
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get the value of the key, and mark it as recently used
+
+        :param Hashable key: Key to find
+        :param Any default: Returned if the key is not cached
+        :return: Cached value, or `default` if not cached
+        :rtype: Any
+        """
+
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        else:
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Cache the value, evicting the oldest entry if full
+
+        :param Hashable key: Key of the value
+        :param Any value: Value to cache
+        :rtype: None
+        """
+
+        if key in self._data:
+            self.size -= self._get_size(self._data[key])
+
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self.size += self._get_size(value)
+
+        while self.size > self.max_size:
+            # drop least recently used
+            _, value_dropped = self._data.popitem(last=False)
+            self.size -= self._get_size(value_dropped)
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the counters
+
+        :rtype: None
+        """
+
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+    def get_info(self) -> dict[str, int]:
+        """
+        Get the statistics of this cache
+
+        :return: {"hits", "misses", "size", "max_size"}.
+            "size" is the total size of the entries.
+        :rtype: dict[str, int]
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+    def _get_size(self, value: Any) -> int:
+        """
+        Get the size of the value counted against `max_size`
+
+        :param Any value: Value cached
+        :return: Size of the value
+        :rtype: int
+        """
+
+        if self.get_size is None:
+            return 1
+
+        return self.get_size(value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Check if the key is cached. This doesn't count as a hit or a miss.
+
+        :param Hashable key: Key to check
+        :return: Whether the key is cached
+        :rtype: bool
+        """
+
+        return key in self._data
+
+    def __len__(self) -> int:
+        """
+        Number of entries cached
+
+        :return: Number of entries
+        :rtype: int
+        """
+
+        return len(self._data)
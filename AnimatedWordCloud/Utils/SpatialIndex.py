@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Spatial index of rects for fast collision detection
+"""
+
+from __future__ import annotations
+from typing import Iterable, Iterator
+from AnimatedWordCloud.Utils.Vector import Vector
+from AnimatedWordCloud.Utils.Data.Rect import Rect
+
+
+class RectSpatialIndex:
+    """
+    Uniform grid hash of rects.
+
+    Each rect is registered to all grid cells it covers,
+        so as a collision check only looks at rects of nearby cells.
+    Gives the same results as the functions in `Collisions`.
+
+    This is also an Iterable[Rect] of all rects added.
+    """
+
+    def __init__(self, cell_size: float, rects: Iterable[Rect] = ()) -> None:
+        """
+        Prepare the index
+
+        :param float cell_size: Width and height of a grid cell.
+            About the size of the rects is the most efficient.
+        :param Iterable[Rect] rects: Rects to add initially
+        """
+
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+
+        self.cell_size = cell_size
+
+        # (cell x, cell y) -> rects covering the cell
+        self._cells: dict[tuple[int, int], list[Rect]] = {}
+
+        self._rects: list[Rect] = []
+
+        for rect in rects:
+            self.add(rect)
+
+    def add(self, rect: Rect) -> None:
+        """
+        Add a rect
+
+        :param Rect rect: Rect to add
+        :rtype: None
+        """
+
+        self._rects.append(rect)
+
+        for cell in self._get_cells_covered(rect):
+            if cell in self._cells:
+                self._cells[cell].append(rect)
+            else:
+                self._cells[cell] = [rect]
+
+    def is_point_hitting(
+        self, point: tuple[float, float] | Vector
+    ) -> tuple[bool, Rect]:
+        """
+        Check if the point is hitting any of the rects.
+
+        Same as `Collisions.is_point_hitting_rects()`
+
+        :param tuple[float,float]|Vector point: Point to check
+        :return: (Is hitting, Rect that is hitting)
+        :rtype: tuple[bool, Rect]
+        """
+
+        if point.__class__ == tuple:
+            x, y = point
+        else:
+            x, y = point.x, point.y
+
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        for rect in self._cells.get(cell, ()):
+            if (
+                rect.left_top[0] < x < rect.right_bottom[0]
+                and rect.left_top[1] < y < rect.right_bottom[1]
+            ):
+                return (True, rect)
+
+        return (False, None)
+
+    def is_rect_hitting(self, rect: Rect) -> bool:
+        """
+        Check if the rect is hitting any of the rects.
+
+        Same as `Collisions.is_rect_hitting_rects()`
+
+        :param Rect rect: Rect to check
+        :return: Is hitting
+        :rtype: bool
+        """
+
+        for cell in self._get_cells_covered(rect):
+            for rect_to_check in self._cells.get(cell, ()):
+                # AABB
+                if not (
+                    rect.right_bottom[0] < rect_to_check.left_top[0]
+                    or rect.left_top[0] > rect_to_check.right_bottom[0]
+                    or rect.right_bottom[1] < rect_to_check.left_top[1]
+                    or rect.left_top[1] > rect_to_check.right_bottom[1]
+                ):
+                    return True
+
+        return False
+
+    def _get_cells_covered(self, rect: Rect) -> Iterator[tuple[int, int]]:
+        """
+        Get all cells the rect covers, including its edges
+
+        :param Rect rect: Rect
+        :return: Cells
+        :rtype: Iterator[tuple[int, int]]
+        """
+
+        x_start = int(rect.left_top[0] // self.cell_size)
+        x_end = int(rect.right_bottom[0] // self.cell_size)
+        y_start = int(rect.left_top[1] // self.cell_size)
+        y_end = int(rect.right_bottom[1] // self.cell_size)
+
+        for cell_x in range(x_start, x_end + 1):
+            for cell_y in range(y_start, y_end + 1):
+                yield (cell_x, cell_y)
+
+    def __iter__(self) -> Iterator[Rect]:
+        """
+        Iterate all rects added
+
+        :return: Iterator of rects
+        :rtype: Iterator[Rect]
+        """
+
+        return iter(self._rects)
+
+    def __len__(self) -> int:
+        """
+        Number of rects added
+
+        :return: Number of rects
+        :rtype: int
+        """
+
+        return len(self._rects)
@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Measuring the size of the text drawn
+
+Results are memoized per process,
+    as the same words are measured frame after frame.
+
+For measuring many words at once, `measure_texts()` sums
+    per-glyph advances taken from tables built once per (font, size).
+
+Both can also consult a persistent `TextMetricsStore`,
+    so as a fresh process starts warm.
+"""
+
+from __future__ import annotations
+import unicodedata
+from typing import Iterable
+import numpy as np
+from AnimatedWordCloud.Utils.Consts import (
+    FONT_CACHE_SIZE,
+    TEXT_METRICS_CACHE_SIZE,
+    GLYPH_TABLE_SIZE,
+)
+from AnimatedWordCloud.Utils.LRUCache import LRUCache
+from AnimatedWordCloud.Utils.FontCache import get_font
+from AnimatedWordCloud.Utils.TextMetricsStore import (
+    TextMetricsStore,
+    get_font_hash,
+)
+
+_text_metrics_cache = LRUCache(TEXT_METRICS_CACHE_SIZE)
+_glyph_tables = LRUCache(FONT_CACHE_SIZE)
+
+# bidi classes and unicode categories that need shaping
+_SHAPED_BIDI_CLASSES = {"R", "AL", "AN"}
+_SHAPED_CATEGORIES = {"Mn", "Mc", "Me", "Cf", "Cc"}
+
+
+def measure_text(
+    word: str,
+    font_size: int,
+    font_path: str,
+    store: TextMetricsStore = None,
+) -> tuple[float, int]:
+    """
+    Measure the text box size drawn by Pillow
+
+    :param str word: The word
+    :param int font_size: The font size
+    :param str font_path: The font path
+    :param TextMetricsStore store: Persistent store to consult. Optional.
+    :return: Text box size (x, y)
+    :rtype: tuple[float, int]
+    """
+
+    key = (word, font_size, font_path)
+
+    size = _text_metrics_cache.get(key)
+    if size is None:
+        width = None
+
+        # try persistent store
+        if store is not None:
+            font_hash = get_font_hash(font_path)
+            width = store.get_widths(font_hash, [(font_size, word)]).get(
+                (font_size, word)
+            )
+
+        if width is None:
+            # same as ImageDraw.textlength(), without preparing a canvas
+            width = get_font(font_path, font_size).getlength(word)
+
+            if store is not None:
+                store.put_widths(font_hash, {(font_size, word): width})
+
+        size = (width, font_size)
+        _text_metrics_cache.put(key, size)
+
+    return size
+
+
+def get_text_metrics_cache_info() -> dict[str, int]:
+    """
+    Get hit/miss counters of the text metrics cache
+
+    :return: {"hits", "misses", "size", "max_size"}
+    :rtype: dict[str, int]
+    """
+
+    return _text_metrics_cache.get_info()
+
+
+def clear_text_metrics_cache() -> None:
+    """
+    Drop all measured sizes and reset the counters
+
+    :rtype: None
+    """
+
+    _text_metrics_cache.clear()
+
+
+def measure_texts(
+    words: Iterable[str],
+    font_sizes: Iterable[int],
+    font_path: str,
+    store: TextMetricsStore = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Measure the text box sizes of many words at once
+
+    Gives the same result as calling `measure_text()` for each word.
+    Widths are the sums of the glyph advances,
+        read from tables built once per (font, font size).
+    Words with kerning, ligatures or characters that need shaping
+        fall back to `measure_text()`.
+    With a store, widths memoized in this process are taken first,
+        and the store is consulted only for the rest.
+
+    :param Iterable[str] words: The words
+    :param Iterable[int] font_sizes: Font size of each word
+    :param str font_path: The font path
+    :param TextMetricsStore store: Persistent store to consult. Optional.
+    :return: (widths, heights), same order as `words`
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+
+    words = list(words)
+    heights = np.asarray(list(font_sizes))
+
+    if store is None:
+        return (_measure_texts_by_glyphs(words, heights, font_path), heights)
+
+    # memoized in this process first, the store only for the rest
+    widths = np.empty(len(words), dtype=np.float64)
+    indices_missing = {}
+    for index, (word, font_size) in enumerate(zip(words, heights.tolist())):
+        size = _text_metrics_cache.get((word, font_size, font_path))
+        if size is None:
+            indices_missing.setdefault((font_size, word), []).append(index)
+        else:
+            widths[index] = size[0]
+
+    if len(indices_missing) == 0:
+        return (widths, heights)
+
+    # take what already stored
+    font_hash = get_font_hash(font_path)
+    widths_found = store.get_widths(font_hash, indices_missing)
+
+    # measure the rest, and store them
+    keys_measured = [key for key in indices_missing if key not in widths_found]
+    if len(keys_measured) > 0:
+        widths_measured = _measure_texts_by_glyphs(
+            [word for _, word in keys_measured],
+            np.asarray([font_size for font_size, _ in keys_measured]),
+            font_path,
+        )
+        widths_measured = dict(zip(keys_measured, widths_measured.tolist()))
+        store.put_widths(font_hash, widths_measured)
+        widths_found.update(widths_measured)
+
+    for (font_size, word), width in widths_found.items():
+        _text_metrics_cache.put(
+            (word, font_size, font_path), (width, font_size)
+        )
+        widths[indices_missing[(font_size, word)]] = width
+
+    return (widths, heights)
+
+
+def _measure_texts_by_glyphs(
+    words: list[str], heights: np.ndarray, font_path: str
+) -> np.ndarray:
+    """
+    Measure widths of the words by summing glyph advances
+
+    Core of `measure_texts()`.
+
+    :param list[str] words: The words
+    :param np.ndarray heights: Font size of each word
+    :param str font_path: The font path
+    :return: Widths of the words
+    :rtype: np.ndarray
+    """
+
+    if len(words) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    table = _glyph_tables.get(font_path)
+    if table is None:
+        table = _GlyphTable(font_path)
+        _glyph_tables.put(font_path, table)
+
+    # all characters of all words in one array
+    lengths = np.array([len(word) for word in words], dtype=np.int64)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    code_points = np.frombuffer(
+        "".join(words).encode("utf-32-le"), dtype=np.uint32
+    ).astype(np.int64)
+
+    # (font size, character) of each character, encoded in an integer
+    sizes_unique, size_indices = np.unique(heights, return_inverse=True)
+    size_ids = np.array(
+        [table.get_size_id(size) for size in sizes_unique.tolist()],
+        dtype=np.int64,
+    )
+    character_size_ids = np.repeat(size_ids[size_indices], lengths)
+    advances = table.get_advances((character_size_ids << 21) | code_points)
+
+    # sum advances per word
+    # advances are multiples of 1/64 px, so this summation is exact
+    advances_cumulative = np.concatenate(([0.0], np.cumsum(advances)))
+    widths = advances_cumulative[ends] - advances_cumulative[starts]
+
+    # find words that cannot be measured by summing
+    # ...because of characters needing shaping (NaN advance)
+    needs_fallback = np.isnan(widths)
+
+    # ...because of kerning or ligatures between adjacent characters
+    if len(code_points) > 1:
+        # pair i is (character i, character i + 1)
+        # skip pairs crossing words, or already falling back
+        is_checked = ~np.isnan(advances[:-1] + advances[1:])
+        # (leading empty words end at 0, before any pair)
+        is_checked[ends[(ends > 0) & (ends < len(code_points))] - 1] = False
+
+        is_kerned = np.zeros(len(is_checked), dtype=bool)
+        is_kerned[is_checked] = (
+            table.get_kernings(
+                (character_size_ids[:-1][is_checked] << 42)
+                | (code_points[:-1][is_checked] << 21)
+                | code_points[1:][is_checked]
+            )
+            != 0
+        )
+
+        # count kerned pairs in each word
+        n_kerned_cumulative = np.concatenate(([0], np.cumsum(is_kerned)))
+        n_kerned = (
+            n_kerned_cumulative[np.maximum(ends - 1, starts)]
+            - n_kerned_cumulative[starts]
+        )
+        needs_fallback |= n_kerned > 0
+
+    for index in np.flatnonzero(needs_fallback).tolist():
+        widths[index] = measure_text(
+            words[index], heights[index].item(), font_path
+        )[0]
+
+    return widths
+
+
+class _GlyphTable:
+    """
+    Glyph advances and pair kernings of a font, for every font size used
+
+    Entries are kept in sorted arrays,
+        so as looking up many characters at once is vectorized.
+    Keys are integers encoding (size id, character)
+        or (size id, character, character).
+    """
+
+    def __init__(self, font_path: str) -> None:
+        """
+        Prepare empty tables
+
+        :param str font_path: The font path
+        """
+
+        self.font_path = font_path
+
+        # font size -> small integer used in the keys
+        self.size_ids: dict[float, int] = {}
+        self.sizes: list[float] = []
+
+        # sorted keys and corresponding values
+        self.advance_keys = np.zeros(0, dtype=np.int64)
+        self.advance_values = np.zeros(0, dtype=np.float64)
+        self.kerning_keys = np.zeros(0, dtype=np.int64)
+        self.kerning_values = np.zeros(0, dtype=np.float64)
+
+    def get_size_id(self, font_size: float) -> int:
+        """
+        Get the integer representing the font size in the keys
+
+        :param float font_size: The font size
+        :return: Size id
+        :rtype: int
+        """
+
+        if font_size not in self.size_ids:
+            self.size_ids[font_size] = len(self.sizes)
+            self.sizes.append(font_size)
+
+        return self.size_ids[font_size]
+
+    def get_advances(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Get advances, measuring unknown characters
+
+        :param np.ndarray keys: (size id << 21 | code point) of characters
+        :return: Advances. NaN for characters needing shaping.
+        :rtype: np.ndarray
+        """
+
+        self.advance_keys, self.advance_values, advances = _look_up(
+            self.advance_keys,
+            self.advance_values,
+            keys,
+            self._measure_advance,
+        )
+
+        return advances
+
+    def get_kernings(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Get kernings of pairs, measuring unknown pairs
+
+        Advances of the characters must be known beforehand.
+
+        :param np.ndarray keys:
+            (size id << 42 | code point << 21 | code point) of pairs
+        :return: Kernings. 0 if the pair is simply the sum of advances.
+        :rtype: np.ndarray
+        """
+
+        self.kerning_keys, self.kerning_values, kernings = _look_up(
+            self.kerning_keys,
+            self.kerning_values,
+            keys,
+            self._measure_kerning,
+        )
+
+        return kernings
+
+    def _measure_advance(self, key: int) -> float:
+        """
+        Measure the advance of a character
+
+        :param int key: (size id << 21 | code point)
+        :return: Advance, or NaN if the character needs shaping
+        :rtype: float
+        """
+
+        character = chr(key & 0x1FFFFF)
+        if _needs_shaping(character):
+            return float("nan")
+
+        font = get_font(self.font_path, self.sizes[key >> 21])
+        return font.getlength(character)
+
+    def _measure_kerning(self, key: int) -> float:
+        """
+        Measure the kerning of a pair
+
+        :param int key: (size id << 42 | code point << 21 | code point)
+        :return: Width of the pair minus the sum of the advances
+        :rtype: float
+        """
+
+        size_id = key >> 42
+        first = (key >> 21) & 0x1FFFFF
+        second = key & 0x1FFFFF
+
+        font = get_font(self.font_path, self.sizes[size_id])
+        return font.getlength(chr(first) + chr(second)) - (
+            self._measure_advance((size_id << 21) | first)
+            + self._measure_advance((size_id << 21) | second)
+        )
+
+
+def _look_up(
+    keys_table: np.ndarray,
+    values_table: np.ndarray,
+    keys: np.ndarray,
+    measure: callable,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Look up values in a sorted table, adding missing keys
+
+    :param np.ndarray keys_table: Sorted keys of the table
+    :param np.ndarray values_table: Values of the table
+    :param np.ndarray keys: Keys to look up
+    :param callable measure: key -> value, for missing keys
+    :return: (keys_table, values_table, values of `keys`)
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+
+    indices = np.searchsorted(keys_table, keys)
+    if len(keys_table) == 0:
+        is_missing = np.ones(len(keys), dtype=bool)
+    else:
+        is_missing = (
+            keys_table[np.minimum(indices, len(keys_table) - 1)] != keys
+        )
+
+    if is_missing.any():
+        keys_missing = np.unique(keys[is_missing])
+        values_missing = np.array(
+            [measure(key) for key in keys_missing.tolist()], dtype=np.float64
+        )
+
+        # bound the size; simply start over when too large
+        if len(keys_table) + len(keys_missing) > GLYPH_TABLE_SIZE:
+            keys_table = keys_table[:0]
+            values_table = values_table[:0]
+
+        # merge keeping sorted
+        keys_table = np.concatenate((keys_table, keys_missing))
+        values_table = np.concatenate((values_table, values_missing))
+        order = np.argsort(keys_table, kind="stable")
+        keys_table = keys_table[order]
+        values_table = values_table[order]
+
+        indices = np.searchsorted(keys_table, keys)
+
+    return (keys_table, values_table, values_table[indices])
+
+
+def _needs_shaping(character: str) -> bool:
+    """
+    Check if the character may change its shape by its neighbours
+
+    Such as right-to-left scripts and combining marks.
+
+    :param str character: Character to check
+    :return: True if summing its advance may be wrong
+    :rtype: bool
+    """
+
+    return (
+        unicodedata.bidirectional(character) in _SHAPED_BIDI_CLASSES
+        or unicodedata.category(character) in _SHAPED_CATEGORIES
+    )
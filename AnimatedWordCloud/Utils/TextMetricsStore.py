@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Persistent store of measured text sizes
+
+Measured widths are saved in a SQLite file,
+    so as a new process starts with the words measured before.
+Fonts are identified by the hash of the file content,
+    so renamed or updated font files never mix up.
+
+Writes are buffered and committed together,
+    as a commit costs a sync of the file.
+"""
+
+from __future__ import annotations
+import atexit
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+# (path, max entries) -> store opened
+_stores: dict[tuple[str, int], TextMetricsStore] = {}
+
+# (font path, modified time, file size) -> hash of the content
+_font_hashes: dict[tuple[str, int, int], str] = {}
+
+# number of variables in a SQL statement; SQLite allows 999 at minimum
+_QUERY_CHUNK_SIZE = 900
+
+# buffered writes are committed when this many, or this old
+_FLUSH_SIZE = 1000
+_FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class TextMetricsStore:
+    """
+    SQLite file of (font hash, font size, word) -> width
+
+    The number of entries is bounded by `max_entries`.
+    When exceeded, the least recently used entries are deleted.
+
+    Widths put and entries used are buffered,
+        and committed by `flush()`, when enough are buffered,
+        at `close()` or at exit.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        """
+        Open the store, creating the file if not exists
+
+        :param str path: Path of the SQLite file
+        :param int max_entries: Maximum number of entries kept
+        """
+
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.path = path
+        self.max_entries = max_entries
+
+        # shared between threads, guarded by the lock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS metrics ("
+            "font_hash TEXT NOT NULL, "
+            "font_size REAL NOT NULL, "
+            "word TEXT NOT NULL, "
+            "width REAL NOT NULL, "
+            "last_used INTEGER NOT NULL, "
+            "PRIMARY KEY (font_hash, font_size, word))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS metrics_last_used "
+            "ON metrics (last_used)"
+        )
+        self._connection.commit()
+
+        # clock for LRU; continues from the file
+        self._clock = self._connection.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM metrics"
+        ).fetchone()[0]
+
+        # not committed yet
+        # (font hash, font size, word) -> (width, clock)
+        self._widths_buffered = {}
+        # (font hash, font size, word) -> clock
+        self._uses_buffered = {}
+        self._time_flushed = time.monotonic()
+        self._closed = False
+
+        atexit.register(self.close)
+
+    def get_widths(
+        self, font_hash: str, keys: Iterable[tuple[float, str]]
+    ) -> dict[tuple[float, str], float]:
+        """
+        Get the stored widths
+
+        :param str font_hash: Hash of the font file. See `get_font_hash()`
+        :param Iterable[tuple[float, str]] keys: (font size, word) to find
+        :return: (font size, word) -> width, only for the stored ones
+        :rtype: dict[tuple[float, str], float]
+        """
+
+        keys = set(keys)
+        found = {}
+
+        with self._lock:
+            self._clock += 1
+
+            # put but not committed yet
+            for font_size, word in keys:
+                buffered = self._widths_buffered.get(
+                    (font_hash, font_size, word)
+                )
+                if buffered is not None:
+                    found[(font_size, word)] = buffered[0]
+
+            words = list({word for key, word in keys if key not in found})
+            for start in range(0, len(words), _QUERY_CHUNK_SIZE):
+                chunk = words[start : start + _QUERY_CHUNK_SIZE]
+                rows = self._connection.execute(
+                    "SELECT font_size, word, width FROM metrics "
+                    "WHERE font_hash = ? AND word IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    [font_hash, *chunk],
+                ).fetchall()
+
+                for font_size, word, width in rows:
+                    if (font_size, word) in keys:
+                        found[(font_size, word)] = width
+
+            # mark as recently used
+            for font_size, word in found:
+                self._uses_buffered[(font_hash, font_size, word)] = self._clock
+            self._flush_if_due()
+
+        return found
+
+    def put_widths(
+        self, font_hash: str, widths: dict[tuple[float, str], float]
+    ) -> None:
+        """
+        Store the widths, evicting old entries if full
+
+        :param str font_hash: Hash of the font file. See `get_font_hash()`
+        :param dict[tuple[float, str], float] widths:
+            (font size, word) -> width
+        :rtype: None
+        """
+
+        if len(widths) == 0:
+            return
+
+        with self._lock:
+            self._clock += 1
+            for (font_size, word), width in widths.items():
+                self._widths_buffered[(font_hash, font_size, word)] = (
+                    width,
+                    self._clock,
+                )
+            self._flush_if_due()
+
+    def flush(self) -> None:
+        """
+        Commit the widths and the uses buffered
+
+        :rtype: None
+        """
+
+        with self._lock:
+            self._flush()
+
+    def count(self) -> int:
+        """
+        Number of entries stored
+
+        :return: Number of entries
+        :rtype: int
+        """
+
+        with self._lock:
+            self._flush()
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM metrics"
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Commit what buffered, and close the file
+
+        :rtype: None
+        """
+
+        with self._lock:
+            if self._closed:
+                return
+
+            self._flush()
+            self._connection.close()
+            self._closed = True
+
+        atexit.unregister(self.close)
+
+    def _flush_if_due(self) -> None:
+        """
+        Flush if enough are buffered, or buffered for long
+
+        Must be called with the lock held.
+
+        :rtype: None
+        """
+
+        n_buffered = len(self._widths_buffered) + len(self._uses_buffered)
+        if (
+            n_buffered >= _FLUSH_SIZE
+            or time.monotonic() - self._time_flushed >= _FLUSH_INTERVAL_SECONDS
+        ):
+            self._flush()
+
+    def _flush(self) -> None:
+        """
+        Write the buffered in a transaction, and evict
+
+        Must be called with the lock held.
+
+        :rtype: None
+        """
+
+        self._time_flushed = time.monotonic()
+        if len(self._widths_buffered) + len(self._uses_buffered) == 0:
+            return
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO metrics "
+            "(font_hash, font_size, word, width, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (*key, width, clock)
+                for key, (width, clock) in self._widths_buffered.items()
+            ],
+        )
+        self._connection.executemany(
+            "UPDATE metrics SET last_used = MAX(last_used, ?) "
+            "WHERE font_hash = ? AND font_size = ? AND word = ?",
+            [(clock, *key) for key, clock in self._uses_buffered.items()],
+        )
+        self._widths_buffered.clear()
+        self._uses_buffered.clear()
+
+        self._evict()
+        self._connection.commit()
+
+    def _evict(self) -> None:
+        """
+        Delete least recently used entries exceeding `max_entries`
+
+        Must be called with the lock held.
+
+        :rtype: None
+        """
+
+        n_entries = self._connection.execute(
+            "SELECT COUNT(*) FROM metrics"
+        ).fetchone()[0]
+
+        if n_entries > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM metrics WHERE rowid IN ("
+                "SELECT rowid FROM metrics ORDER BY last_used LIMIT ?)",
+                (n_entries - self.max_entries,),
+            )
+
+
+def get_text_metrics_store(path: str, max_entries: int) -> TextMetricsStore:
+    """
+    Get the store of the path and the limit, opening it only once per process
+
+    :param str path: Path of the SQLite file
+    :param int max_entries: Maximum number of entries kept
+    :return: Store opened
+    :rtype: TextMetricsStore
+    """
+
+    key = (os.path.abspath(path), max_entries)
+
+    if key not in _stores:
+        _stores[key] = TextMetricsStore(key[0], max_entries)
+
+    return _stores[key]
+
+
+def get_font_hash(font_path: str) -> str:
+    """
+    Get the hash of the font file content
+
+    Hashed only once while the file is not modified.
+
+    :param str font_path: Path to the font file
+    :return: SHA-1 hex digest of the file
+    :rtype: str
+    """
+
+    stat = os.stat(font_path)
+    key = (os.path.abspath(font_path), stat.st_mtime_ns, stat.st_size)
+
+    if key not in _font_hashes:
+        sha1 = hashlib.sha1()
+        with open(font_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha1.update(block)
+        _font_hashes[key] = sha1.hexdigest()
+
+    return _font_hashes[key]
@@ -25,10 +25,41 @@ from AnimatedWordCloud.Utils.Collisions import (
     is_rect_hitting_rects,
 )
 
+from AnimatedWordCloud.Utils.SpatialIndex import RectSpatialIndex
+
 from AnimatedWordCloud.Utils.FileManager import (
     ensure_directory_exists,
 )
 
+from AnimatedWordCloud.Utils.LRUCache import LRUCache
+
+from AnimatedWordCloud.Utils.FontCache import (
+    get_font,
+    quantize_font_size,
+    get_font_cache_info,
+    clear_font_cache,
+)
+
+from AnimatedWordCloud.Utils.TextMetricsStore import (
+    TextMetricsStore,
+    get_text_metrics_store,
+    get_font_hash,
+)
+
+from AnimatedWordCloud.Utils.TextMetrics import (
+    measure_text,
+    measure_texts,
+    get_text_metrics_cache_info,
+    clear_text_metrics_cache,
+)
+
+from AnimatedWordCloud.Utils.AnimationStats import (
+    AnimationStats,
+    get_current_stats,
+    measure_stage,
+    call_with_stats,
+)
+
 __all__ = [
     "LIBRARY_DIR",
     "DEFAULT_ENG_FONT_PATH",
@@ -45,6 +76,23 @@ __all__ = [
     "is_point_hitting_rect",
     "is_rect_hitting_rect",
     "is_rect_hitting_rects",
+    "RectSpatialIndex",
     "Config",
     "ensure_directory_exists",
+    "LRUCache",
+    "get_font",
+    "quantize_font_size",
+    "get_font_cache_info",
+    "clear_font_cache",
+    "TextMetricsStore",
+    "get_text_metrics_store",
+    "get_font_hash",
+    "measure_text",
+    "measure_texts",
+    "get_text_metrics_cache_info",
+    "clear_text_metrics_cache",
+    "AnimationStats",
+    "get_current_stats",
+    "measure_stage",
+    "call_with_stats",
 ]
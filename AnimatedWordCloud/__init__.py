@@ -1,4 +1,4 @@
-from AnimatedWordCloud.Animator import animate
-from AnimatedWordCloud.Utils import Config
+from AnimatedWordCloud.Animator import animate, RendererPool
+from AnimatedWordCloud.Utils import Config, AnimationStats
 
-__all__ = ["animate", "Config"]
+__all__ = ["animate", "RendererPool", "Config", "AnimationStats"]
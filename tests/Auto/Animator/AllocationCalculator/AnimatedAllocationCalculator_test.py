@@ -174,3 +174,56 @@ def animated_allocate_test():
         static_timelapse, config
     )
     assert len(animated_timelapse.timelapse) == 5
+
+
+def test_merge_identical_frames():
+    static_timelapse = AllocationTimelapse()
+    for day in ["2024-1-1", "2024-1-2"]:
+        allocationframe = AllocationInFrame(from_static_allocation=True)
+        allocationframe.add("apple", 10, (10, 10))
+        allocationframe.add("banana", 20, (30, 10))
+        static_timelapse.add(day, allocationframe)
+
+    # interpolations moving nothing merged
+    config = Config(n_frames_for_interpolation=3)
+    animated_timelapse = animated_allocate(static_timelapse, config)
+    assert [
+        allocation.get_duration(config)
+        for _, allocation in animated_timelapse.timelapse
+    ] == [700, 150, 700]
+
+    # static frames too, if time stamp not drawn
+    config = Config(n_frames_for_interpolation=3, drawing_time_stamp=False)
+    animated_timelapse = animated_allocate(static_timelapse, config)
+    assert len(animated_timelapse.timelapse) == 1
+    assert animated_timelapse.get_frame(0).get_duration(config) == 1550
+
+    # not merged
+    config = Config(
+        n_frames_for_interpolation=3, merging_identical_frames=False
+    )
+    animated_timelapse = animated_allocate(static_timelapse, config)
+    assert len(animated_timelapse.timelapse) == 5
+
+
+def test_base_font_sizes():
+    static_timelapse = AllocationTimelapse()
+    allocationframe1 = AllocationInFrame(from_static_allocation=True)
+    allocationframe1.add("apple", 10, (10, 10))
+    allocationframe1.add("banana", 30, (10, 10))
+    allocationframe2 = AllocationInFrame(from_static_allocation=True)
+    allocationframe2.add("apple", 20, (20, 30))
+    allocationframe2.add("banana", 10, (10, 10))
+    static_timelapse.add("2024-1-1", allocationframe1)
+    static_timelapse.add("2024-1-2", allocationframe2)
+
+    config = Config(n_frames_for_interpolation=3)
+    animated_timelapse = animated_allocate(static_timelapse, config)
+
+    # largest size in the transition, only on interpolated frames
+    assert animated_timelapse.get_frame(0).base_font_sizes is None
+    for cnt in range(1, 4):
+        assert animated_timelapse.get_frame(cnt).base_font_sizes == {
+            "apple": 20,
+            "banana": 30,
+        }
@@ -7,17 +7,24 @@
 Testing the StaticAllocationCalculator module
 """
 
-
+import copy
+import random
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationCalculator import (
     calculate_font_size,
     estimate_text_size,
+    estimate_text_sizes,
     allocate,
     allocate_all,
+    allocate_all_iteratively,
+    _allocate_first_frame,
+    _allocate_segment,
+    _allocate_segment_seeded,
+    _stitch_segment,
     AllocationInFrame,
     WordVector,
     Config,
 )
-from AnimatedWordCloud.Utils import DEFAULT_ENG_FONT_PATH
+from AnimatedWordCloud.Utils import DEFAULT_ENG_FONT_PATH, AnimationStats
 from tests.TestDataGetter import timelapses_test
 
 
@@ -45,6 +52,14 @@ def test_estimate_text_size():
     assert estimate_text_size("Hello", 100, DEFAULT_ENG_FONT_PATH)[1] > 50
 
 
+def test_estimate_text_sizes():
+    sizes = estimate_text_sizes(
+        ["Hello", "a"], [100, 20], DEFAULT_ENG_FONT_PATH
+    )
+    assert sizes[0] == estimate_text_size("Hello", 100, DEFAULT_ENG_FONT_PATH)
+    assert sizes[1] == estimate_text_size("a", 20, DEFAULT_ENG_FONT_PATH)
+
+
 def test_allocate():
     allocation_before = AllocationInFrame(from_static_allocation=True)
     allocation_before.add("test_x", 10, (0, 0))
@@ -61,3 +76,109 @@ def test_allocate_all():
     config = Config()
     config.max_words = 5
     assert allocate_all(timelapses_test[0], config) is not None
+
+
+def test_allocate_all_chunked():
+    config = Config(max_words=5, static_allocation_chunks=3)
+    timelapse = timelapses_test[0]
+    stats = AnimationStats()
+    with stats.activate():
+        allocation_timelapse = allocate_all(timelapse, config)
+
+    # segments after the first are stitched, only the overlap sequentially
+    assert 2 <= stats.counters["frames_restitched"] <= 2 * 3
+    assert len(allocation_timelapse.timelapse) == len(timelapse) + 1
+
+    # words are never lost between frames, same as sequential
+    for cnt in range(len(timelapse)):
+        words_before = allocation_timelapse.get_frame(cnt).words.keys()
+        words_after = allocation_timelapse.get_frame(cnt + 1).words.keys()
+        assert set(words_before) <= set(words_after)
+
+
+def test_allocate_segment_seeded():
+    config = Config(max_words=5)
+    timelapse = timelapses_test[0]
+    word_vectors = [timelapse[cnt].word_vector for cnt in range(4, 8)]
+
+    # independent of the frames before, same as the first frame
+    random.seed(0)
+    seed, frames = _allocate_segment_seeded(
+        timelapse[3].word_vector, word_vectors, config
+    )
+    random.seed(0)
+    seed_expected, frames_expected = _allocate_segment(
+        word_vectors,
+        _allocate_first_frame(timelapse[3].word_vector, config),
+        config,
+    )
+
+    assert seed.words == seed_expected.words
+    assert len(frames) == len(word_vectors)
+    for frame, frame_expected in zip(frames, frames_expected):
+        assert frame.words == frame_expected.words
+
+
+def test_stitch_segment():
+    config = Config(max_words=5, static_allocation_overlap=4)
+    timelapse = timelapses_test[0]
+    start = 4
+    word_vectors = [timelapse[cnt].word_vector for cnt in range(start, 8)]
+
+    # actual frame before the segment
+    random.seed(0)
+    frame_previous = _allocate_first_frame(timelapse[0].word_vector, config)
+    for cnt in range(start):
+        frame_previous = allocate(
+            timelapse[cnt].word_vector, frame_previous, config
+        )
+
+    # segment allocated from another seed, as in parallel
+    random.seed(1)
+    seed, frames_segment = _allocate_segment(
+        word_vectors,
+        _allocate_first_frame(timelapse[start - 1].word_vector, config),
+        config,
+    )
+
+    random.seed(2)
+    _, frames_sequential = _allocate_segment(
+        word_vectors, copy.deepcopy(frame_previous), config
+    )
+    random.seed(2)
+    frames = _stitch_segment(
+        timelapse, start, seed, frames_segment, frame_previous, config
+    )
+
+    assert len(frames) == len(frames_segment)
+
+    # words move at the boundary as allocated sequentially
+    for word, _ in timelapse[start].word_vector.get_ranking(0, 5):
+        assert frames[0][word] == frames_sequential[0][word]
+
+    # words are never lost between frames
+    for frame_before, frame_after in zip([frame_previous] + frames, frames):
+        assert set(frame_before.words) <= set(frame_after.words)
+
+
+def test_allocate_all_iteratively():
+    config = Config(max_words=5)
+    timelapse = timelapses_test[0]
+
+    random.seed(0)
+    allocation_timelapse = allocate_all(timelapse, config)
+
+    # same result from a generator
+    random.seed(0)
+    frames = list(
+        allocate_all_iteratively(
+            (timeframe for timeframe in timelapse.timeframes), config
+        )
+    )
+
+    assert len(frames) == len(allocation_timelapse.timelapse)
+    for (time_name, frame), (time_name_all, frame_all) in zip(
+        frames, allocation_timelapse.timelapse
+    ):
+        assert time_name == time_name_all
+        assert frame.words == frame_all.words
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+testing AnalyticFrontier module
+"""
+
+import random
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.AnalyticFrontier import (
+    AnalyticFrontierEngine,
+    Rect,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagnetOuterFrontier import (
+    RayFrontierEngine,
+)
+
+
+def test_on_edges():
+    engine = AnalyticFrontierEngine(100, 100, 10, 10)
+
+    frontier = engine.update([], Rect((20, 30), (45, 50)))
+
+    assert [point.convert_to_tuple() for point in frontier.from_up] == [
+        (21, 30),
+        (31, 30),
+        (41, 30),
+    ]
+    assert [point.convert_to_tuple() for point in frontier.from_down] == [
+        (21, 50),
+        (31, 50),
+        (41, 50),
+    ]
+    assert [point.convert_to_tuple() for point in frontier.from_left] == [
+        (20, 31),
+        (20, 41),
+    ]
+    assert [point.convert_to_tuple() for point in frontier.from_right] == [
+        (45, 31),
+        (45, 41),
+    ]
+
+
+def test_near_ray():
+    random.seed(0)
+    width, height, division = 400, 300, 100
+    interval_x, interval_y = width / division, height / division
+    engine_ray = RayFrontierEngine(width, height, interval_x, interval_y)
+    engine_analytic = AnalyticFrontierEngine(
+        width, height, interval_x, interval_y
+    )
+
+    rects = []
+    for _ in range(10):
+        x = random.uniform(100, 300)
+        y = random.uniform(75, 225)
+        rect = Rect((x, y), (x + random.uniform(10, 50), y + 10))
+        rects.append(rect)
+
+        frontier_ray = engine_ray.update(rects, rect)
+        frontier_analytic = engine_analytic.update(rects, rect)
+
+        # the ray stops at the first step inside of the edge
+        for side, axis, interval in [
+            ("from_up", 1, interval_y),
+            ("from_down", 1, -interval_y),
+            ("from_left", 0, interval_x),
+            ("from_right", 0, -interval_x),
+        ]:
+            points_ray = getattr(frontier_ray, side)
+            points_analytic = getattr(frontier_analytic, side)
+            assert len(points_ray) == len(points_analytic)
+            for point_ray, point_analytic in zip(points_ray, points_analytic):
+                distance = point_ray[axis] - point_analytic[axis]
+                assert 0 <= distance / interval < 1
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+testing MagnetOuterFrontier module
+"""
+
+import numpy as np
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagnetOuterFrontier import (
+    FrontierSide,
+    MagnetOuterFrontier,
+    RayFrontierEngine,
+    get_ray_positions,
+    Rect,
+)
+
+
+def test_FrontierSide():
+    side = FrontierSide(np.array([1.0, 2.0, 3.0]), False)
+    assert len(side) == 0
+
+    side.set(2, 10)
+    side.set(0, 20)
+    side.set(2, 5)
+
+    assert len(side) == 2
+    assert [point.convert_to_tuple() for point in side] == [
+        (20, 1),
+        (5, 3),
+    ]
+    xs, ys = side.get_points_as_arrays()
+    assert xs.tolist() == [20, 5]
+    assert ys.tolist() == [1, 3]
+
+
+def test_copy():
+    frontier = MagnetOuterFrontier(100, 100, 10, 10)
+    copied = frontier.copy()
+    copied.from_up.set(0, 50)
+
+    assert len(frontier.from_up) == 0
+    assert len(copied.from_up) == 1
+
+
+def test_get_ray_positions():
+    assert get_ray_positions(1, 10, 30).tolist() == [1, 11, 21]
+    assert get_ray_positions(29, -10, 30).tolist() == [29, 19, 9]
+
+
+def test_RayFrontierEngine():
+    engine = RayFrontierEngine(100, 100, 10, 10)
+    rect = Rect((20, 30), (45, 50))
+
+    frontier = engine.update([rect], rect)
+
+    assert [point.convert_to_tuple() for point in frontier.from_up] == [
+        (21, 31),
+        (31, 31),
+        (41, 31),
+    ]
+
+
+def test_RayFrontierEngine_replaces_stale_points():
+    engine = RayFrontierEngine(100, 100, 10, 10)
+    rect_lower = Rect((20, 30), (45, 50))
+    rect_upper = Rect((15, 10), (50, 25))
+
+    engine.update([rect_lower], rect_lower)
+    frontier = engine.update([rect_lower, rect_upper], rect_upper)
+
+    # one point per scan line, the stale ones on rect_lower replaced
+    assert [point.convert_to_tuple() for point in frontier.from_up] == [
+        (21, 11),
+        (31, 11),
+        (41, 11),
+    ]
+    assert [point.convert_to_tuple() for point in frontier.from_down] == [
+        (21, 49),
+        (31, 49),
+        (41, 49),
+    ]
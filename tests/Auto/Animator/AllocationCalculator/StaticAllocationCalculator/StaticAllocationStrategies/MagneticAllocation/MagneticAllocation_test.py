@@ -7,6 +7,7 @@
 testing MagneticAllocation module
 """
 
+import random
 from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagneticAllocation import (
     MagneticAllocation,
     AllocationInFrame,
@@ -29,3 +30,47 @@ def test_MagneticAllocation():
     ]
 
     assert instance.allocate(words, allocation_previous) is not None
+
+
+def test_MagneticAllocation_bitmap():
+    config = Config(
+        image_width=1000,
+        image_height=1000,
+        image_division=200,
+        frontier_engine="bitmap",
+    )
+    instance = MagneticAllocation(config)
+
+    allocation_previous = AllocationInFrame(from_static_allocation=True)
+    allocation_previous.add("test", 10, (30, 10))
+
+    words = [
+        Word("test", 1, 10, (30, 10)),
+        Word("test2", 3, 30, (20, 30)),
+        Word("test3", 3, 30, (20, 30)),
+    ]
+
+    assert instance.allocate(words, allocation_previous) is not None
+
+
+def test_MagneticAllocation_candidate_evaluation():
+    words = [
+        Word("test{}".format(cnt), 20 - cnt, 40 - cnt, (60 - cnt, 40 - cnt))
+        for cnt in range(20)
+    ]
+
+    allocations = []
+    for candidate_evaluation in ["scalar", "vectorized", "best_first"]:
+        random.seed(0)
+        config = Config(
+            image_width=600,
+            image_height=600,
+            image_division=100,
+            candidate_evaluation=candidate_evaluation,
+        )
+        instance = MagneticAllocation(config)
+        allocation_previous = AllocationInFrame(from_static_allocation=True)
+        allocation_previous.add("test0", 20, (100, 100))
+        allocations.append(instance.allocate(words, allocation_previous).words)
+
+    assert allocations[0] == allocations[1] == allocations[2]
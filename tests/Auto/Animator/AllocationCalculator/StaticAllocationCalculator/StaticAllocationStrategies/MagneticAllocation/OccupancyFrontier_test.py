@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+testing OccupancyFrontier module
+"""
+
+import random
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.OccupancyFrontier import (
+    OccupancyFrontierEngine,
+    Rect,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagnetOuterFrontier import (
+    RayFrontierEngine,
+)
+
+
+def test_same_as_ray():
+    random.seed(0)
+    width, height, division = 400, 300, 100
+    engine_ray = RayFrontierEngine(
+        width, height, width / division, height / division
+    )
+    engine_bitmap = OccupancyFrontierEngine(
+        width, height, width / division, height / division
+    )
+
+    rects = []
+    for _ in range(10):
+        x = random.uniform(100, 300)
+        y = random.uniform(75, 225)
+        rect = Rect((x, y), (x + random.uniform(10, 50), y + 10))
+        rects.append(rect)
+
+        frontier_ray = engine_ray.update(rects, rect)
+        frontier_bitmap = engine_bitmap.update(rects, rect)
+
+        for side in ["from_up", "from_down", "from_left", "from_right"]:
+            assert [
+                point.convert_to_tuple()
+                for point in getattr(frontier_ray, side)
+            ] == [
+                point.convert_to_tuple()
+                for point in getattr(frontier_bitmap, side)
+            ]
@@ -9,8 +9,16 @@ from AnimatedWordCloud.Utils.Data import (
 from AnimatedWordCloud.Utils.Consts import (
     DEFAULT_ENG_FONT_PATH,
 )
-from AnimatedWordCloud.Animator.AnimationIntegrator import integrate_images
-from AnimatedWordCloud.Animator.ImageCreator import create_images
+from PIL import Image
+from AnimatedWordCloud.Animator.AnimationIntegrator import (
+    integrate_images,
+    integrate_images_iteratively,
+)
+from AnimatedWordCloud.Animator.ImageCreator import (
+    create_images,
+    create_images_iteratively,
+    render_frames,
+)
 from AnimatedWordCloud.Utils import Config
 
 DIR = Path(__file__).parent
@@ -44,3 +52,67 @@ def test_imagecreator_and_integrateimages():
     )
     print(image_paths)
     assert integrate_images(image_paths, position_in_frames, config) != None
+
+
+def test_imagecreator_and_integrateimages_iteratively():
+    for save_intermediate_frames in [False, True]:
+        config = Config(save_intermediate_frames=save_intermediate_frames)
+
+        def generate_frames():
+            for cnt in range(3):
+                allocation_in_frame = AllocationInFrame(
+                    from_static_allocation=cnt != 1
+                )
+                allocation_in_frame.words = {"word": (30, (50 + cnt * 20, 50))}
+                yield (str(cnt), allocation_in_frame)
+
+        image_frames = list(
+            create_images_iteratively(generate_frames(), config)
+        )
+        assert len(image_frames) == 3
+        for _, image in image_frames:
+            if save_intermediate_frames:
+                assert os.path.isfile(image)
+            else:
+                assert isinstance(image, Image.Image)
+
+        path = integrate_images_iteratively(
+            iter(image_frames), config, filename="output_iteratively.gif"
+        )
+
+        with Image.open(path) as gif:
+            assert gif.n_frames == 3
+            durations = []
+            for cnt in range(gif.n_frames):
+                gif.seek(cnt)
+                durations.append(gif.info["duration"])
+        assert durations == [
+            config.duration_per_static_frame,
+            config.duration_per_interpolation_frame,
+            config.duration_per_static_frame,
+        ]
+
+
+def test_integrate_images_global_palette():
+    config = Config(gif_palette="global")
+    position_in_frames = AllocationTimelapse()
+    for cnt in range(2):
+        allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+        allocation_in_frame.words = {"word": (30, (50 + cnt * 20, 50))}
+        position_in_frames.add(str(cnt), allocation_in_frame)
+
+    # color not in the colormap
+    def color_func(word, font_size, position, **kwargs):
+        return "rgb(1, 2, 3)"
+
+    images = list(render_frames(position_in_frames, config, color_func))
+    path = integrate_images(
+        images, position_in_frames, config, filename="output_palette.gif"
+    )
+
+    # palette of the frames, having the color exactly
+    palette = images[0].getpalette()
+    with Image.open(path) as gif:
+        assert gif.getpalette()[: len(palette)] == palette
+        assert (1, 2, 3) in gif.convert("RGB").getdata()
+    os.remove(path)
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the AnimationWriter module
+"""
+
+import os
+import pytest
+import numpy as np
+from PIL import Image, ImageDraw, ImageSequence
+from AnimatedWordCloud.Animator import AnimationWriter
+from AnimatedWordCloud.Animator.AnimationWriter import (
+    GifWriter,
+    WebPWriter,
+    ApngWriter,
+    SaveAllWriter,
+    create_animation_writer,
+)
+from AnimatedWordCloud.Utils import (
+    DEFAULT_OUTPUT_PATH,
+    ensure_directory_exists,
+)
+
+
+def _make_frames() -> list[Image.Image]:
+    frames = []
+    for cnt in range(4):
+        image = Image.new("RGB", (200, 100), "white")
+        draw = ImageDraw.Draw(image)
+        draw.text((10 + cnt * 20, 30), "word", fill=(200, 30, 30))
+        draw.text((120, 60), "still", fill=(30, 30, 200))
+        frames.append(image)
+
+    # identical to the previous
+    frames.insert(2, frames[1].copy())
+
+    return frames
+
+
+def _read_gif(path: str) -> list[tuple[np.ndarray, int]]:
+    with Image.open(path) as gif:
+        return [
+            (np.asarray(frame.convert("RGB")), frame.info["duration"])
+            for frame in ImageSequence.Iterator(gif)
+        ]
+
+
+def _assert_same_as_pillow(path_pillow: str, path_writer: str) -> None:
+    frames_pillow = _read_gif(path_pillow)
+    frames_writer = _read_gif(path_writer)
+
+    assert len(frames_pillow) == len(frames_writer)
+    for (image_pillow, duration_pillow), (image, duration) in zip(
+        frames_pillow, frames_writer
+    ):
+        assert np.array_equal(image_pillow, image)
+        assert duration_pillow == duration
+
+    # not larger
+    assert os.path.getsize(path_writer) <= os.path.getsize(path_pillow)
+
+
+def test_gif_writer():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    path_pillow = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer_pillow.gif")
+    path_writer = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer.gif")
+
+    frames = _make_frames()
+    durations = [700, 50, 50, 50, 700]
+
+    frames[0].save(
+        path_pillow,
+        save_all=True,
+        append_images=frames[1:],
+        duration=durations,
+        loop=0,
+    )
+
+    with GifWriter(path_writer) as writer:
+        for frame, duration in zip(frames, durations):
+            writer.add_frame(frame, duration)
+
+    # identical frame merged
+    assert writer.n_frames_written == 4
+
+    # same frames as Pillow
+    _assert_same_as_pillow(path_pillow, path_writer)
+
+    with Image.open(path_writer) as gif:
+        gif.seek(1)
+        assert gif.info["duration"] == 100
+
+        # previous frame kept under the box
+        assert gif.disposal_method == 1
+
+    os.remove(path_pillow)
+    os.remove(path_writer)
+
+
+def test_gif_writer_empty():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    path = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer_empty.gif")
+
+    with pytest.raises(ValueError):
+        with GifWriter(path):
+            pass
+
+    # no broken file left
+    assert not os.path.exists(path)
+
+
+def test_writer_error():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    path = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer_error.gif")
+
+    with pytest.raises(RuntimeError):
+        with GifWriter(path) as writer:
+            writer.add_frame(_make_frames()[0], 100)
+            raise RuntimeError("stopped")
+
+    # no broken file left
+    assert not os.path.exists(path)
+
+
+def test_save_all_writer(monkeypatch):
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    frames = _make_frames()
+    durations = [700, 50, 50, 50, 700]
+
+    # Pillow of a version not checked
+    monkeypatch.setattr(AnimationWriter, "_PILLOW_VERSION", (99, 0))
+
+    for extension in ["gif", "webp", "png"]:
+        path_pillow = os.path.join(
+            DEFAULT_OUTPUT_PATH, "test_writer_pillow." + extension
+        )
+        path_writer = os.path.join(
+            DEFAULT_OUTPUT_PATH, "test_writer." + extension
+        )
+
+        frames[0].save(
+            path_pillow,
+            save_all=True,
+            append_images=frames[1:],
+            duration=durations,
+            loop=0,
+        )
+
+        with create_animation_writer(path_writer) as writer:
+            assert isinstance(writer, SaveAllWriter)
+            for frame, duration in zip(frames, durations):
+                writer.add_frame(frame, duration)
+
+        # same as Pillow
+        with open(path_pillow, "rb") as f_pillow, open(path_writer, "rb") as f:
+            assert f_pillow.read() == f.read()
+
+        os.remove(path_pillow)
+        os.remove(path_writer)
+
+
+def test_webp_apng_writer():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    frames = _make_frames()
+    durations = [700, 50, 50, 50, 700]
+
+    for extension in ["webp", "png"]:
+        path_pillow = os.path.join(
+            DEFAULT_OUTPUT_PATH, "test_writer_pillow." + extension
+        )
+        path_writer = os.path.join(
+            DEFAULT_OUTPUT_PATH, "test_writer." + extension
+        )
+
+        frames[0].save(
+            path_pillow,
+            save_all=True,
+            append_images=frames[1:],
+            duration=durations,
+            loop=0,
+        )
+
+        with create_animation_writer(path_writer) as writer:
+            for frame, duration in zip(frames, durations):
+                writer.add_frame(frame, duration)
+
+        # same as Pillow
+        with open(path_pillow, "rb") as f_pillow, open(path_writer, "rb") as f:
+            assert f_pillow.read() == f.read()
+
+        # durations kept, identical frame merged
+        with Image.open(path_writer) as animation:
+            assert animation.n_frames == 4
+            animation.seek(1)
+            animation.load()
+            assert animation.info["duration"] == 100
+
+        os.remove(path_pillow)
+        os.remove(path_writer)
+
+
+def test_create_animation_writer():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    frame = _make_frames()[0]
+
+    for filename, animation_format, writer_class in [
+        ("test_writer.gif", "auto", GifWriter),
+        ("test_writer.webp", "auto", WebPWriter),
+        ("test_writer.png", "auto", ApngWriter),
+        ("test_writer.apng", "auto", ApngWriter),
+        ("test_writer.unknown", "auto", GifWriter),
+        ("test_writer.gif", "webp", WebPWriter),
+    ]:
+        path = os.path.join(DEFAULT_OUTPUT_PATH, filename)
+        with create_animation_writer(path, animation_format) as writer:
+            assert isinstance(writer, writer_class)
+            writer.add_frame(frame, 100)
+        os.remove(path)
+
+    with pytest.raises(ValueError):
+        create_animation_writer(
+            os.path.join(DEFAULT_OUTPUT_PATH, "test_writer.gif"), "avi"
+        )
+
+
+def test_gif_writer_palette():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    path_pillow = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer_pillow.gif")
+    path_writer = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer.gif")
+
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(
+        [255, 255, 255, 200, 30, 30, 30, 30, 200, 120, 120, 120]
+    )
+    palette = palette_image.getpalette()
+    frames = [
+        frame.quantize(palette=palette_image, dither=Image.Dither.NONE)
+        for frame in _make_frames()
+    ]
+    durations = [700, 50, 50, 50, 700]
+
+    frames[0].save(
+        path_pillow,
+        save_all=True,
+        append_images=frames[1:],
+        duration=durations,
+        loop=0,
+        palette=palette,
+    )
+
+    with GifWriter(path_writer, palette=palette) as writer:
+        for frame, duration in zip(frames, durations):
+            writer.add_frame(frame, duration)
+
+    # same frames as Pillow
+    _assert_same_as_pillow(path_pillow, path_writer)
+
+    os.remove(path_pillow)
+    os.remove(path_writer)
+
+
+def test_gif_writer_transparent_unchanged():
+    ensure_directory_exists(DEFAULT_OUTPUT_PATH)
+    path_pillow = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer_pillow.gif")
+    path_writer = os.path.join(DEFAULT_OUTPUT_PATH, "test_writer.gif")
+
+    # corners changing, busy pixels unchanged between them
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 4, (100, 200), dtype=np.uint8) * 60
+    frames = []
+    for cnt in range(3):
+        pixels = background.copy()
+        pixels[:5, :5] = cnt * 80
+        pixels[-5:, -5:] = cnt * 80
+        frames.append(Image.fromarray(pixels, "L").convert("RGB"))
+    durations = [100, 100, 100]
+
+    frames[0].save(
+        path_pillow,
+        save_all=True,
+        append_images=frames[1:],
+        duration=durations,
+        loop=0,
+    )
+
+    with GifWriter(path_writer) as writer:
+        for frame, duration in zip(frames, durations):
+            writer.add_frame(frame, duration)
+
+    _assert_same_as_pillow(path_pillow, path_writer)
+
+    # unchanged pixels are transparent;
+    # flag in the graphic control extension of the 2nd frame
+    with open(path_writer, "rb") as f:
+        extensions = f.read().split(b"!\xf9\x04")
+    assert extensions[2][0] & 1
+
+    os.remove(path_pillow)
+    os.remove(path_writer)
@@ -2,7 +2,7 @@
 Observes how animation words
 """
 
-from AnimatedWordCloud import Config, animate
+from AnimatedWordCloud import Config, AnimationStats, animate
 from tests.TestDataGetter import raw_timelapses_test
 
 # testing data
@@ -17,3 +17,60 @@ config = Config(
 
 def test_animate():
     assert animate(less_raw_timelapse, config) != None
+
+
+def test_animate_stats():
+    stages = []
+    stats = AnimationStats(callback=lambda stage, _: stages.append(stage))
+    config_light = Config(max_words=10, n_frames_for_interpolation=2)
+
+    animate(less_raw_timelapse, config_light, stats=stats)
+
+    assert set(stats.stage_times.keys()) == {
+        "static_allocation",
+        "animated_allocation",
+        "create_images",
+        "integrate_images",
+    }
+    assert len(stats.frame_times) == len(less_raw_timelapse)
+    assert stats.counters["rays_launched"] > 0
+    assert stats.counters["ray_steps"] > 0
+    assert stats.counters["candidates_evaluated"] > 0
+    assert stats.counters["rect_collision_tests"] > 0
+    assert stats.counters["fonts_loaded"] > 0
+    assert "static_frame" in stages
+
+
+def test_animate_streaming():
+    stats = AnimationStats()
+    config_streaming = Config(
+        max_words=10, n_frames_for_interpolation=2, streaming=True
+    )
+
+    # generator input
+    path = animate(
+        (time_frame for time_frame in less_raw_timelapse),
+        config_streaming,
+        output_filename="output_streaming.gif",
+        stats=stats,
+    )
+
+    assert path != None
+    assert set(stats.stage_times.keys()) == {
+        "static_allocation",
+        "animated_allocation",
+        "create_images",
+        "integrate_images",
+    }
+    assert len(stats.frame_times) == len(less_raw_timelapse)
+
+
+def test_animate_webp():
+    config_light = Config(max_words=10, n_frames_for_interpolation=2)
+
+    path = animate(less_raw_timelapse, config_light, "output.webp")
+
+    assert path.endswith(".webp")
+    with open(path, "rb") as f:
+        header = f.read(12)
+    assert header[:4] == b"RIFF" and header[8:] == b"WEBP"
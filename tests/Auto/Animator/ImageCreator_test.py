@@ -8,7 +8,20 @@ Testing the ImageCreator classes
 """
 import os
 import glob
-from AnimatedWordCloud.Animator.ImageCreator import create_images
+import weakref
+from PIL import Image, ImageChops, ImageColor
+import numpy as np
+import pytest
+from AnimatedWordCloud.Animator import ImageCreator
+from AnimatedWordCloud.Animator.ImageCreator import (
+    create_images,
+    render_frames,
+    get_global_palette,
+    get_color_table,
+    colormap_color_func,
+    FramesBuffer,
+)
+from AnimatedWordCloud.Animator.RendererPool import RendererPool
 from AnimatedWordCloud.Utils import (
     AllocationTimelapse,
     AllocationInFrame,
@@ -30,3 +43,225 @@ def test_imagecreator():
     test_path = os.path.join(DEFAULT_OUTPUT_PATH, "test_0.png")
     assert os.path.isfile(test_path)
     os.remove(os.path.join(DEFAULT_OUTPUT_PATH, "test_0.png"))
+
+
+def test_render_frames():
+    position_in_frames = AllocationTimelapse()
+    for cnt in range(3):
+        allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+        allocation_in_frame.words = {"word": (30, (50 + cnt * 20, 50))}
+        position_in_frames.add(str(cnt), allocation_in_frame)
+    config = Config(intermediate_frames_id="test_render")
+
+    images = list(render_frames(position_in_frames, config))
+    image_paths = create_images(position_in_frames, config)
+
+    # same as the images saved
+    assert len(images) == 3
+    for image, image_path in zip(images, image_paths):
+        assert image.size == (config.image_width, config.image_height)
+        with Image.open(image_path) as image_saved:
+            difference = ImageChops.difference(image, image_saved)
+            assert difference.getbbox() is None
+        os.remove(image_path)
+
+
+def test_get_global_palette():
+    assert get_global_palette(Config()) is None
+
+    config = Config(
+        gif_palette="global", background_color="white", color_map="Dark2"
+    )
+    colors = _get_palette_colors(get_global_palette(config))
+
+    assert len(colors) <= 256
+    assert colors[0] == (255, 255, 255)
+    assert (0, 0, 0) in colors  # time stamp
+
+    # every color of the words
+    words = ["apple", "banana", "cherry", "durian", "elderberry"]
+    color_func = colormap_color_func(config.color_map)
+    for word in words:
+        color = color_func(word=word, font_size=10, position=(0, 0))
+        assert ImageColor.getrgb(color) in colors
+
+    # colors of the color table, as custom color functions give
+    color_table = {"apple": (1, 2, 3), "banana": (200, 100, 50)}
+    colors = _get_palette_colors(get_global_palette(config, color_table))
+    assert (1, 2, 3) in colors
+    assert (200, 100, 50) in colors
+    assert (0, 0, 0) in colors
+
+    # too many colors of the words, still with shades
+    for color_table in [
+        None,
+        {str(cnt): (cnt % 256, cnt // 256, 7) for cnt in range(300)},
+    ]:
+        config.color_map = "viridis"
+        colors = _get_palette_colors(get_global_palette(config, color_table))
+        assert len(colors) <= 256
+        assert (0, 0, 0) in colors
+
+        if color_table is None:
+            color_func = colormap_color_func(config.color_map)
+            word_colors = [
+                ImageColor.getrgb(
+                    color_func(word=word, font_size=10, position=(0, 0))
+                )
+                for word in words
+            ]
+        else:
+            word_colors = list(color_table.values())[::50]
+
+        # the colors and the anti-aliased edges are close to the palette
+        for word_color in word_colors:
+            for shade in [0.25, 0.5, 0.75, 1]:
+                color = np.array(word_color) * shade + 255 * (1 - shade)
+                distances = np.linalg.norm(np.array(colors) - color, axis=1)
+                assert distances.min() < 24
+
+    with pytest.raises(ValueError):
+        get_global_palette(Config(gif_palette="unknown"))
+
+
+def _get_palette_colors(palette):
+    colors = palette.getpalette()
+    return [tuple(colors[cnt : cnt + 3]) for cnt in range(0, len(colors), 3)]
+
+
+def test_render_frames_global_palette():
+    position_in_frames = AllocationTimelapse()
+    allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+    allocation_in_frame.words = {"word": (30, (50, 50))}
+    position_in_frames.add("0", allocation_in_frame)
+    config = Config(gif_palette="global")
+
+    image = next(render_frames(position_in_frames, config))
+    image_rgb = next(render_frames(position_in_frames, Config()))
+
+    # palette of the colors of the words
+    color_table = get_color_table(position_in_frames.timelapse, config)
+    assert image.mode == "P"
+    assert (
+        image.getpalette()
+        == get_global_palette(config, color_table).getpalette()
+    )
+
+    # same except anti-aliased edges
+    difference = ImageChops.difference(image.convert("RGB"), image_rgb)
+    assert max(extrema[1] for extrema in difference.getextrema()) < 64
+
+
+def test_get_color_table():
+    config = Config()
+    frames = []
+    for cnt in range(3):
+        allocation_in_frame = AllocationInFrame(from_static_allocation=False)
+        allocation_in_frame.words = {
+            "apple": (10 + cnt, (0, 0)),
+            "banana": (20, (cnt, 0)),
+        }
+        frames.append((str(cnt), allocation_in_frame))
+
+    # same colors as the color function
+    color_func = colormap_color_func(config.color_map)
+    color_table = get_color_table(frames, config)
+    for word in ["apple", "banana"]:
+        color = color_func(word=word, font_size=10, position=(0, 0))
+        assert color_table[word] == ImageColor.getrgb(color)
+
+    # custom function called once per word
+    calls = []
+
+    def custom_color_func(word, font_size, position, **kwargs):
+        calls.append(word)
+        return "red"
+
+    color_table = get_color_table(frames, config, custom_color_func)
+    assert color_table == {"apple": (255, 0, 0), "banana": (255, 0, 0)}
+    assert calls == ["apple", "banana"]
+
+    # only new words added
+    allocation_in_frame = AllocationInFrame(from_static_allocation=False)
+    allocation_in_frame.words = {"apple": (10, (0, 0)), "cherry": (10, (0, 0))}
+    get_color_table(
+        [("3", allocation_in_frame)], config, custom_color_func, color_table
+    )
+    assert calls == ["apple", "banana", "cherry"]
+    assert "cherry" in color_table
+
+
+def test_frames_buffer():
+    config = Config(image_width=40, image_height=30)
+    image = Image.new("RGB", (40, 30), "red")
+
+    with FramesBuffer(3, config) as frames_buffer:
+        path = frames_buffer.path
+        frames_buffer.write(2, image)
+        image_read = frames_buffer.read(2)
+
+    # removed, and the image still usable
+    assert not os.path.exists(path)
+    assert ImageChops.difference(image, image_read).getbbox() is None
+
+
+def test_render_frames_bounded_buffer(monkeypatch):
+    position_in_frames = AllocationTimelapse()
+    for cnt in range(5):
+        allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+        allocation_in_frame.words = {"word": (30, (50 + cnt * 20, 50))}
+        position_in_frames.add(str(cnt), allocation_in_frame)
+
+    for config in [Config(), Config(gif_palette="global")]:
+        images_expected = list(render_frames(position_in_frames, config))
+
+        # 2 frames in the buffer at a time
+        palette = get_global_palette(config)
+        frame_size = config.image_width * config.image_height
+        if palette is None:
+            frame_size *= 3
+        with monkeypatch.context() as patch:
+            patch.setattr(ImageCreator, "FRAMES_BUFFER_SIZE", frame_size * 2)
+            with RendererPool(n_workers=1) as pool:
+                images_list = [
+                    list(render_frames(position_in_frames, config)),
+                    list(
+                        render_frames(
+                            position_in_frames, config, renderer_pool=pool
+                        )
+                    ),
+                ]
+
+        for images in images_list:
+            assert len(images) == 5
+            for image, image_expected in zip(images, images_expected):
+                assert np.array_equal(
+                    np.asarray(image), np.asarray(image_expected)
+                )
+
+
+def test_render_frames_lazily(monkeypatch):
+    position_in_frames = AllocationTimelapse()
+    for cnt in range(5):
+        allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+        allocation_in_frame.words = {"word": (30, (50 + cnt * 20, 50))}
+        position_in_frames.add(str(cnt), allocation_in_frame)
+    config = Config()
+
+    # 2 frames in the buffer at a time
+    frame_size = config.image_width * config.image_height * 3
+    monkeypatch.setattr(ImageCreator, "FRAMES_BUFFER_SIZE", frame_size * 2)
+
+    with RendererPool(n_workers=1, chunk_size=1) as pool:
+        for renderer_pool in [None, pool]:
+            images = render_frames(
+                position_in_frames, config, renderer_pool=renderer_pool
+            )
+
+            # images consumed are not kept
+            references = []
+            for image in images:
+                references.append(weakref.ref(image))
+                del image
+                assert sum(ref() is not None for ref in references) <= 1
+            assert len(references) == 5
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the RendererPool module
+"""
+
+import os
+import numpy as np
+from AnimatedWordCloud import RendererPool, animate
+from AnimatedWordCloud.Animator.ImageCreator import render_frames
+from AnimatedWordCloud.Utils import (
+    AllocationTimelapse,
+    AllocationInFrame,
+    AnimationStats,
+    Config,
+)
+from tests.TestDataGetter import raw_timelapses_test
+
+
+def _make_timelapse(n_frames: int) -> AllocationTimelapse:
+    position_in_frames = AllocationTimelapse()
+    for cnt in range(n_frames):
+        allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+        allocation_in_frame.words = {
+            "word": (30, (50 + cnt * 20, 50)),
+            "other": (20.5, (200, 100 + cnt * 10)),
+        }
+        position_in_frames.add(str(cnt), allocation_in_frame)
+
+    return position_in_frames
+
+
+def test_renderer_pool():
+    position_in_frames = _make_timelapse(5)
+    config = Config()
+    config_palette = Config(gif_palette="global", renderer="sprite")
+
+    with RendererPool(config, n_workers=2, chunk_size=2) as pool:
+        for config_rendering in [config, config_palette, config]:
+            stats = AnimationStats()
+            with stats.activate():
+                images = list(
+                    render_frames(
+                        position_in_frames,
+                        config_rendering,
+                        renderer_pool=pool,
+                    )
+                )
+            images_expected = render_frames(
+                position_in_frames, config_rendering
+            )
+
+            # same as rendered without the pool
+            assert len(images) == 5
+            for image, image_expected in zip(images, images_expected):
+                assert image.mode == image_expected.mode
+                assert np.array_equal(
+                    np.asarray(image), np.asarray(image_expected)
+                )
+
+            # 3 chunks of 2, 2 and 1 frames
+            assert stats.counters["render_chunks"] == 3
+
+    # closed, and restarted if used again
+    assert pool._executor is None
+    images = pool.render_frames(
+        position_in_frames.timelapse,
+        config,
+        {"word": (0, 0, 0), "other": (0, 0, 0)},
+    )
+    assert len(list(images)) == 5
+    pool.close()
+
+
+def test_renderer_pool_colors():
+    position_in_frames = _make_timelapse(4)
+    frames = position_in_frames.timelapse
+    config = Config()
+    colors = {
+        "red": {"word": (255, 0, 0), "other": (255, 0, 0)},
+        "blue": {"word": (0, 0, 255), "other": (0, 0, 255)},
+    }
+
+    # started with no color, as the service does
+    with RendererPool(config, n_workers=1, chunk_size=2) as pool:
+        for color in ["red", "blue", "red"]:
+            images = list(pool.render_frames(frames, config, colors[color]))
+
+            # same as rendered without the pool
+            images_expected = render_frames(
+                position_in_frames,
+                config,
+                lambda color=color, **kwargs: color,
+            )
+            for image, image_expected in zip(images, images_expected):
+                assert np.array_equal(
+                    np.asarray(image), np.asarray(image_expected)
+                )
+
+        # held by the worker, not sent anymore
+        assert pool.color_table == colors["red"]
+        assert pool._get_new_colors(frames, colors["red"]) == {}
+
+        # recolored words are sent
+        assert pool._get_new_colors(frames, colors["blue"]) == colors["blue"]
+
+
+def test_animate_with_renderer_pool():
+    config = Config(max_words=10, n_frames_for_interpolation=2)
+    config_streaming = Config(
+        max_words=10, n_frames_for_interpolation=2, streaming=True
+    )
+
+    # same pool for the next animation
+    with RendererPool(n_workers=2) as pool:
+        for config_animation, output_filename in [
+            (config, "output_pool_0.gif"),
+            (config_streaming, "output_pool_1.gif"),
+        ]:
+            path = animate(
+                raw_timelapses_test[0][:2],
+                config_animation,
+                output_filename=output_filename,
+                renderer_pool=pool,
+            )
+            assert os.path.isfile(path)
+            os.remove(path)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the SpriteRenderer module
+"""
+
+import numpy as np
+import pytest
+from AnimatedWordCloud.Animator.ImageCreator import render_frame
+from AnimatedWordCloud.Animator.SpriteRenderer import (
+    get_sprite,
+    get_scaled_sprite,
+    get_sprite_cache_info,
+    clear_sprite_cache,
+)
+from AnimatedWordCloud.Utils import (
+    AllocationInFrame,
+    Config,
+    DEFAULT_ENG_FONT_PATH,
+)
+
+
+def test_get_sprite():
+    clear_sprite_cache()
+
+    alpha, offset = get_sprite(DEFAULT_ENG_FONT_PATH, "word", 30)
+    assert alpha.ndim == 3
+    assert alpha.dtype == np.uint8
+    assert alpha.max() == 255
+    assert get_sprite(DEFAULT_ENG_FONT_PATH, "word", 30)[0] is alpha
+
+    # bounded by the bytes of the masks
+    info = get_sprite_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+    assert info["size"] == alpha.nbytes
+
+
+def test_render_frame_with_sprites():
+    allocation_in_frame = AllocationInFrame(from_static_allocation=True)
+    allocation_in_frame.words = {
+        "apple": (30, (50, 50)),
+        "banana": (20.3, (100, 80)),
+        "overlapping": (25, (60, 55)),
+        "clipped": (40, (770, 580)),
+    }
+
+    # same as Pillow at whole pixel positions
+    image_pillow = render_frame(allocation_in_frame, Config(), "2024")
+    image_sprite = render_frame(
+        allocation_in_frame, Config(renderer="sprite"), "2024"
+    )
+    assert np.array_equal(np.asarray(image_pillow), np.asarray(image_sprite))
+
+    with pytest.raises(ValueError):
+        render_frame(allocation_in_frame, Config(renderer="unknown"), "2024")
+
+
+def test_get_scaled_sprite():
+    clear_sprite_cache()
+
+    alpha_base, _ = get_sprite(DEFAULT_ENG_FONT_PATH, "word", 40)
+    alpha, _ = get_scaled_sprite(DEFAULT_ENG_FONT_PATH, "word", 30, 40)
+    assert alpha.shape[0] == round(alpha_base.shape[0] * 0.75)
+    assert alpha.shape[1] == round(alpha_base.shape[1] * 0.75)
+    assert alpha.shape[2] == 1
+
+    # base rasterized once, scaled once
+    get_scaled_sprite(DEFAULT_ENG_FONT_PATH, "word", 30, 40)
+    assert get_sprite_cache_info()["misses"] == 2
+
+
+def test_render_frame_with_scaled_sprites():
+    allocation_in_frame = AllocationInFrame(from_static_allocation=False)
+    allocation_in_frame.words = {
+        "large": (36, (50, 50)),
+        "small": (12, (50, 150)),
+    }
+    allocation_in_frame.base_font_sizes = {"large": 48, "small": 16}
+
+    image_pillow = np.asarray(
+        render_frame(allocation_in_frame, Config(), "2024"), dtype=int
+    )
+    image_sprite = np.asarray(
+        render_frame(allocation_in_frame, Config(renderer="sprite"), "2024"),
+        dtype=int,
+    )
+    image_scaled = np.asarray(
+        render_frame(
+            allocation_in_frame, Config(renderer="scaled_sprite"), "2024"
+        ),
+        dtype=int,
+    )
+
+    # small font drawn exactly
+    assert np.array_equal(image_scaled[120:], image_sprite[120:])
+
+    # large font approximated
+    assert not np.array_equal(image_scaled[:120], image_sprite[:120])
+    assert np.abs(image_scaled - image_pillow).mean() < 2
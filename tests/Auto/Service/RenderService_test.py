@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the RenderService with its client
+"""
+
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+import pytest
+from AnimatedWordCloud.Service import RenderService, RenderServiceClient
+from AnimatedWordCloud.Utils import Config
+from tests.TestDataGetter import raw_timelapses_test
+
+less_raw_timelapse = raw_timelapses_test[0][:2]
+config_arguments = {"max_words": 10, "n_frames_for_interpolation": 2}
+
+
+def test_render_service_submit():
+    with RenderService(n_allocation_workers=1, n_render_workers=2) as service:
+        futures = [
+            service.submit(
+                less_raw_timelapse,
+                Config(**config_arguments),
+                output_filename=f"output_service_{cnt}.gif",
+            )
+            for cnt in range(3)
+        ]
+        results = [future.result() for future in futures]
+
+        for result in results:
+            assert os.path.isfile(result["path"])
+            assert result["latency_seconds"] >= result["run_seconds"]
+            os.remove(result["path"])
+
+        stats = service.get_stats()
+        assert stats["queue_depth"] == 0
+        assert stats["running"] == 0
+        assert stats["completed"] == 3
+        assert (
+            stats["latency_seconds"]["max"]
+            >= stats["latency_seconds"]["median"]
+        )
+
+
+def test_render_service_unique_files():
+    config = Config(**config_arguments)
+    path_shared = os.path.join(config.output_path, "output_service.gif")
+
+    with RenderService(n_allocation_workers=1, n_render_workers=2) as service:
+        # jobs run at once, returning the same name
+        futures = [
+            service.submit(
+                less_raw_timelapse,
+                config,
+                output_filename="output_service.gif",
+                return_bytes=True,
+            )
+            for _ in range(2)
+        ]
+        futures.append(service.submit(less_raw_timelapse, config))
+        results = [future.result() for future in futures]
+
+    for result in results[:2]:
+        assert result["data"][:6] == b"GIF89a"
+    assert not os.path.exists(path_shared)
+
+    # unique name if not given
+    assert os.path.isfile(results[2]["path"])
+    assert results[2]["path"] != path_shared
+    os.remove(results[2]["path"])
+
+
+def test_render_service_without_unix_socket(monkeypatch):
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+
+    with RenderService(n_allocation_workers=1, n_render_workers=1) as service:
+        with pytest.raises(RuntimeError):
+            service.serve(os.path.join(tempfile.mkdtemp(), "service.sock"))
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="UNIX sockets not available"
+)
+def test_render_service_socket():
+    socket_path = os.path.join(tempfile.mkdtemp(), "service.sock")
+
+    service = RenderService(n_allocation_workers=1, n_render_workers=2)
+    thread = threading.Thread(target=service.serve, args=(socket_path,))
+    thread.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+
+    # only the user running the service can connect
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) & 0o077 == 0
+
+    try:
+        with RenderServiceClient(socket_path) as client:
+            result = client.animate(
+                less_raw_timelapse,
+                config_arguments,
+                output_filename="output_service_socket.gif",
+                return_bytes=True,
+            )
+
+            # the animation itself, file removed
+            assert result["data"][:6] == b"GIF89a"
+            assert not os.path.isfile(
+                os.path.join(Config().output_path, "output_service_socket.gif")
+            )
+
+            # error of the job sent back
+            with pytest.raises(RuntimeError):
+                client.animate(less_raw_timelapse, {"gif_palette": "unknown"})
+
+            # files of the server are not chosen by the request
+            with pytest.raises(RuntimeError):
+                client.animate(less_raw_timelapse, {"output_path": "/tmp"})
+            with pytest.raises(RuntimeError):
+                client.animate(
+                    less_raw_timelapse, output_filename="../output.gif"
+                )
+
+            stats = client.get_stats()
+            assert stats["completed"] == 1
+            assert stats["failed"] == 1
+            assert stats["queue_depth"] == 0
+    finally:
+        service.close()
+        thread.join()
+
+    assert not os.path.exists(socket_path)
@@ -10,6 +10,7 @@ testing the AnimatedWordCloud module
 from AnimatedWordCloud.Utils import (
     AllocationInFrame,
     AllocationTimelapse,
+    Config,
 )
 
 
@@ -21,6 +22,20 @@ def test_AllocationInFrame():
     instance.add("test2", 20, (10, 10))
     assert instance["test"] == (10, (0, 0))
 
+    # test get_duration
+    config = Config()
+    assert instance.get_duration(config) == config.duration_per_static_frame
+    instance.duration = 123
+    assert instance.get_duration(config) == 123
+
+    # test has_same_words; drawing order matters
+    other = AllocationInFrame(from_static_allocation=False)
+    other.add("test2", 20, (10, 10))
+    other.add("test", 10, (0, 0))
+    assert not instance.has_same_words(other)
+    other.words = dict(instance.words)
+    assert instance.has_same_words(other)
+
 
 def test_AllocationTimelapse():
     instance = AllocationTimelapse()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+testing AnimationStats module
+"""
+
+from AnimatedWordCloud.Utils import (
+    AnimationStats,
+    get_current_stats,
+    measure_stage,
+    call_with_stats,
+)
+
+
+def test_activate():
+    stats = AnimationStats()
+    assert get_current_stats() is None
+
+    with stats.activate():
+        assert get_current_stats() is stats
+        with measure_stage("stage"):
+            get_current_stats().count("event")
+            get_current_stats().count("event", 2)
+
+    assert get_current_stats() is None
+    assert stats.counters == {"event": 3}
+    assert "stage" in stats.stage_times
+
+    # not recorded without activation
+    with measure_stage("stage_other"):
+        pass
+    assert "stage_other" not in stats.stage_times
+
+
+def test_call_with_stats():
+    def function(n):
+        get_current_stats().count("event", n)
+        get_current_stats().add_frame_time(1.0)
+        return n * 2
+
+    result, stats_recorded = call_with_stats(function, 5)
+    assert result == 10
+
+    stats = AnimationStats()
+    stats.merge(stats_recorded)
+    assert stats.to_dict() == {
+        "stage_times": {},
+        "frame_times": [1.0],
+        "counters": {"event": 5},
+    }
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the LRUCache class
+"""
+
+from AnimatedWordCloud.Utils import LRUCache
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # "a" becomes the most recently used
+    assert cache.get("a") == 1
+
+    # "b" is evicted
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    info = cache.get_info()
+    assert info["hits"] == 2
+    assert info["misses"] == 1
+    assert info["size"] == 2
+    assert info["max_size"] == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get_info()["hits"] == 0
+
+
+def test_lru_cache_sized():
+    # bounded by the total length of the values
+    cache = LRUCache(5, len)
+    cache.put("a", "xx")
+    cache.put("b", "xx")
+    assert cache.get_info()["size"] == 4
+
+    # "a" evicted to fit
+    cache.put("c", "xx")
+    assert "a" not in cache
+    assert cache.get_info()["size"] == 4
+
+    # replaced, not counted twice
+    cache.put("c", "xxx")
+    assert cache.get_info()["size"] == 5
+    assert len(cache) == 2
+
+    # larger than the cache, not kept
+    cache.put("d", "xxxxxx")
+    assert len(cache) == 0
+    assert cache.get_info()["size"] == 0
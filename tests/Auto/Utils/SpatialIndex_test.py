@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the SpatialIndex module
+"""
+
+import random
+from AnimatedWordCloud.Utils import (
+    RectSpatialIndex,
+    Rect,
+    is_point_hitting_rects,
+    is_rect_hitting_rects,
+)
+
+
+def _make_random_rect() -> Rect:
+    x = random.uniform(-50, 250)
+    y = random.uniform(-50, 250)
+    return Rect((x, y), (x + random.uniform(1, 60), y + random.uniform(1, 20)))
+
+
+def test_rect_spatial_index():
+    random.seed(0)
+    rects = [_make_random_rect() for _ in range(50)]
+
+    index = RectSpatialIndex(25)
+    for rect in rects:
+        index.add(rect)
+
+    assert len(index) == 50
+    assert set(index) == set(rects)
+
+    # same results as checking all rects
+    for _ in range(500):
+        point = (random.uniform(-60, 260), random.uniform(-60, 260))
+        assert (
+            index.is_point_hitting(point)[0]
+            == is_point_hitting_rects(point, rects)[0]
+        )
+
+        rect = _make_random_rect()
+        assert index.is_rect_hitting(rect) == is_rect_hitting_rects(
+            rect, rects
+        )
+
+    # touching edges are hitting
+    index = RectSpatialIndex(10, [Rect((0, 0), (10, 10))])
+    assert index.is_rect_hitting(Rect((10, 10), (20, 20)))
+    assert not index.is_point_hitting((10, 5))[0]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the TextMetricsStore module
+"""
+
+import os
+from AnimatedWordCloud.Utils import (
+    DEFAULT_ENG_FONT_PATH,
+    TextMetricsStore,
+    get_text_metrics_store,
+    get_font_hash,
+    measure_texts,
+    clear_text_metrics_cache,
+)
+
+
+def test_text_metrics_store(tmp_path):
+    path = os.path.join(tmp_path, "metrics.sqlite")
+    font_hash = get_font_hash(DEFAULT_ENG_FONT_PATH)
+
+    store = TextMetricsStore(path, max_entries=2)
+    store.put_widths(font_hash, {(10, "a"): 6.0, (10, "b"): 6.0})
+    assert store.get_widths(font_hash, [(10, "a"), (20, "a")]) == {
+        (10, "a"): 6.0
+    }
+
+    # "b" is least recently used
+    store.put_widths(font_hash, {(10, "c"): 6.0})
+    assert store.count() == 2
+    assert store.get_widths(font_hash, [(10, "b")]) == {}
+    store.close()
+
+    # persisted
+    store = TextMetricsStore(path, max_entries=2)
+    assert store.get_widths(font_hash, [(10, "c")]) == {(10, "c"): 6.0}
+    store.close()
+
+
+def test_text_metrics_store_flush(tmp_path):
+    path = os.path.join(tmp_path, "metrics.sqlite")
+    font_hash = get_font_hash(DEFAULT_ENG_FONT_PATH)
+
+    store = TextMetricsStore(path, max_entries=10)
+    store_other = TextMetricsStore(path, max_entries=10)
+
+    # buffered, but found by the store itself
+    store.put_widths(font_hash, {(10, "a"): 6.0})
+    assert store.get_widths(font_hash, [(10, "a")]) == {(10, "a"): 6.0}
+    assert store_other.get_widths(font_hash, [(10, "a")]) == {}
+
+    # committed
+    store.flush()
+    assert store_other.get_widths(font_hash, [(10, "a")]) == {(10, "a"): 6.0}
+
+    store.close()
+    store_other.close()
+
+
+def test_get_text_metrics_store(tmp_path):
+    path = os.path.join(tmp_path, "metrics.sqlite")
+
+    store = get_text_metrics_store(path, 10)
+    assert get_text_metrics_store(path, 10) is store
+
+    # another limit is not ignored
+    store_other = get_text_metrics_store(path, 20)
+    assert store_other is not store
+    assert store_other.max_entries == 20
+
+    store.close()
+    store_other.close()
+
+
+def test_measure_texts_with_store(tmp_path):
+    clear_text_metrics_cache()
+    store = TextMetricsStore(os.path.join(tmp_path, "m.sqlite"), 100)
+
+    widths, _ = measure_texts(["Hello", "a"], [10, 20], DEFAULT_ENG_FONT_PATH)
+    widths_stored, _ = measure_texts(
+        ["Hello", "a"], [10, 20], DEFAULT_ENG_FONT_PATH, store
+    )
+    assert widths.tolist() == widths_stored.tolist()
+    assert store.count() == 2
+
+    # from the store
+    clear_text_metrics_cache()
+    widths_stored, _ = measure_texts(
+        ["Hello", "a"], [10, 20], DEFAULT_ENG_FONT_PATH, store
+    )
+    assert widths.tolist() == widths_stored.tolist()
+
+    # the store is not consulted for words memoized in the process
+    get_widths = store.get_widths
+    store.get_widths = None
+    widths_stored, _ = measure_texts(
+        ["Hello", "a"], [10, 20], DEFAULT_ENG_FONT_PATH, store
+    )
+    assert widths.tolist() == widths_stored.tolist()
+    store.get_widths = get_widths
+
+    store.close()
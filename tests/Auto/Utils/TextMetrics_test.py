@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Testing the TextMetrics and FontCache modules
+"""
+
+from AnimatedWordCloud.Utils import TextMetrics
+from AnimatedWordCloud.Utils import (
+    DEFAULT_ENG_FONT_PATH,
+    measure_text,
+    measure_texts,
+    get_text_metrics_cache_info,
+    clear_text_metrics_cache,
+    get_font,
+    quantize_font_size,
+    get_font_cache_info,
+    clear_font_cache,
+)
+
+
+def test_get_font():
+    clear_font_cache()
+
+    font = get_font(DEFAULT_ENG_FONT_PATH, 20)
+    assert get_font(DEFAULT_ENG_FONT_PATH, 20) is font
+
+    info = get_font_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+
+
+def test_quantize_font_size():
+    assert quantize_font_size(20.3, 0.5) == 20.5
+    assert quantize_font_size(20.2, 0.5) == 20.0
+    assert quantize_font_size(20.3, 1) == 20
+    assert quantize_font_size(20.3, None) == 20.3
+
+    # interpolated sizes share fonts
+    clear_font_cache()
+    for cnt in range(10):
+        get_font(
+            DEFAULT_ENG_FONT_PATH, quantize_font_size(20 + cnt * 0.01, 0.5)
+        )
+    assert get_font_cache_info()["misses"] == 1
+
+
+def test_measure_text():
+    clear_text_metrics_cache()
+
+    size = measure_text("Hello", 100, DEFAULT_ENG_FONT_PATH)
+    assert size[0] > 50
+    assert size[1] == 100
+
+    # second time from the cache
+    assert measure_text("Hello", 100, DEFAULT_ENG_FONT_PATH) == size
+
+    info = get_text_metrics_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+
+
+def test_measure_texts():
+    words = ["Hello", "", "AV", "fi", "日本語", "مرحبا", "Hello"]
+    font_sizes = [10, 20, 30, 12, 20, 20, 11]
+
+    widths, heights = measure_texts(words, font_sizes, DEFAULT_ENG_FONT_PATH)
+
+    # same as measuring one by one
+    for word, font_size, width, height in zip(
+        words, font_sizes, widths, heights
+    ):
+        assert (width, height) == measure_text(
+            word, font_size, DEFAULT_ENG_FONT_PATH
+        )
+
+    # empty input
+    assert len(measure_texts([], [], DEFAULT_ENG_FONT_PATH)[0]) == 0
+
+
+class _KernedFont:
+    """
+    Font wrapper narrowing "AV", as a font with kerning does
+    """
+
+    def __init__(self, font):
+        self.font = font
+
+    def getlength(self, text):
+        return self.font.getlength(text) - 3 * text.count("AV")
+
+
+def test_measure_texts_kerning(monkeypatch):
+    monkeypatch.setattr(
+        TextMetrics,
+        "get_font",
+        lambda font_path, font_size: _KernedFont(
+            get_font(font_path, font_size)
+        ),
+    )
+    clear_text_metrics_cache()
+
+    # the kerned pair is the last pair of the text, after an empty word
+    words = ["", "Hello", "AV"]
+    font_sizes = [37, 37, 37]
+
+    widths, _ = measure_texts(words, font_sizes, DEFAULT_ENG_FONT_PATH)
+
+    for word, font_size, width in zip(words, font_sizes, widths):
+        assert width == _KernedFont(
+            get_font(DEFAULT_ENG_FONT_PATH, font_size)
+        ).getlength(word)
+
+    clear_text_metrics_cache()
@@ -0,0 +1,477 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2023 AnimatedWordCloud Project
+# https://github.com/konbraphat51/AnimatedWordCloud
+#
+# Licensed under the MIT License.
+"""
+Benchmark of each stage of the pipeline
+
+Times each stage separately, and the whole `animate()`,
+    on the Elon Musk timelapse and its scaled variants.
+Results are saved as JSON, so as runs on different commits can be compared.
+
+usage:
+    python -m tests.Benchmark.Benchmark --output benchmark.json
+    python -m tests.Benchmark.Benchmark --scenarios elon --repeat 3 \\
+        --config frontier_engine=analytic candidate_evaluation=best_first
+"""
+
+from __future__ import annotations
+import argparse
+import ast
+import copy
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Any, Callable
+from AnimatedWordCloud import animate, RendererPool
+from AnimatedWordCloud.Utils import (
+    Config,
+    TimelapseWordVector,
+    RectSpatialIndex,
+    Rect,
+    Word,
+    clear_font_cache,
+    clear_text_metrics_cache,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationCalculator import (
+    allocate_all,
+    calculate_font_size,
+    estimate_text_size,
+    estimate_text_sizes,
+    _allocate_first_frame,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies import (
+    MagneticAllocation,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.StaticAllocationCalculator.StaticAllocationStrategies.MagneticAllocation.MagnetOuterFrontier import (
+    MagnetOuterFrontier,
+    get_magnet_outer_frontier,
+)
+from AnimatedWordCloud.Animator.AllocationCalculator.AnimatetdAllocationCalculator import (
+    animated_allocate,
+)
+from AnimatedWordCloud.Animator.ImageCreator import (
+    create_images,
+    render_frames,
+)
+from AnimatedWordCloud.Animator.AnimationIntegrator import integrate_images
+from tests.TestDataGetter import raw_timelapses_test
+
+STAGES = [
+    "estimate_text_size",
+    "get_magnet_outer_frontier",
+    "MagneticAllocation.allocate",
+    "allocate_all",
+    "animated_allocate",
+    "create_images",
+    "render_frames",
+    "render_frames_sprite",
+    "render_frames_scaled_sprite",
+    "render_frames_pool",
+    "integrate_images",
+    "integrate_images_webp",
+    "integrate_images_apng",
+    "animate",
+]
+
+
+def get_scenarios() -> dict[str, dict[str, Any]]:
+    """
+    Get the inputs to benchmark
+
+    :return: name -> {"description", "timelapse", "config"};
+        "config" is keyword arguments of Config
+    :rtype: dict[str, dict[str, Any]]
+    """
+
+    raw_timelapse = raw_timelapses_test[0]
+
+    return {
+        "elon": {
+            "description": "Elon Musk timelapse as is",
+            "timelapse": raw_timelapse,
+            "config": {"max_words": 50},
+        },
+        "elon_more_words": {
+            "description": "4x words in each frame",
+            "timelapse": _scale_words(raw_timelapse, 4),
+            "config": {"max_words": 200},
+        },
+        "elon_more_frames": {
+            "description": "Timelapse repeated 3 times",
+            "timelapse": _scale_frames(raw_timelapse, 3),
+            "config": {"max_words": 50},
+        },
+        "elon_large_canvas": {
+            "description": "1920x1080 image with larger fonts",
+            "timelapse": raw_timelapse,
+            "config": {
+                "max_words": 50,
+                "image_width": 1920,
+                "image_height": 1080,
+                "max_font_size": 120,
+                "min_font_size": 24,
+            },
+        },
+    }
+
+
+def _scale_words(
+    raw_timelapse: list[tuple[str, dict[str, float]]], factor: int
+) -> list[tuple[str, dict[str, float]]]:
+    """
+    Make each frame have `factor` times words
+
+    Copies of each word are added with smaller weights.
+
+    :param list[tuple[str,dict[str,float]]] raw_timelapse: Original data
+    :param int factor: Times of words
+    :return: Scaled data
+    :rtype: list[tuple[str, dict[str, float]]]
+    """
+
+    output = []
+    for time_name, word_vector in raw_timelapse:
+        word_vector_scaled = dict(word_vector)
+        for cnt in range(1, factor):
+            for word, weight in word_vector.items():
+                word_vector_scaled[f"{word}{cnt}"] = weight / (cnt + 1)
+        output.append((time_name, word_vector_scaled))
+
+    return output
+
+
+def _scale_frames(
+    raw_timelapse: list[tuple[str, dict[str, float]]], factor: int
+) -> list[tuple[str, dict[str, float]]]:
+    """
+    Repeat the frames `factor` times
+
+    :param list[tuple[str,dict[str,float]]] raw_timelapse: Original data
+    :param int factor: Times of frames
+    :return: Scaled data
+    :rtype: list[tuple[str, dict[str, float]]]
+    """
+
+    output = []
+    for cnt in range(factor):
+        for time_name, word_vector in raw_timelapse:
+            output.append((f"{time_name}_{cnt}", word_vector))
+
+    return output
+
+
+def benchmark_scenario(
+    raw_timelapse: list[tuple[str, dict[str, float]]],
+    config: Config,
+    stages: list[str],
+    repeat: int,
+) -> dict[str, dict[str, Any]]:
+    """
+    Time each stage of a scenario
+
+    Inputs of each stage are computed once by the former stages,
+        so as stages can be timed separately.
+
+    :param list[tuple[str,dict[str,float]]] raw_timelapse: Input data
+    :param Config config: Config instance
+    :param list[str] stages: Stages to time
+    :param int repeat: Times to repeat each stage
+    :return: stage -> {"times", "min", "median"} in seconds.
+        Stages writing the animation file also have "file_size" in bytes.
+    :rtype: dict[str, dict[str, Any]]
+    """
+
+    timelapse = TimelapseWordVector.convert_from_dicts_list(raw_timelapse)
+    results = {}
+
+    def run(stage: str, function: Callable[[], Any]) -> Any:
+        # time the stage if requested, returning the last output
+        if stage not in stages:
+            return function()
+
+        times = []
+        for _ in range(repeat):
+            time_start = time.perf_counter()
+            output = function()
+            times.append(time.perf_counter() - time_start)
+        results[stage] = {
+            "times": times,
+            "min": min(times),
+            "median": statistics.median(times),
+        }
+
+        return output
+
+    # words and sizes of the first frame
+    word_weights = timelapse[0].word_vector.get_ranking(0, config.max_words)
+    font_sizes = [
+        calculate_font_size(
+            weight,
+            word_weights[0][1],
+            word_weights[-1][1],
+            config.max_font_size,
+            config.min_font_size,
+        )
+        for _, weight in word_weights
+    ]
+
+    # measuring every word of every frame, without caches
+    pairs = []
+    for cnt in range(len(timelapse)):
+        ranking = timelapse[cnt].word_vector.get_ranking(0, config.max_words)
+        for word, weight in ranking:
+            font_size = calculate_font_size(
+                weight,
+                ranking[0][1],
+                ranking[-1][1],
+                config.max_font_size,
+                config.min_font_size,
+            )
+            pairs.append((word, font_size))
+
+    def measure_all() -> None:
+        clear_font_cache()
+        clear_text_metrics_cache()
+        for word, font_size in pairs:
+            estimate_text_size(word, font_size, config.font_path)
+
+    run("estimate_text_size", measure_all)
+
+    words = [
+        Word(word, weight, font_size, text_size)
+        for (word, weight), font_size, text_size in zip(
+            word_weights,
+            font_sizes,
+            estimate_text_sizes(
+                [word for word, _ in word_weights],
+                font_sizes,
+                config.font_path,
+            ),
+        )
+    ]
+    first_frame = _allocate_first_frame(timelapse[0].word_vector, config)
+
+    allocation = run(
+        "MagneticAllocation.allocate",
+        lambda: MagneticAllocation(config).allocate(
+            words, copy.deepcopy(first_frame)
+        ),
+    )
+
+    # frontier of the rects allocated above, added one by one
+    rects = []
+    for word in words:
+        left_top = allocation[word.text][1]
+        rects.append(
+            Rect(
+                left_top,
+                (
+                    left_top[0] + word.text_size[0],
+                    left_top[1] + word.text_size[1],
+                ),
+            )
+        )
+
+    def find_frontiers() -> None:
+        interval_x = config.image_width / config.image_division
+        interval_y = config.image_height / config.image_division
+        frontier = MagnetOuterFrontier(
+            config.image_width, config.image_height, interval_x, interval_y
+        )
+        rects_index = RectSpatialIndex(config.max_font_size * 2)
+        for rect in rects:
+            rects_index.add(rect)
+            frontier = get_magnet_outer_frontier(
+                rects_index,
+                config.image_width,
+                config.image_height,
+                interval_x,
+                interval_y,
+                rect,
+                frontier,
+            )
+
+    run("get_magnet_outer_frontier", find_frontiers)
+
+    allocation_static = run(
+        "allocate_all", lambda: allocate_all(timelapse, config)
+    )
+    allocation_animated = run(
+        "animated_allocate",
+        lambda: animated_allocate(allocation_static, config),
+    )
+    if "create_images" in stages:
+        run(
+            "create_images",
+            lambda: create_images(allocation_animated, config),
+        )
+    images = run(
+        "render_frames",
+        lambda: list(render_frames(allocation_animated, config)),
+    )
+    for stage, renderer in [
+        ("render_frames_sprite", "sprite"),
+        ("render_frames_scaled_sprite", "scaled_sprite"),
+    ]:
+        if stage not in stages:
+            continue
+
+        config_sprite = copy.copy(config)
+        config_sprite.renderer = renderer
+        run(
+            stage,
+            lambda: list(render_frames(allocation_animated, config_sprite)),
+        )
+
+    if "render_frames_pool" in stages:
+        with RendererPool() as pool:
+            # workers started and warmed up before timing
+            list(
+                render_frames(allocation_animated, config, renderer_pool=pool)
+            )
+            run(
+                "render_frames_pool",
+                lambda: list(
+                    render_frames(
+                        allocation_animated, config, renderer_pool=pool
+                    )
+                ),
+            )
+
+    # each format of the animation file, decided by the extension
+    config_integrate = copy.copy(config)
+    config_integrate.animation_format = "auto"
+    for stage, filename in [
+        ("integrate_images", "benchmark.gif"),
+        ("integrate_images_webp", "benchmark.webp"),
+        ("integrate_images_apng", "benchmark.png"),
+    ]:
+        if stage not in stages:
+            continue
+
+        path = run(
+            stage,
+            lambda: integrate_images(
+                images,
+                allocation_animated,
+                config_integrate,
+                filename=filename,
+            ),
+        )
+        results[stage]["file_size"] = os.path.getsize(path)
+
+    if "animate" in stages:
+        run("animate", lambda: animate(raw_timelapse, config))
+
+    return results
+
+
+def get_commit() -> str | None:
+    """
+    Get the commit hash of the working tree
+
+    :return: Commit hash, or None if not available
+    :rtype: str|None
+    """
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_config_overrides(overrides: list[str]) -> dict[str, Any]:
+    """
+    Parse "key=value" arguments
+
+    Values are read as Python literals if possible, else as strings.
+
+    :param list[str] overrides: Arguments
+    :return: key -> value
+    :rtype: dict[str, Any]
+    """
+
+    output = {}
+    for override in overrides:
+        key, value = override.split("=", 1)
+        try:
+            output[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            output[key] = value
+
+    return output
+
+
+def main() -> None:
+    scenarios = get_scenarios()
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument(
+        "--scenarios", nargs="+", default=list(scenarios.keys())
+    )
+    parser.add_argument("--stages", nargs="+", default=STAGES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--config",
+        nargs="*",
+        default=[],
+        help="Config overrides as key=value, applied to all scenarios",
+    )
+    args = parser.parse_args()
+
+    config_overrides = _parse_config_overrides(args.config)
+
+    output = {
+        "commit": get_commit(),
+        "created": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "config_overrides": config_overrides,
+        "scenarios": {},
+    }
+
+    for name in args.scenarios:
+        scenario = scenarios[name]
+        print(f"Benchmarking {name}...")
+
+        with tempfile.TemporaryDirectory() as output_path:
+            config = Config(
+                output_path=output_path,
+                **{**scenario["config"], **config_overrides},
+            )
+            results = benchmark_scenario(
+                scenario["timelapse"], config, args.stages, args.repeat
+            )
+
+        output["scenarios"][name] = {
+            "description": scenario["description"],
+            "n_frames": len(scenario["timelapse"]),
+            "config": scenario["config"],
+            "stages": results,
+        }
+
+        for stage, result in results.items():
+            print(f"  {stage}: {result['median']:.3f}s")
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()